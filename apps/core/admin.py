@@ -19,6 +19,7 @@ class RegionAdmin(admin.ModelAdmin):
         "soil_type",
         "vegetation_density",
     )
+    list_select_related = ("soil_type",)
     search_fields = ("name",)
     list_filter = ("soil_type",)
     autocomplete_fields = ["soil_type"]
@@ -6,3 +6,10 @@ class CoreConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.core"
     path = os.path.dirname(os.path.abspath(__file__))
+
+    def ready(self):
+        # Registers the connection_created receiver counting SQL queries
+        from . import instrumentation  # noqa: F401
+
+        # Invalidates the region metadata cache when regions change
+        from . import signals  # noqa: F401
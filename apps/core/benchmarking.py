@@ -0,0 +1,146 @@
+"""
+Micro-benchmark harness for the prediction hot paths.
+
+Benchmarks are registered with the ``benchmark`` decorator in a
+``benchmarks`` module of an installed app and run by the ``benchmark``
+management command against a freshly created, seeded test database. Results
+are compared with stored baselines so that a change slowing a hot path down
+by more than the regression threshold shows up in review.
+
+A benchmark function receives its parameter (if any), does its setup and
+returns the zero-argument callable to time::
+
+    @benchmark("risk.calculate_trend")
+    def calculate_trend_90_days():
+        values = series(90)
+        return lambda: calculate_trend(values)
+"""
+
+import json
+import statistics
+import timeit
+
+from django.utils.module_loading import autodiscover_modules
+
+DEFAULT_THRESHOLD = 0.25
+
+_registry = {}
+
+
+class Benchmark:
+    def __init__(self, name, setup, params=None):
+        self.name = name
+        self.setup = setup
+        self.params = params
+
+    def cases(self):
+        """(case name, zero-argument setup) of every parameter value."""
+        if not self.params:
+            return [(self.name, self.setup)]
+        return [
+            (f"{self.name}[{param}]", lambda param=param: self.setup(param))
+            for param in self.params
+        ]
+
+
+def benchmark(name, params=None):
+    """Register a benchmark; ``params`` runs it once per parameter value."""
+
+    def register(setup):
+        _registry[name] = Benchmark(name, setup, params)
+        return setup
+
+    return register
+
+
+def get_benchmarks(pattern=None):
+    """Registered benchmarks whose name contains ``pattern``, sorted by name."""
+    autodiscover_modules("benchmarks")
+    return [
+        bench
+        for name, bench in sorted(_registry.items())
+        if not pattern or pattern in name
+    ]
+
+
+def time_callable(func, repeat=5, min_time=0.2):
+    """
+    Time ``func`` like timeit: calls are looped until a round takes at least
+    ``min_time`` seconds, and ``repeat`` rounds are measured.
+
+    Returns:
+        Dictionary with the ``median`` and ``min`` seconds per call, and the
+        number of calls per round
+    """
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+
+    rounds = [elapsed] + timer.repeat(repeat=repeat - 1, number=number)
+    per_call = [round_time / number for round_time in rounds]
+    return {
+        "median": statistics.median(per_call),
+        "min": min(per_call),
+        "number": number,
+    }
+
+
+def run_benchmarks(benchmarks, repeat=5, min_time=0.2, on_result=None):
+    """
+    Run every case of the given benchmarks.
+
+    Returns:
+        Dictionary mapping case name to its timing
+    """
+    results = {}
+    for bench in benchmarks:
+        for case, setup in bench.cases():
+            results[case] = time_callable(setup(), repeat, min_time)
+            if on_result is not None:
+                on_result(case, results[case])
+    return results
+
+
+def compare(results, baselines, threshold=DEFAULT_THRESHOLD):
+    """
+    Compare median timings with baselines.
+
+    Returns:
+        List of (case, baseline seconds, current seconds, ratio) for cases
+        slower than their baseline by more than ``threshold`` (0.25 = 25%)
+    """
+    regressions = []
+    for case, timing in results.items():
+        baseline = baselines.get(case)
+        if not baseline:
+            continue
+        ratio = timing["median"] / baseline["median"]
+        if ratio > 1 + threshold:
+            regressions.append((case, baseline["median"], timing["median"], ratio))
+    return regressions
+
+
+def load_baselines(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(path, results, merge=True):
+    """Store results as baselines, keeping other cases' baselines when merging."""
+    baselines = load_baselines(path) if merge else {}
+    baselines.update(
+        {
+            case: {"median": timing["median"], "min": timing["min"]}
+            for case, timing in results.items()
+        }
+    )
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(baselines, f, indent=2, sort_keys=True)
+        f.write("\n")
@@ -0,0 +1,74 @@
+"""
+Benchmarks of the spatial index and the event analytics.
+
+Run with ``python manage.py benchmark -k spatial`` or ``-k events``. Inputs
+are synthetic and seeded, so every run times the same work.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+
+from . import eventstats
+from .benchmarking import benchmark
+from .models import Region, WildfireEvent
+from .spatial import SpatialIndex
+
+SEED = 1337
+
+
+def random_index(count):
+    rng = np.random.default_rng(SEED)
+    latitude = np.degrees(np.arcsin(rng.uniform(-1, 1, count)))
+    longitude = rng.uniform(-180, 180, count)
+    return SpatialIndex(range(count), latitude, longitude)
+
+
+@benchmark("spatial.nearest", params=[10000, 100000])
+def bench_spatial_nearest(count):
+    index = random_index(count)
+    return lambda: index.nearest(35.0, -5.0, k=10)
+
+
+@benchmark("spatial.within", params=[10000, 100000])
+def bench_spatial_within(count):
+    index = random_index(count)
+    # About 0.6% of the points lie within 1000 km
+    return lambda: index.within(35.0, -5.0, 1000)
+
+
+def seed_events(years, per_year=50):
+    """Replace all regions with one holding ``years`` of events."""
+    rng = np.random.default_rng(SEED)
+    Region.objects.all().delete()
+    region = Region.objects.create(
+        name="Benchmark Region",
+        latitude=33.5,
+        longitude=-7.6,
+        elevation=400,
+        area=1200,
+        population=50000,
+    )
+    start = datetime(2024 - years, 1, 1, tzinfo=dt_timezone.utc)
+    offsets = np.sort(rng.uniform(0, years * 365, years * per_year))
+    WildfireEvent.objects.bulk_create(
+        [
+            WildfireEvent(
+                region=region,
+                start_date=start + timedelta(days=float(offset)),
+                end_date=start + timedelta(days=float(offset) + 1),
+                severity=int(rng.integers(1, 5)),
+                area_affected=float(rng.lognormal(1, 1)),
+            )
+            for offset in offsets
+        ]
+    )
+    eventstats.rebuild_rollups([region.pk])
+    return region, start, start + timedelta(days=years * 365)
+
+
+@benchmark("events.fire_series", params=["day", "year"])
+def bench_fire_series(interval):
+    # 30 years of events: per-day series scan the events, yearly ones the rollups
+    region, start, end = seed_events(30)
+    return lambda: eventstats.fire_series(region.pk, start, end, interval)
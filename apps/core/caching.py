@@ -0,0 +1,71 @@
+"""
+HTTP conditional request helpers.
+
+Views compute a cheap version of the resource (typically one aggregate or
+indexed lookup), turn it into an ETag/Last-Modified pair and answer 304 Not
+Modified before doing any serialization when the client already has it.
+"""
+
+import hashlib
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import http_date
+
+from . import metrics
+
+
+def make_etag(*parts):
+    """Build a strong ETag from the parts that identify a resource version."""
+    digest = hashlib.md5(
+        "|".join(str(part) for part in parts).encode(), usedforsecurity=False
+    ).hexdigest()
+    return f'"{digest}"'
+
+
+def set_validators(response, etag=None, last_modified=None, max_age=0):
+    """
+    Attach validators and Cache-Control headers to a response.
+
+    The APIs require authentication, so responses are marked private: a
+    fronting proxy or CDN must not share them between users, while browsers
+    may reuse them for ``max_age`` seconds and revalidate afterwards.
+    """
+    if etag:
+        response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified.timestamp())
+    patch_cache_control(
+        response, private=True, max_age=max(int(max_age), 0), must_revalidate=True
+    )
+    patch_vary_headers(response, ["Cookie", "Authorization"])
+    return response
+
+
+def not_modified(request, etag=None, last_modified=None, max_age=0):
+    """
+    Return a 304 response if the request's validators match, otherwise None.
+
+    ``request`` may be a Django HttpRequest or a DRF Request. Requests
+    carrying validators are counted in the ``http_conditional`` cache metric.
+    """
+    response = get_conditional_response(
+        request,
+        etag=etag,
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    if is_conditional(request):
+        metrics.record_cache("http_conditional", response is not None)
+    if response is None:
+        return None
+    return set_validators(response, etag, last_modified, max_age)
+
+
+def is_conditional(request):
+    return bool(
+        request.META.get("HTTP_IF_NONE_MATCH")
+        or request.META.get("HTTP_IF_MODIFIED_SINCE")
+    )
@@ -0,0 +1,203 @@
+"""
+Compact columnar encodings of time series.
+
+History and export endpoints read their rows with ``values_list`` and turn
+them into one NumPy array per field (``Columns``), so no serializer or model
+instance is created per row. Two binary formats encode the arrays:
+
+- MessagePack (``application/msgpack``), always available: a map of
+  ``length`` and ``columns``. Numeric, boolean and time columns are typed
+  arrays, ``{"dtype": <NumPy dtype string>, "data": <raw bytes>}``, readable
+  with ``numpy.frombuffer`` or a JavaScript typed array. Times are
+  ``<M8[us]`` (int64 microseconds since the epoch, UTC) and missing floats
+  are NaN. Text and JSON columns are plain arrays.
+- Arrow IPC streams (``application/vnd.apache.arrow.stream``), when the
+  optional ``pyarrow`` package is installed: one record batch per
+  ``Columns``.
+"""
+
+import datetime
+import json
+
+from .lazy import lazy_import
+
+np = lazy_import("numpy")
+msgpack = lazy_import("msgpack")
+
+FORMATS = ("msgpack", "arrow")
+
+CONTENT_TYPES = {
+    "msgpack": "application/msgpack",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+# Model field type: NumPy dtype of its column (anything else is an object column)
+DTYPES = {
+    "AutoField": "<i8",
+    "BigAutoField": "<i8",
+    "ForeignKey": "<i8",
+    "IntegerField": "<i8",
+    "BigIntegerField": "<i8",
+    "PositiveIntegerField": "<i8",
+    "SmallIntegerField": "<i8",
+    "FloatField": "<f8",
+    "BooleanField": "|b1",
+    "DateTimeField": "<M8[us]",
+    "DateField": "<M8[D]",
+}
+
+
+def arrow_available():
+    """Check whether the optional pyarrow dependency is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def field_dtype(model, name):
+    """NumPy dtype string of a model field's column, None for object columns."""
+    field = model._meta.get_field(name.removesuffix("_id"))
+    return DTYPES.get(field.get_internal_type())
+
+
+def naive_utc(value):
+    if isinstance(value, datetime.datetime) and value.tzinfo is not None:
+        return value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def to_array(values, dtype):
+    """1-D array of a column's values; integers with nulls become floats."""
+    if dtype is None:
+        array = np.empty(len(values), dtype=object)
+        array[:] = values
+        return array
+    if dtype.startswith("<M8"):
+        return np.array([naive_utc(value) for value in values], dtype=dtype)
+    try:
+        return np.array(values, dtype=dtype)
+    except TypeError:
+        return np.array(values, dtype="<f8")
+
+
+class Columns:
+    """
+    Field names and their 1-D arrays, all of the same length.
+
+    Args:
+        names: Field names, in order
+        arrays: One array per field
+    """
+
+    def __init__(self, names, arrays):
+        self.names = list(names)
+        self.arrays = list(arrays)
+
+    @classmethod
+    def from_rows(cls, rows, fields, model):
+        """
+        Build columns of ``values_list(*fields)`` rows of ``model``, typed
+        after the model's fields.
+        """
+        rows = list(rows)
+        values = list(zip(*rows)) if rows else [() for _ in fields]
+        return cls(
+            fields,
+            [
+                to_array(column, field_dtype(model, name))
+                for name, column in zip(fields, values)
+            ],
+        )
+
+    def __len__(self):
+        return len(self.arrays[0]) if self.arrays else 0
+
+    def __getitem__(self, name):
+        return self.arrays[self.names.index(name)]
+
+    def to_msgpack(self):
+        """MessagePack-ready map of the columns (see the module docstring)."""
+        columns = {}
+        for name, array in zip(self.names, self.arrays):
+            if array.dtype == object:
+                columns[name] = array.tolist()
+            else:
+                columns[name] = {"dtype": array.dtype.str, "data": array.tobytes()}
+        return {"length": len(self), "columns": columns}
+
+    def to_arrow(self):
+        """The columns as a pyarrow RecordBatch (NaN floats become nulls)."""
+        import pyarrow as pa
+
+        arrays = []
+        for array in self.arrays:
+            if array.dtype == object:
+                arrays.append(pa.array([plain(value) for value in array.tolist()]))
+            elif array.dtype == np.dtype("<M8[us]"):
+                arrays.append(
+                    pa.array(array, type=pa.timestamp("us", tz="UTC"), from_pandas=True)
+                )
+            else:
+                arrays.append(pa.array(array, from_pandas=True))
+        return pa.RecordBatch.from_arrays(arrays, names=self.names)
+
+
+def plain(value):
+    """Text and JSON values as Arrow strings."""
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+def pack_default(value):
+    """msgpack ``default`` hook for Columns, times and other JSON-like values."""
+    if isinstance(value, Columns):
+        return value.to_msgpack()
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    return str(value)
+
+
+def packb(data):
+    """Encode ``data`` (which may hold Columns) as MessagePack."""
+    return msgpack.packb(data, default=pack_default, datetime=False)
+
+
+def arrow_body(data):
+    """
+    Encode Columns, or a map whose ``results`` are Columns, as an Arrow IPC
+    stream of one record batch. The map's other entries (such as the next
+    page link) are stored as JSON in the schema metadata.
+    """
+    import pyarrow as pa
+
+    metadata = {}
+    if isinstance(data, dict):
+        metadata = {
+            key: json.dumps(value) for key, value in data.items() if key != "results"
+        }
+        data = data["results"]
+    batch = data.to_arrow()
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema.with_metadata(metadata)) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def paginated_columns(view, queryset, fields):
+    """
+    Keyset page of ``queryset`` as Columns of ``fields``, read with
+    ``values_list`` (see KeysetPagination.paginate_values).
+    """
+    from rest_framework.response import Response
+
+    if view.request.accepted_renderer.format == "arrow" and not arrow_available():
+        return Response(
+            {"error": "Arrow responses require the pyarrow package"}, status=400
+        )
+    rows = view.paginator.paginate_values(queryset, view.request, view, fields)
+    return view.get_paginated_response(Columns.from_rows(rows, fields, queryset.model))
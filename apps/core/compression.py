@@ -0,0 +1,63 @@
+"""
+Content-Encoding negotiation for views that cache their encoded bodies.
+
+GZipMiddleware compresses every response again on every request; views
+serving the same large body many times (such as the map risk layer) compress
+it once per version instead. Brotli is used when the optional ``brotli``
+package is installed and the client accepts it, gzip otherwise.
+"""
+
+import gzip
+import importlib.util
+from functools import lru_cache
+
+# Bodies smaller than this are sent uncompressed
+MIN_COMPRESS_SIZE = 512
+
+
+@lru_cache(maxsize=None)
+def brotli_available():
+    """Check whether the optional brotli dependency is installed."""
+    return importlib.util.find_spec("brotli") is not None
+
+
+def accepted_encodings(request):
+    """Content codings the request's Accept-Encoding allows (q > 0)."""
+    encodings = set()
+    for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        try:
+            quality = float(params.strip().removeprefix("q=")) if params else 1.0
+        except ValueError:
+            quality = 1.0
+        if coding and quality > 0:
+            encodings.add(coding.strip().lower())
+    return encodings
+
+
+def negotiate_encoding(request):
+    """Preferred encoding of a response to ``request``: "br", "gzip" or None."""
+    encodings = accepted_encodings(request)
+    if "br" in encodings and brotli_available():
+        return "br"
+    if "gzip" in encodings:
+        return "gzip"
+    return None
+
+
+def compress(body, encoding):
+    """
+    Encode ``body`` (bytes) with ``encoding``.
+
+    Returns:
+        The encoded body and the encoding actually used, None for bodies
+        below MIN_COMPRESS_SIZE
+    """
+    if encoding is None or len(body) < MIN_COMPRESS_SIZE:
+        return body, None
+    if encoding == "br":
+        import brotli
+
+        return brotli.compress(body, quality=5), encoding
+    # mtime=0 keeps the output, and so cached copies, identical across runs
+    return gzip.compress(body, compresslevel=6, mtime=0), encoding
@@ -0,0 +1,220 @@
+"""
+Publish/subscribe of live region updates, delivered as Server-Sent Events.
+
+Publishers (the prediction pipeline and weather ingestion) encode each update
+into an SSE frame exactly once and hand it to the broker, which fans the same
+frame out to every subscriber of the region's topic. Subscribers never query
+the database, so the cost of an update does not depend on the number of open
+dashboards.
+
+``RedisBroker``, the default when ``REDIS_URL`` is set, reaches every
+process, including publishers run by cron (``update_weather``,
+``refresh_predictions``). ``InProcessBroker`` only reaches clients connected
+to the publishing process, which is enough for a single ASGI worker.
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+ALL_REGIONS_TOPIC = "regions"
+
+
+def region_topic(region_id):
+    """Topic carrying the updates of a single region."""
+    return f"region.{region_id}"
+
+
+def encode_event(event, data):
+    """Encode an event as a Server-Sent Events frame."""
+    payload = json.dumps(data, cls=DjangoJSONEncoder, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class _Subscription:
+    """Bounded queue of frames for one subscriber of the in-process broker."""
+
+    def __init__(self, broker, topics, queue_size):
+        self.broker = broker
+        self.topics = topics
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=queue_size)
+
+    def put(self, frame):
+        # Called from any thread; the queue belongs to the subscriber's loop
+        try:
+            self.loop.call_soon_threadsafe(self._put, frame)
+        except RuntimeError:
+            # Event loop already closed: the client is gone
+            self.broker.unsubscribe(self)
+
+    def _put(self, frame):
+        if self.queue.full():
+            # Slow consumer: drop the oldest update rather than block publishers
+            self.queue.get_nowait()
+        self.queue.put_nowait(frame)
+
+    async def get(self, timeout):
+        """Wait for the next frame, returning None after ``timeout`` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Broker that fans frames out to subscribers within the current process."""
+
+    cross_process = False
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def publish(self, topic, frame):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.put(frame)
+        return len(subscribers)
+
+    async def subscribe(self, topics):
+        """Subscribe to ``topics`` from the subscriber's event loop."""
+        subscription = _Subscription(self, topics, self.queue_size)
+        with self._lock:
+            for topic in topics:
+                self._subscribers[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscribers.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[topic]
+
+    def subscriber_count(self, topic):
+        with self._lock:
+            return len(self._subscribers.get(topic, ()))
+
+
+class _RedisSubscription:
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def get(self, timeout):
+        message = await self.pubsub.get_message(
+            ignore_subscribe_messages=True, timeout=timeout
+        )
+        if message is None:
+            return None
+        return message["data"].decode()
+
+    async def close(self):
+        await self.pubsub.unsubscribe()
+        await self.pubsub.aclose()
+
+
+class RedisBroker:
+    """Broker backed by Redis pub/sub, shared by every process (needs ``redis``)."""
+
+    cross_process = True
+
+    def __init__(self, url=None, prefix="wildfire:"):
+        try:
+            import redis
+            import redis.asyncio
+        except ImportError:
+            raise ImproperlyConfigured("RedisBroker requires the redis package")
+
+        self.url = url or settings.EVENTS_REDIS_URL
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(self.url)
+        self._async_client = redis.asyncio.Redis.from_url(self.url)
+
+    def publish(self, topic, frame):
+        return self._client.publish(self.prefix + topic, frame)
+
+    async def subscribe(self, topics):
+        pubsub = self._async_client.pubsub()
+        await pubsub.subscribe(*[self.prefix + topic for topic in topics])
+        return _RedisSubscription(pubsub)
+
+
+_broker = None
+
+
+def get_broker():
+    """Return the broker configured by EVENTS_BROKER, creating it once."""
+    global _broker
+    if _broker is None:
+        _broker = import_string(settings.EVENTS_BROKER)()
+    return _broker
+
+
+def streaming_available():
+    """
+    Whether the SSE stream can be served: an infinite stream pins a WSGI
+    worker for as long as the client stays, and an in-process broker misses
+    the updates published by other processes.
+    """
+    if not settings.ASGI_MODE:
+        return False
+    return get_broker().cross_process or settings.EVENTS_SINGLE_PROCESS
+
+
+def publish(region_id, event, data):
+    """
+    Publish an update of a region once its database transaction commits.
+
+    Args:
+        region_id: Region the update belongs to
+        event: SSE event name (``prediction`` or ``weather``)
+        data: JSON-serializable payload
+    """
+    frame = encode_event(event, dict(data, region_id=region_id))
+
+    def send():
+        try:
+            broker = get_broker()
+            broker.publish(region_topic(region_id), frame)
+            broker.publish(ALL_REGIONS_TOPIC, frame)
+        except Exception as e:
+            logger.error(f"Error publishing {event} event for region {region_id}: {e}")
+
+    transaction.on_commit(send)
+
+
+async def stream_events(topics, heartbeat=None):
+    """
+    Yield SSE frames published on ``topics`` until the client disconnects.
+
+    A comment line is sent every ``heartbeat`` seconds without updates so that
+    proxies keep the connection open.
+    """
+    heartbeat = heartbeat or settings.EVENTS_HEARTBEAT_SECONDS
+    subscription = await get_broker().subscribe(topics)
+    try:
+        # Ask browsers to reconnect quickly after a dropped connection
+        yield "retry: 5000\n\n"
+        while True:
+            frame = await subscription.get(heartbeat)
+            yield frame if frame is not None else ": keep-alive\n\n"
+    finally:
+        await subscription.close()
@@ -0,0 +1,221 @@
+"""
+Wildfire event analytics.
+
+Counts, burned area, severity distribution and containment time of wildfire
+events by region, year and month. Two sources answer them:
+
+- ``WildfireEventRollup`` rows, one per region and month, for yearly and
+  monthly figures over any span (decades of events are a few hundred rows
+  per region);
+- the events themselves for daily series, read through the
+  (region, start_date) index.
+
+Saving or deleting an event rebuilds the rollups of its region and year
+(see signals); bulk writes must call ``rebuild_rollups``.
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear, TruncDate
+from django.utils import timezone
+
+from .models import WildfireEvent, WildfireEventRollup
+
+logger = logging.getLogger(__name__)
+
+SEVERITY_FIELDS = {
+    WildfireEvent.LOW: "low_count",
+    WildfireEvent.MEDIUM: "medium_count",
+    WildfireEvent.HIGH: "high_count",
+    WildfireEvent.EXTREME: "extreme_count",
+}
+
+ROLLUP_FIELDS = [
+    "event_count",
+    "area_affected",
+    *SEVERITY_FIELDS.values(),
+    "contained_count",
+    "containment_hours",
+]
+
+GROUPINGS = ("region", "year", "month")
+
+
+def event_aggregates():
+    """Aggregate expressions of events, named after the rollup fields."""
+    return {
+        "event_count": Count("pk"),
+        "area_affected": Sum("area_affected"),
+        **{
+            field: Count("pk", filter=Q(severity=severity))
+            for severity, field in SEVERITY_FIELDS.items()
+        },
+        "contained_count": Count("end_date"),
+        "containment": Sum(F("end_date") - F("start_date")),
+    }
+
+
+def rollup_aggregates():
+    """Aggregate expressions summing rollup rows."""
+    return {field: Sum(field) for field in ROLLUP_FIELDS}
+
+
+def to_hours(duration):
+    return duration.total_seconds() / 3600 if duration else 0.0
+
+
+def with_containment_hours(row):
+    """Replace an aggregated row's containment duration with hours."""
+    row["containment_hours"] = to_hours(row.pop("containment"))
+    return row
+
+
+def aggregate_events(events):
+    """
+    Rollup field values of an event queryset, one dictionary per region,
+    year and month.
+    """
+    rows = (
+        events.annotate(
+            year=ExtractYear("start_date"), month=ExtractMonth("start_date")
+        )
+        .values("region_id", "year", "month")
+        .annotate(**event_aggregates())
+        .order_by()
+    )
+    return [with_containment_hours(row) for row in rows]
+
+
+def rebuild_rollups(region_ids=None, year=None, event_model=None, rollup_model=None):
+    """
+    Recompute the rollups of some regions (all by default) and optionally
+    one year. Migrations pass their historical models.
+
+    Returns:
+        Number of rollup rows written
+    """
+    event_model = event_model or WildfireEvent
+    rollup_model = rollup_model or WildfireEventRollup
+    events = event_model.objects.all()
+    rollups = rollup_model.objects.all()
+    if region_ids is not None:
+        events = events.filter(region_id__in=region_ids)
+        rollups = rollups.filter(region_id__in=region_ids)
+    if year is not None:
+        events = events.filter(start_date__year=year)
+        rollups = rollups.filter(year=year)
+
+    rows = aggregate_events(events)
+    with transaction.atomic():
+        rollups.delete()
+        rollup_model.objects.bulk_create([rollup_model(**row) for row in rows])
+    return len(rows)
+
+
+def event_year(value):
+    """Year of an event start date (a datetime or an ISO string)."""
+    value = WildfireEvent._meta.get_field("start_date").to_python(value)
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return timezone.localtime(value).year
+
+
+def summarize(row):
+    """API representation of aggregated rollup fields."""
+    contained = row["contained_count"] or 0
+    return {
+        "event_count": row["event_count"] or 0,
+        "area_affected": round(row["area_affected"] or 0.0, 3),
+        "severity": {
+            label.lower(): row[SEVERITY_FIELDS[severity]] or 0
+            for severity, label in WildfireEvent.SEVERITY_CHOICES
+        },
+        "avg_containment_hours": (
+            round(row["containment_hours"] / contained, 2) if contained else None
+        ),
+    }
+
+
+def rollup_statistics(group_by=(), region_id=None, start_year=None, end_year=None):
+    """
+    Event statistics grouped by any of ``GROUPINGS``, in one query on the
+    rollups.
+
+    Returns:
+        List of dictionaries with the group fields and summarize() figures
+    """
+    fields = ["region_id" if name == "region" else name for name in group_by]
+    rollups = WildfireEventRollup.objects.all()
+    if region_id is not None:
+        rollups = rollups.filter(region_id=region_id)
+    if start_year is not None:
+        rollups = rollups.filter(year__gte=start_year)
+    if end_year is not None:
+        rollups = rollups.filter(year__lte=end_year)
+
+    if not fields:
+        return [summarize(rollups.aggregate(**rollup_aggregates()))]
+    rows = rollups.values(*fields).annotate(**rollup_aggregates()).order_by(*fields)
+    return [
+        {**{field: row[field] for field in fields}, **summarize(row)} for row in rows
+    ]
+
+
+def daily_rows(region_id, start, end):
+    """Rollup fields of each day with events of a region in [start, end]."""
+    rows = (
+        WildfireEvent.objects.filter(
+            region_id=region_id, start_date__gte=start, start_date__lte=end
+        )
+        .annotate(day=TruncDate("start_date"))
+        .values("day")
+        .annotate(**event_aggregates())
+        .order_by("day")
+    )
+    return [
+        {**with_containment_hours(row), "date": row["day"].isoformat()} for row in rows
+    ]
+
+
+def rollup_rows(region_id, start, end, interval):
+    """
+    Rollup fields of each month or year of a region, over the whole months
+    overlapping [start, end].
+    """
+    start, end = timezone.localtime(start), timezone.localtime(end)
+    rollups = WildfireEventRollup.objects.filter(
+        region_id=region_id, year__gte=start.year, year__lte=end.year
+    )
+    if interval == "month":
+        rollups = rollups.exclude(year=start.year, month__lt=start.month).exclude(
+            year=end.year, month__gt=end.month
+        )
+        fields = ["year", "month"]
+    else:
+        fields = ["year"]
+
+    rows = rollups.values(*fields).annotate(**rollup_aggregates()).order_by(*fields)
+    return [
+        {**row, "date": f"{row['year']:04d}-{row.get('month', 1):02d}-01"}
+        for row in rows
+    ]
+
+
+def fire_series(region_id, start, end, interval):
+    """
+    Event statistics of a region per day, month or year, in one query.
+
+    Returns:
+        The series (dictionaries with the period's ``date`` and summarize()
+        figures) and the statistics of the whole range
+    """
+    if interval == "day":
+        rows = daily_rows(region_id, start, end)
+    else:
+        rows = rollup_rows(region_id, start, end, interval)
+
+    series = [{"date": row["date"], **summarize(row)} for row in rows]
+    totals = {field: sum(row[field] or 0 for row in rows) for field in ROLLUP_FIELDS}
+    return series, summarize(totals)
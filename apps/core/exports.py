@@ -0,0 +1,349 @@
+"""
+Streaming bulk exports of the time-series tables.
+
+Rows are read with ``values_list(...).iterator(chunk_size=...)`` (a server-side
+cursor on PostgreSQL) and encoded incrementally, so memory stays constant no
+matter how many rows are exported. NDJSON, CSV and MessagePack are always
+available; Parquet and Arrow need the optional ``pyarrow`` package. Parquet
+is written one row group at a time. MessagePack and Arrow exports are
+sequences of column batches of EXPORT_COLUMNAR_BATCH_SIZE rows (see
+apps.core.columnar): consecutive MessagePack maps, or the record batches of
+one Arrow IPC stream.
+"""
+
+import csv
+import json
+import logging
+from datetime import datetime, time
+
+from django.apps import apps
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from . import columnar
+from .streaming import streaming_response
+
+logger = logging.getLogger(__name__)
+
+# name: (model label, time field, exported fields)
+EXPORTS = {
+    "weather": (
+        "weather.WeatherData",
+        "timestamp",
+        [
+            "id",
+            "region_id",
+            "timestamp",
+            "temperature",
+            "humidity",
+            "wind_speed",
+            "wind_direction",
+            "precipitation",
+            "pressure",
+            "created_at",
+        ],
+    ),
+    "predictions": (
+        "predictions.WildfirePrediction",
+        "prediction_date",
+        [
+            "id",
+            "region_id",
+            "prediction_date",
+            "risk_level",
+            "confidence",
+            "model_version",
+            "features_used",
+            "created_at",
+        ],
+    ),
+}
+
+CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+    **columnar.CONTENT_TYPES,
+}
+
+
+class ExportError(Exception):
+    """Raised when an export cannot be produced with the given options."""
+
+
+def parse_time_bound(value, end_of_day=False):
+    """
+    Parse an ISO date or datetime query value into an aware datetime.
+
+    A bare date means the start of that day, or its end if ``end_of_day``.
+    """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError(f"Invalid date: {value}")
+        parsed = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def export_queryset(name, region_id=None, start=None, end=None):
+    """
+    Build the queryset of rows to export.
+
+    Returns:
+        Tuple of (queryset, exported field names)
+    """
+    if name not in EXPORTS:
+        raise ExportError(f"Unknown export: {name}")
+
+    label, time_field, fields = EXPORTS[name]
+    queryset = apps.get_model(label).objects.order_by("pk")
+    if region_id:
+        queryset = queryset.filter(region_id=region_id)
+    if start:
+        queryset = queryset.filter(**{f"{time_field}__gte": start})
+    if end:
+        queryset = queryset.filter(**{f"{time_field}__lte": end})
+    return queryset, fields
+
+
+def iter_rows(queryset, fields, chunk_size=None):
+    """Iterate over the rows of ``queryset`` as tuples without caching them."""
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    return queryset.values_list(*fields).iterator(chunk_size=chunk_size)
+
+
+def _plain(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+def _buffered(lines, size):
+    """Join encoded lines into chunks of ``size`` lines to limit write calls."""
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= size:
+            yield "".join(buffer)
+            buffer = []
+    if buffer:
+        yield "".join(buffer)
+
+
+def stream_ndjson(rows, fields):
+    """Encode rows as newline-delimited JSON objects."""
+    lines = (
+        json.dumps(dict(zip(fields, row)), cls=DjangoJSONEncoder) + "\n" for row in rows
+    )
+    return _buffered(lines, settings.EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object whose write() returns the value instead of buffering."""
+
+    def write(self, value):
+        return value
+
+
+def stream_csv(rows, fields):
+    """Encode rows as CSV with a header line."""
+    writer = csv.writer(_Echo())
+    lines = (writer.writerow([_plain(value) for value in row]) for row in rows)
+    yield writer.writerow(fields)
+    yield from _buffered(lines, settings.EXPORT_CHUNK_SIZE)
+
+
+class _ChunkSink:
+    """Write-only file that hands written bytes back to the caller in chunks."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def _arrow_schema(model, fields):
+    import pyarrow as pa
+
+    types = {
+        "AutoField": pa.int64(),
+        "BigAutoField": pa.int64(),
+        "ForeignKey": pa.int64(),
+        "IntegerField": pa.int64(),
+        "PositiveIntegerField": pa.int64(),
+        "FloatField": pa.float64(),
+        "DateTimeField": pa.timestamp("us", tz="UTC"),
+        "DateField": pa.date32(),
+    }
+    columns = []
+    for name in fields:
+        field = model._meta.get_field(name.removesuffix("_id"))
+        columns.append((name, types.get(field.get_internal_type(), pa.string())))
+    return pa.schema(columns)
+
+
+def stream_parquet(rows, fields, model, row_group_size=None):
+    """Encode rows as a Parquet file, emitting bytes after every row group."""
+    if not columnar.arrow_available():
+        raise ExportError("Parquet export requires the pyarrow package")
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    row_group_size = row_group_size or settings.EXPORT_PARQUET_ROW_GROUP_SIZE
+    schema = _arrow_schema(model, fields)
+    string_columns = {
+        index for index, field in enumerate(schema) if pa.types.is_string(field.type)
+    }
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(sink, schema)
+
+    def write_group(columns):
+        arrays = [
+            pa.array(
+                [_plain(v) for v in values] if index in string_columns else values,
+                type=schema.field(index).type,
+            )
+            for index, values in enumerate(columns)
+        ]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+
+    columns = [[] for _ in fields]
+    count = 0
+    for row in rows:
+        for column, value in zip(columns, row):
+            column.append(value)
+        count += 1
+        if count == row_group_size:
+            write_group(columns)
+            columns = [[] for _ in fields]
+            count = 0
+            yield sink.drain()
+    if count:
+        write_group(columns)
+    writer.close()
+    yield sink.drain()
+
+
+def column_batches(rows, fields, model, batch_size=None):
+    """
+    Group rows into Columns of ``batch_size`` rows; at least one (possibly
+    empty) batch is produced.
+    """
+    batch_size = batch_size or settings.EXPORT_COLUMNAR_BATCH_SIZE
+    batch = []
+    produced = False
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield columnar.Columns.from_rows(batch, fields, model)
+            batch = []
+            produced = True
+    if batch or not produced:
+        yield columnar.Columns.from_rows(batch, fields, model)
+
+
+def stream_msgpack(rows, fields, model):
+    """Encode rows as consecutive MessagePack maps of column batches."""
+    for columns in column_batches(rows, fields, model):
+        yield columnar.packb(columns)
+
+
+def stream_arrow(rows, fields, model):
+    """Encode rows as an Arrow IPC stream, emitting bytes after every batch."""
+    if not columnar.arrow_available():
+        raise ExportError("Arrow export requires the pyarrow package")
+
+    import pyarrow as pa
+
+    sink = _ChunkSink()
+    writer = None
+    for columns in column_batches(rows, fields, model):
+        batch = columns.to_arrow()
+        if writer is None:
+            writer = pa.ipc.new_stream(sink, batch.schema)
+        writer.write_batch(batch)
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+
+def stream_export(name, export_format, region_id=None, start=None, end=None):
+    """
+    Stream an export in the requested format.
+
+    Returns:
+        Iterator of str or bytes chunks
+    """
+    if export_format not in CONTENT_TYPES:
+        raise ExportError(f"Unsupported export format: {export_format}")
+    if export_format == "parquet" and not columnar.arrow_available():
+        raise ExportError("Parquet export requires the pyarrow package")
+    if export_format == "arrow" and not columnar.arrow_available():
+        raise ExportError("Arrow export requires the pyarrow package")
+
+    queryset, fields = export_queryset(name, region_id, start, end)
+    rows = iter_rows(queryset, fields)
+    if export_format == "ndjson":
+        return stream_ndjson(rows, fields)
+    if export_format == "csv":
+        return stream_csv(rows, fields)
+    if export_format == "msgpack":
+        return stream_msgpack(rows, fields, queryset.model)
+    if export_format == "arrow":
+        return stream_arrow(rows, fields, queryset.model)
+    return stream_parquet(rows, fields, queryset.model)
+
+
+def export_response(request, name):
+    """
+    Build a streaming download response for a DRF export action.
+
+    The format comes from content negotiation (``?format=`` or the Accept
+    header); ``region_id``, ``start`` and ``end`` query parameters filter rows.
+    """
+    export_format = request.accepted_renderer.format
+    params = request.query_params
+    try:
+        region_id = int(params["region_id"]) if params.get("region_id") else None
+        start = parse_time_bound(params.get("start"))
+        end = parse_time_bound(params.get("end"), end_of_day=True)
+        chunks = stream_export(name, export_format, region_id, start, end)
+    except (ValueError, ExportError) as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    response = streaming_response(
+        request, chunks, content_type=CONTENT_TYPES[export_format]
+    )
+    response["Content-Disposition"] = f'attachment; filename="{name}.{export_format}"'
+    return response
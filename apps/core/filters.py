@@ -0,0 +1,32 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .exports import parse_time_bound
+
+
+class RegionTimeRangeFilter(BaseFilterBackend):
+    """
+    Filter time-series rows by ``region_id`` and a ``start``/``end`` range.
+
+    Filtering on region plus time matches the (region, time) indexes of the
+    time-series tables. The view names the time column with ``time_field``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        time_field = view.time_field
+
+        try:
+            region_id = int(params["region_id"]) if params.get("region_id") else None
+            start = parse_time_bound(params.get("start"))
+            end = parse_time_bound(params.get("end"), end_of_day=True)
+        except ValueError as e:
+            raise ValidationError({"error": str(e)})
+
+        if region_id is not None:
+            queryset = queryset.filter(region_id=region_id)
+        if start:
+            queryset = queryset.filter(**{f"{time_field}__gte": start})
+        if end:
+            queryset = queryset.filter(**{f"{time_field}__lte": end})
+        return queryset
@@ -0,0 +1,82 @@
+"""
+Import-time measurement of the application entry points.
+
+Runs ``python -X importtime`` in a fresh interpreter, importing Django and
+the given module the way a worker boots, and aggregates the self time of
+every imported module by top-level package.
+"""
+
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+
+# Packages that must not be imported at startup (see apps.core.lazy)
+HEAVY_PACKAGES = ("numpy", "scipy", "xgboost", "pandas", "sklearn", "joblib")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(output):
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        List of (module name, self microseconds, cumulative microseconds)
+    """
+    modules = []
+    for line in output.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, _, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us)))
+    return modules
+
+
+def aggregate_by_package(modules):
+    """Total self time and module count per top-level package, slowest first."""
+    packages = {}
+    for name, self_us, _ in modules:
+        package = packages.setdefault(
+            name.split(".")[0],
+            {"package": name.split(".")[0], "self_us": 0, "modules": 0},
+        )
+        package["self_us"] += self_us
+        package["modules"] += 1
+    return sorted(packages.values(), key=lambda package: -package["self_us"])
+
+
+def measure(module="config.urls"):
+    """
+    Import Django and ``module`` in a fresh interpreter under -X importtime.
+
+    Returns:
+        Dictionary with the ``module``, the ``total_ms`` spent importing and
+        the ``packages`` breakdown
+
+    Raises:
+        RuntimeError: If the import fails
+    """
+    code = f"import django; django.setup(); import {module}"
+    env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    modules = parse_importtime(result.stderr)
+    return {
+        "module": module,
+        "total_ms": round(sum(self_us for _, self_us, _ in modules) / 1000, 1),
+        "packages": [
+            {**package, "self_ms": round(package.pop("self_us") / 1000, 1)}
+            for package in aggregate_by_package(modules)
+        ],
+    }
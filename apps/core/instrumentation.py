@@ -0,0 +1,270 @@
+"""
+Lightweight per-request instrumentation.
+
+``InstrumentationMiddleware`` records, for every request, the number and
+duration of SQL queries, the number and duration of upstream (weather
+provider) calls and the total latency. Results are aggregated into
+per-route histograms kept in process memory, and requests exceeding the
+configured budgets are logged.
+
+SQL queries are counted by an execute wrapper installed on every database
+connection; upstream calls are counted by wrapping them in
+``record_upstream``. Both attribute their cost to the current request through
+a context variable, so work done in ``sync_to_async`` threads or concurrent
+tasks of an async view is still accounted to the request that started it.
+"""
+
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+_current = ContextVar("request_stats", default=None)
+
+
+class RequestStats:
+    """Cost of a single request, filled in while it runs (times in seconds)."""
+
+    def __init__(self):
+        self.queries = 0
+        self.query_time = 0.0
+        self.upstream_calls = 0
+        self.upstream_time = 0.0
+        self.latency = 0.0
+
+
+def current_stats():
+    """Stats of the request being handled, or None outside a request."""
+    return _current.get()
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper attributing query time to the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_time += time.perf_counter() - start
+
+
+def install_query_wrapper(connection):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def instrument_connection(sender, connection, **kwargs):
+    install_query_wrapper(connection)
+
+
+@contextmanager
+def record_upstream(provider):
+    """
+    Account an upstream HTTP call to the current request.
+
+    Wrap the call together with its ``raise_for_status()`` so that failures
+    are seen as exceptions. Calls are also counted in the provider metrics,
+    inside or outside a request.
+    """
+    stats = _current.get()
+    outcome = "failure"
+    start = time.perf_counter()
+    try:
+        yield
+        outcome = "success"
+    finally:
+        elapsed = time.perf_counter() - start
+        metrics.WEATHER_FETCHES.labels(provider, outcome).inc()
+        metrics.WEATHER_FETCH_SECONDS.labels(provider).observe(elapsed)
+        if stats is not None:
+            stats.upstream_calls += 1
+            stats.upstream_time += elapsed
+
+
+class Histogram:
+    """Fixed-bucket histogram (cumulative bucket counts, like Prometheus)."""
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def as_dict(self):
+        buckets = {}
+        total = 0
+        for bound, count in zip(self.bounds, self.counts):
+            total += count
+            buckets[str(bound)] = total
+        buckets["+Inf"] = self.count
+        return {"count": self.count, "sum": round(self.sum, 3), "buckets": buckets}
+
+
+class RouteStats:
+    """Aggregated request costs of one route."""
+
+    def __init__(self):
+        self.over_budget = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(COUNT_BUCKETS)
+        self.query_time_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.upstream_calls = Histogram(COUNT_BUCKETS)
+        self.upstream_time_ms = Histogram(LATENCY_BUCKETS_MS)
+
+    def observe(self, stats, over_budget):
+        self.latency_ms.observe(stats.latency * 1000)
+        self.queries.observe(stats.queries)
+        self.query_time_ms.observe(stats.query_time * 1000)
+        self.upstream_calls.observe(stats.upstream_calls)
+        self.upstream_time_ms.observe(stats.upstream_time * 1000)
+        if over_budget:
+            self.over_budget += 1
+
+    def as_dict(self):
+        return {
+            "requests": self.latency_ms.count,
+            "over_budget": self.over_budget,
+            "latency_ms": self.latency_ms.as_dict(),
+            "queries": self.queries.as_dict(),
+            "query_time_ms": self.query_time_ms.as_dict(),
+            "upstream_calls": self.upstream_calls.as_dict(),
+            "upstream_time_ms": self.upstream_time_ms.as_dict(),
+        }
+
+
+_routes = {}
+_routes_lock = threading.Lock()
+
+
+def route_stats():
+    """Snapshot of the aggregated stats of every route seen by this process."""
+    with _routes_lock:
+        return {route: stats.as_dict() for route, stats in sorted(_routes.items())}
+
+
+def reset_route_stats():
+    with _routes_lock:
+        _routes.clear()
+
+
+def get_budget(view_name):
+    """Budgets of a view: REQUEST_BUDGETS[view_name] over the default budgets."""
+    budget = {
+        "queries": settings.REQUEST_BUDGET_QUERIES,
+        "upstream_calls": settings.REQUEST_BUDGET_UPSTREAM_CALLS,
+        "latency_ms": settings.REQUEST_BUDGET_LATENCY_MS,
+    }
+    budget.update(settings.REQUEST_BUDGETS.get(view_name, {}))
+    return budget
+
+
+def exceeded_budgets(stats, budget):
+    """Names of the budgets exceeded by a request."""
+    values = {
+        "queries": stats.queries,
+        "upstream_calls": stats.upstream_calls,
+        "latency_ms": stats.latency * 1000,
+    }
+    return [name for name, value in values.items() if value > budget[name]]
+
+
+def route_name(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "<unresolved>"
+    return match.view_name or match.route
+
+
+def observe_request(request, stats):
+    """Aggregate a finished request and log it if it exceeded its budgets."""
+    route = route_name(request)
+    exceeded = exceeded_budgets(stats, get_budget(route))
+
+    with _routes_lock:
+        if route not in _routes:
+            _routes[route] = RouteStats()
+        _routes[route].observe(stats, bool(exceeded))
+
+    metrics.HTTP_REQUEST_SECONDS.labels(route).observe(stats.latency)
+    metrics.HTTP_REQUEST_QUERIES.labels(route).observe(stats.queries)
+    metrics.HTTP_REQUEST_UPSTREAM_CALLS.labels(route).observe(stats.upstream_calls)
+
+    if exceeded:
+        logger.warning(
+            f"Request over budget ({', '.join(exceeded)}): {request.method} "
+            f"{request.path} [{route}] latency={stats.latency * 1000:.1f}ms "
+            f"queries={stats.queries} ({stats.query_time * 1000:.1f}ms) "
+            f"upstream={stats.upstream_calls} ({stats.upstream_time * 1000:.1f}ms)"
+        )
+
+
+class InstrumentationMiddleware:
+    """Record query, upstream and latency costs of every request."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.INSTRUMENTATION_ENABLED
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        # Connections opened before instrumentation was set up
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(connection)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            stats.latency = time.perf_counter() - start
+            _current.reset(token)
+            observe_request(request, stats)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            stats.latency = time.perf_counter() - start
+            _current.reset(token)
+            observe_request(request, stats)
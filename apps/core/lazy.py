@@ -0,0 +1,47 @@
+"""
+Lazy imports of the scientific stack.
+
+numpy, scipy and xgboost (which pulls in pandas and scikit-learn) take most
+of the time needed to import the URL configuration. Modules that only need
+them inside functions bind a ``LazyModule`` instead::
+
+    np = lazy_import("numpy")
+    stats = lazy_import("scipy.stats")
+
+The real module is imported on first attribute access, so every management
+command, migration and worker boot that never scores a prediction skips it.
+"""
+
+import importlib
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module, imported on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module {self._name!r} ({state})>"
+
+
+def lazy_import(name):
+    """Return a LazyModule for ``name`` (a dotted module path)."""
+    return LazyModule(name)
@@ -0,0 +1,205 @@
+"""
+Async HTTP load generator for capacity planning.
+
+Virtual users repeatedly request endpoints picked from a weighted mix, with
+a think time between requests. The number of users follows a ramp profile
+of stages: each stage moves linearly from the previous user count to its
+target over its duration (``"30s:50"`` ramps to 50 users in 30 seconds).
+Latency, status and errors are recorded per endpoint and summarized as
+throughput, p50/p95/p99 latency and error rate.
+"""
+
+import asyncio
+import logging
+import random
+import time
+
+import httpx
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ENDPOINTS = {
+    "dashboard": "/predictions/",
+    "predictions": "/predictions/api/results/",
+}
+
+CONTROL_INTERVAL = 0.1
+
+
+def parse_mix(spec):
+    """
+    Parse an endpoint mix like ``"dashboard=1,predictions=3"``.
+
+    Returns:
+        List of (endpoint name, weight) tuples
+
+    Raises:
+        ValueError: For unknown endpoints or invalid weights
+    """
+    mix = []
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in ENDPOINTS:
+            raise ValueError(
+                f"Unknown endpoint {name!r} (choose from {', '.join(ENDPOINTS)})"
+            )
+        weight = float(weight or 1)
+        if weight <= 0:
+            raise ValueError(f"Weight of {name!r} must be positive")
+        mix.append((name, weight))
+    return mix
+
+
+def parse_profile(spec):
+    """
+    Parse a ramp profile like ``"10s:10,60s:10,30s:100"``.
+
+    Returns:
+        List of (duration seconds, target users) stages
+    """
+    stages = []
+    for item in spec.split(","):
+        duration, _, users = item.strip().partition(":")
+        seconds = float(duration.rstrip("s"))
+        if seconds <= 0 or int(users) < 0:
+            raise ValueError(f"Invalid stage {item!r}")
+        stages.append((seconds, int(users)))
+    if not stages:
+        raise ValueError("The profile needs at least one stage")
+    return stages
+
+
+def target_users(stages, elapsed):
+    """Number of virtual users the profile asks for ``elapsed`` seconds in."""
+    previous = 0
+    for duration, users in stages:
+        if elapsed < duration:
+            return round(previous + (users - previous) * elapsed / duration)
+        elapsed -= duration
+        previous = users
+    return previous
+
+
+class EndpointStats:
+    """Results of the requests made to one endpoint."""
+
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.status_codes = {}
+
+    def record(self, latency, status=None):
+        self.latencies.append(latency)
+        key = str(status) if status is not None else "connection_error"
+        self.status_codes[key] = self.status_codes.get(key, 0) + 1
+        if status is None or status >= 400:
+            self.errors += 1
+
+    def summary(self, duration):
+        requests = len(self.latencies)
+        summary = {
+            "requests": requests,
+            "errors": self.errors,
+            "error_rate": round(self.errors / requests, 4) if requests else 0,
+            "throughput_rps": round(requests / duration, 2) if duration else 0,
+            "status_codes": dict(sorted(self.status_codes.items())),
+        }
+        if requests:
+            latencies_ms = np.array(self.latencies) * 1000
+            p50, p95, p99 = np.percentile(latencies_ms, [50, 95, 99])
+            summary["latency_ms"] = {
+                "p50": round(float(p50), 1),
+                "p95": round(float(p95), 1),
+                "p99": round(float(p99), 1),
+                "mean": round(float(latencies_ms.mean()), 1),
+                "max": round(float(latencies_ms.max()), 1),
+            }
+        return summary
+
+
+async def virtual_user(client, mix, stats, think_time, rng):
+    names = [name for name, _ in mix]
+    weights = [weight for _, weight in mix]
+    while True:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await client.get(ENDPOINTS[name])
+            stats[name].record(time.perf_counter() - start, response.status_code)
+        except httpx.HTTPError as e:
+            logger.debug(f"Request to {name} failed: {e}")
+            stats[name].record(time.perf_counter() - start)
+        if think_time:
+            # Jitter keeps users from requesting in lockstep
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think_time)
+
+
+async def run_load(
+    base_url, mix, stages, auth=None, think_time=0.5, timeout=30.0, seed=None
+):
+    """
+    Run a load test and return its report.
+
+    Args:
+        base_url: Root URL of the server under test
+        mix: List of (endpoint name, weight) tuples
+        stages: Ramp profile, list of (duration seconds, target users)
+        auth: Optional (username, password) for HTTP Basic authentication
+        think_time: Mean pause of a user between requests, in seconds
+        timeout: Request timeout in seconds (timeouts count as errors)
+        seed: Seed of the endpoint choices and think times
+    """
+    rng = random.Random(seed)
+    stats = {name: EndpointStats() for name, _ in mix}
+    users = []
+    total_duration = sum(duration for duration, _ in stages)
+    peak_users = 0
+
+    async with httpx.AsyncClient(
+        base_url=base_url,
+        auth=auth,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=None, max_keepalive_connections=None),
+    ) as client:
+        start = time.perf_counter()
+        try:
+            while (elapsed := time.perf_counter() - start) < total_duration:
+                target = target_users(stages, elapsed)
+                while len(users) < target:
+                    user_rng = random.Random(rng.random())
+                    users.append(
+                        asyncio.create_task(
+                            virtual_user(client, mix, stats, think_time, user_rng)
+                        )
+                    )
+                while len(users) > target:
+                    users.pop().cancel()
+                peak_users = max(peak_users, len(users))
+                await asyncio.sleep(CONTROL_INTERVAL)
+        finally:
+            for user in users:
+                user.cancel()
+            await asyncio.gather(*users, return_exceptions=True)
+        duration = time.perf_counter() - start
+
+    total = EndpointStats()
+    for endpoint_stats in stats.values():
+        total.latencies.extend(endpoint_stats.latencies)
+        total.errors += endpoint_stats.errors
+        for status, count in endpoint_stats.status_codes.items():
+            total.status_codes[status] = total.status_codes.get(status, 0) + count
+
+    return {
+        "base_url": base_url,
+        "duration_s": round(duration, 2),
+        "profile": [{"duration_s": d, "users": u} for d, u in stages],
+        "peak_users": peak_users,
+        "think_time_s": think_time,
+        "mix": {name: weight for name, weight in mix},
+        "endpoints": {
+            name: endpoint_stats.summary(duration)
+            for name, endpoint_stats in stats.items()
+        },
+        "total": total.summary(duration),
+    }
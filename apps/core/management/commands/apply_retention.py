@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.retention import apply_retention
+
+
+class Command(BaseCommand):
+    help = (
+        "Compact old weather observations into daily rollups, expire old "
+        "predictions and maintain time partitions"
+    )
+
+    def handle(self, *args, **options):
+        results = apply_retention()
+        for table, result in results.items():
+            summary = ", ".join(f"{key}={value}" for key, value in result.items())
+            self.stdout.write(f"{table}: {summary}")
+        self.stdout.write(self.style.SUCCESS("Retention policy applied"))
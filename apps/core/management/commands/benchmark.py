@@ -0,0 +1,102 @@
+import logging
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings, setup_databases, teardown_databases
+
+from apps.core.benchmarking import (
+    DEFAULT_THRESHOLD,
+    compare,
+    get_benchmarks,
+    load_baselines,
+    run_benchmarks,
+    save_baselines,
+)
+
+DEFAULT_BASELINES = Path(settings.BASE_DIR) / "benchmarks" / "baselines.json"
+
+
+class Command(BaseCommand):
+    help = (
+        "Run the hot path benchmarks against a freshly created test database "
+        "and compare them with the stored baselines"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-k", dest="pattern", help="Only run benchmarks whose name contains this"
+        )
+        parser.add_argument("--baselines", default=str(DEFAULT_BASELINES))
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=DEFAULT_THRESHOLD,
+            help="Fail when a median is this much slower than its baseline "
+            "(0.25 = 25%%)",
+        )
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument(
+            "--min-time",
+            type=float,
+            default=0.2,
+            help="Minimum duration in seconds of each timed round",
+        )
+        parser.add_argument(
+            "--save",
+            action="store_true",
+            help="Store the results as the new baselines instead of comparing",
+        )
+
+    def handle(self, *args, **options):
+        benchmarks = get_benchmarks(options["pattern"])
+        if not benchmarks:
+            raise CommandError("No benchmarks match")
+
+        baselines = load_baselines(options["baselines"])
+
+        def report(case, timing):
+            line = f"{case:<48} {timing['median'] * 1e6:>12.1f} us"
+            baseline = baselines.get(case)
+            if baseline:
+                line += f"  ({timing['median'] / baseline['median']:.2f}x baseline)"
+            self.stdout.write(line)
+
+        old_config = setup_databases(verbosity=0, interactive=False)
+        logging.disable(logging.INFO)
+        try:
+            # Rendering must not depend on collected static files
+            with override_settings(
+                STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+            ):
+                results = run_benchmarks(
+                    benchmarks,
+                    repeat=options["repeat"],
+                    min_time=options["min_time"],
+                    on_result=report,
+                )
+        finally:
+            logging.disable(logging.NOTSET)
+            teardown_databases(old_config, verbosity=0)
+
+        if options["save"]:
+            save_baselines(options["baselines"], results)
+            self.stdout.write(
+                self.style.SUCCESS(f"Saved baselines to {options['baselines']}")
+            )
+            return
+
+        regressions = compare(results, baselines, options["threshold"])
+        for case, baseline, current, ratio in regressions:
+            self.stderr.write(
+                self.style.ERROR(
+                    f"Regression: {case} {baseline * 1e6:.1f} us -> "
+                    f"{current * 1e6:.1f} us ({ratio:.2f}x)"
+                )
+            )
+        if regressions:
+            raise CommandError(
+                f"{len(regressions)} benchmarks regressed by more than "
+                f"{options['threshold']:.0%}"
+            )
+        self.stdout.write(self.style.SUCCESS("No regressions"))
@@ -0,0 +1,56 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.exports import EXPORTS, ExportError, parse_time_bound, stream_export
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream weather observations or prediction history to NDJSON, CSV, "
+        "Parquet, MessagePack or Arrow"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=sorted(EXPORTS))
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=["ndjson", "csv", "parquet", "msgpack", "arrow"],
+            default="ndjson",
+        )
+        parser.add_argument(
+            "--output", "-o", help="Output file (defaults to standard output)"
+        )
+        parser.add_argument("--region-id", type=int)
+        parser.add_argument("--start", help="ISO date or datetime (inclusive)")
+        parser.add_argument("--end", help="ISO date or datetime (inclusive)")
+
+    def handle(self, *args, **options):
+        try:
+            chunks = stream_export(
+                options["dataset"],
+                options["export_format"],
+                region_id=options["region_id"],
+                start=parse_time_bound(options["start"]),
+                end=parse_time_bound(options["end"], end_of_day=True),
+            )
+        except (ValueError, ExportError) as e:
+            raise CommandError(str(e))
+
+        binary = options["export_format"] in ("parquet", "msgpack", "arrow")
+        if options["output"]:
+            mode = "wb" if binary else "w"
+            encoding = None if binary else "utf-8"
+            with open(options["output"], mode, encoding=encoding, newline="") as out:
+                for chunk in chunks:
+                    out.write(chunk)
+            self.stderr.write(self.style.SUCCESS(f"Exported to {options['output']}"))
+            return
+
+        for chunk in chunks:
+            if binary:
+                sys.stdout.buffer.write(chunk)
+            else:
+                self.stdout.write(chunk, ending="")
+        self.stdout.flush()
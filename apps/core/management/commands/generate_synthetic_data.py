@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.synthetic import delete_dataset, generate_dataset
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic regions, cities, forests, hourly weather and "
+        "wildfire events for scale testing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--regions", type=int, default=10)
+        parser.add_argument(
+            "--years", type=float, default=1, help="Length of the hourly history"
+        )
+        parser.add_argument("--cities-per-region", type=int, default=3)
+        parser.add_argument("--forests-per-region", type=int, default=4)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--event-rate",
+            type=float,
+            default=1.0,
+            help="Multiplier of the wildfire ignition probability",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument(
+            "--replace",
+            action="store_true",
+            help="Delete previously generated synthetic regions first",
+        )
+
+    def handle(self, *args, **options):
+        if options["regions"] < 1 or options["years"] <= 0:
+            raise CommandError("--regions and --years must be positive")
+
+        if options["replace"]:
+            deleted = delete_dataset()
+            self.stdout.write(f"Deleted {deleted} previously generated rows")
+
+        def progress(done, total):
+            self.stdout.write(f"Generated region {done}/{total}")
+
+        counts = generate_dataset(
+            regions=options["regions"],
+            years=options["years"],
+            cities_per_region=options["cities_per_region"],
+            forests_per_region=options["forests_per_region"],
+            seed=options["seed"],
+            event_rate=options["event_rate"],
+            batch_size=options["batch_size"],
+            progress=progress if options["verbosity"] > 1 else None,
+        )
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Created {summary}"))
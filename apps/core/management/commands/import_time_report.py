@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.importtime import HEAVY_PACKAGES, measure
+
+
+class Command(BaseCommand):
+    help = (
+        "Report the import time of an entry point by package and fail if "
+        "heavy packages are imported at startup or a time budget is exceeded"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--module", default="config.urls")
+        parser.add_argument("--top", type=int, default=15)
+        parser.add_argument(
+            "--forbid",
+            default=",".join(HEAVY_PACKAGES),
+            help="Comma-separated packages that must not be imported "
+            "(empty to allow all)",
+        )
+        parser.add_argument(
+            "--max-ms", type=float, help="Fail when the total import time exceeds this"
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the report as JSON"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = measure(options["module"])
+        except RuntimeError as e:
+            raise CommandError(str(e))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(
+                f"Importing {report['module']} took {report['total_ms']:.1f} ms"
+            )
+            for package in report["packages"][: options["top"]]:
+                self.stdout.write(
+                    f"{package['package']:<32} {package['self_ms']:>9.1f} ms "
+                    f"{package['modules']:>5} modules"
+                )
+
+        forbidden = {name for name in options["forbid"].split(",") if name}
+        loaded = sorted(
+            package["package"]
+            for package in report["packages"]
+            if package["package"] in forbidden
+        )
+        if loaded:
+            raise CommandError(
+                f"Heavy packages imported at startup: {', '.join(loaded)}"
+            )
+        if options["max_ms"] is not None and report["total_ms"] > options["max_ms"]:
+            raise CommandError(
+                f"Import time {report['total_ms']:.1f} ms exceeds "
+                f"{options['max_ms']:.1f} ms"
+            )
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import httpx
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core.loadtest import parse_mix, parse_profile, run_load
+from apps.core.synthetic import create_regions, delete_dataset
+from apps.weather.fake_provider import start_in_thread
+
+SEEDED_REGION_PREFIX = "Load test region"
+
+
+def seed_regions(count, seed=0):
+    """Replace previously seeded load test regions with ``count`` new ones."""
+    delete_dataset(SEEDED_REGION_PREFIX)
+    create_regions(count, np.random.default_rng(seed), SEEDED_REGION_PREFIX)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_until_ready(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(base_url, timeout=1)
+            return
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    raise CommandError(f"Server at {base_url} did not start in {timeout}s")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate load against the dashboard and prediction API and write "
+        "throughput, latency percentiles and error rates per endpoint to JSON"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument(
+            "--profile",
+            default="10s:10,30s:10,10s:50,30s:50",
+            help="Ramp stages as duration:users, e.g. 10s:10,60s:10,30s:100",
+        )
+        parser.add_argument(
+            "--mix",
+            default="dashboard=1,predictions=1",
+            help="Endpoint weights, e.g. dashboard=1,predictions=3",
+        )
+        parser.add_argument("--think-time", type=float, default=0.5)
+        parser.add_argument("--timeout", type=float, default=30)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--username", help="User for HTTP Basic auth on the prediction API"
+        )
+        parser.add_argument("--password")
+        parser.add_argument(
+            "--seed-regions",
+            type=int,
+            help="Replace the seeded load test regions with this many regions "
+            "(and create --username if missing)",
+        )
+        parser.add_argument(
+            "--serve",
+            action="store_true",
+            help="Start the fake weather provider and a local ASGI server "
+            "using it instead of targeting --base-url",
+        )
+        parser.add_argument("--workers", type=int, default=1)
+        parser.add_argument(
+            "--provider-latency-ms",
+            type=float,
+            default=0,
+            help="Latency of the fake weather provider (with --serve)",
+        )
+        parser.add_argument("--output", "-o", default="loadtest-report.json")
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+            stages = parse_profile(options["profile"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        auth = None
+        if options["username"]:
+            auth = (options["username"], options["password"] or "")
+
+        if options["seed_regions"] is not None:
+            seed_regions(options["seed_regions"], options["seed"])
+            if auth and not User.objects.filter(username=auth[0]).exists():
+                User.objects.create_user(auth[0], password=auth[1])
+            self.stdout.write(f"Seeded {options['seed_regions']} regions")
+
+        server = provider = None
+        base_url = options["base_url"]
+        if options["serve"]:
+            provider, provider_url = start_in_thread(
+                latency=options["provider_latency_ms"] / 1000
+            )
+            port = free_port()
+            base_url = f"http://127.0.0.1:{port}"
+            env = {
+                **os.environ,
+                "OPENWEATHERMAP_API_URL": provider_url,
+                "WEATHER_API_URL": provider_url,
+                "OPENWEATHERMAP_API_KEY": os.getenv("OPENWEATHERMAP_API_KEY")
+                or "loadtest",
+                "WEATHER_API_KEY": os.getenv("WEATHER_API_KEY") or "loadtest",
+                "SECURE_SSL_REDIRECT": "False",
+            }
+            server = subprocess.Popen(
+                [
+                    sys.executable,
+                    "-m",
+                    "uvicorn",
+                    "config.asgi:application",
+                    "--port",
+                    str(port),
+                    "--workers",
+                    str(options["workers"]),
+                    "--log-level",
+                    "warning",
+                ],
+                env=env,
+            )
+
+        try:
+            if server is not None:
+                wait_until_ready(base_url)
+            self.stdout.write(f"Running load test against {base_url}")
+            report = asyncio.run(
+                run_load(
+                    base_url,
+                    mix,
+                    stages,
+                    auth=auth,
+                    think_time=options["think_time"],
+                    timeout=options["timeout"],
+                    seed=options["seed"],
+                )
+            )
+        finally:
+            if server is not None:
+                server.terminate()
+                server.wait()
+            if provider is not None:
+                provider.shutdown()
+
+        with open(options["output"], "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+            f.write("\n")
+
+        for name, summary in {**report["endpoints"], "total": report["total"]}.items():
+            latency = summary.get("latency_ms", {})
+            self.stdout.write(
+                f"{name:<12} {summary['requests']:>7} req "
+                f"{summary['throughput_rps']:>8.1f} req/s "
+                f"p50={latency.get('p50', 0):.0f}ms p95={latency.get('p95', 0):.0f}ms "
+                f"p99={latency.get('p99', 0):.0f}ms "
+                f"errors={summary['error_rate']:.1%}"
+            )
+        self.stdout.write(self.style.SUCCESS(f"Report written to {options['output']}"))
@@ -0,0 +1,120 @@
+"""
+Operational metrics in the Prometheus text exposition format.
+
+Metrics are plain ``prometheus_client`` counters and histograms. When the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable is set (see
+``gunicorn.conf.py``), every worker process writes its samples to that
+directory and the ``/metrics`` endpoint aggregates all of them, so a scrape
+sees the whole server rather than whichever worker answered.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+BATCH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+WEATHER_FETCHES = Counter(
+    "wildfire_weather_fetches_total",
+    "Calls to weather providers",
+    ["provider", "outcome"],
+)
+WEATHER_FETCH_SECONDS = Histogram(
+    "wildfire_weather_fetch_duration_seconds",
+    "Latency of calls to weather providers",
+    ["provider"],
+)
+WEATHER_ROWS_INGESTED = Counter(
+    "wildfire_weather_rows_ingested_total",
+    "Weather observations stored by ingestion cycles",
+)
+WEATHER_INGEST_CYCLE_ROWS = Histogram(
+    "wildfire_weather_ingest_cycle_rows",
+    "Weather observations stored per ingestion cycle",
+    buckets=COUNT_BUCKETS,
+)
+PREDICTIONS_COMPUTED = Counter(
+    "wildfire_predictions_computed_total",
+    "Predictions recorded",
+)
+PREDICTION_CYCLE_SIZE = Histogram(
+    "wildfire_prediction_cycle_predictions",
+    "Predictions recorded per prediction cycle",
+    buckets=COUNT_BUCKETS,
+)
+MODEL_INFERENCE_SECONDS = Histogram(
+    "wildfire_model_inference_duration_seconds",
+    "Latency of model inference calls",
+    ["model"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+)
+MODEL_INFERENCE_BATCH_SIZE = Histogram(
+    "wildfire_model_inference_batch_size",
+    "Number of rows scored per model inference call",
+    ["model"],
+    buckets=BATCH_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "wildfire_cache_requests_total",
+    "Cache lookups by cache and result (hit ratio = hit / (hit + miss))",
+    ["cache", "result"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "wildfire_http_request_duration_seconds",
+    "Latency of HTTP requests by route",
+    ["route"],
+)
+HTTP_REQUEST_QUERIES = Histogram(
+    "wildfire_http_request_db_queries",
+    "SQL queries per HTTP request by route",
+    ["route"],
+    buckets=COUNT_BUCKETS,
+)
+HTTP_REQUEST_UPSTREAM_CALLS = Histogram(
+    "wildfire_http_request_upstream_calls",
+    "Upstream calls per HTTP request by route",
+    ["route"],
+    buckets=COUNT_BUCKETS,
+)
+
+
+def record_cache(cache, hit, count=1):
+    """Count ``count`` lookups of ``cache`` as hits or misses."""
+    if count:
+        CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc(count)
+
+
+def record_ingest_cycle(rows):
+    """Record the number of weather observations stored by one ingestion cycle."""
+    WEATHER_ROWS_INGESTED.inc(rows)
+    WEATHER_INGEST_CYCLE_ROWS.observe(rows)
+
+
+def record_prediction_cycle(count):
+    """Record the number of predictions stored by one prediction cycle."""
+    PREDICTIONS_COMPUTED.inc(count)
+    PREDICTION_CYCLE_SIZE.observe(count)
+
+
+def exposition():
+    """
+    Render all metrics in the text exposition format.
+
+    Returns:
+        Tuple of (body bytes, content type)
+    """
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
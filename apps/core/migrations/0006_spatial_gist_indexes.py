@@ -0,0 +1,34 @@
+# Generated manually
+
+from django.db import migrations
+
+# GiST indexes over the point expression queried by apps.core.spatial. Only
+# PostgreSQL supports them; other databases use the in-memory index.
+TABLES = ("core_region", "core_city")
+
+
+def create_gist_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_point_gist "
+            f"ON {table} USING gist (point(longitude, latitude))"
+        )
+
+
+def drop_gist_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table in TABLES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {table}_point_gist")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0005_merge_20250404_1643"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_gist_indexes, drop_gist_indexes),
+    ]
@@ -0,0 +1,81 @@
+# Generated by Django 5.0.1 on 2026-10-19 13:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0006_spatial_gist_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WildfireEventRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year", models.PositiveSmallIntegerField()),
+                ("month", models.PositiveSmallIntegerField()),
+                ("event_count", models.PositiveIntegerField()),
+                (
+                    "area_affected",
+                    models.FloatField(
+                        help_text="Total area affected in square kilometers"
+                    ),
+                ),
+                ("low_count", models.PositiveIntegerField(default=0)),
+                ("medium_count", models.PositiveIntegerField(default=0)),
+                ("high_count", models.PositiveIntegerField(default=0)),
+                ("extreme_count", models.PositiveIntegerField(default=0)),
+                (
+                    "contained_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of events with an end date"
+                    ),
+                ),
+                (
+                    "containment_hours",
+                    models.FloatField(
+                        default=0,
+                        help_text="Total hours from start to end of contained events",
+                    ),
+                ),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "ordering": ["region", "year", "month"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="wildfireevent",
+            index=models.Index(
+                fields=["region", "start_date"], name="core_event_region_start_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wildfireevent",
+            index=models.Index(fields=["start_date"], name="core_event_start_idx"),
+        ),
+        migrations.AddField(
+            model_name="wildfireeventrollup",
+            name="region",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE, to="core.region"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="wildfireeventrollup",
+            constraint=models.UniqueConstraint(
+                fields=("region", "year", "month"), name="core_event_rollup_uniq"
+            ),
+        ),
+    ]
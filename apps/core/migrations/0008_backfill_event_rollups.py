@@ -0,0 +1,22 @@
+# Generated manually
+
+from django.db import migrations
+
+from apps.core.eventstats import rebuild_rollups
+
+
+def backfill_event_rollups(apps, schema_editor):
+    rebuild_rollups(
+        event_model=apps.get_model("core", "WildfireEvent"),
+        rollup_model=apps.get_model("core", "WildfireEventRollup"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("core", "0007_wildfire_event_analytics"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_event_rollups, migrations.RunPython.noop),
+    ]
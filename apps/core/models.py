@@ -101,12 +101,56 @@ class WildfireEvent(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        pass
+        indexes = [
+            models.Index(
+                fields=["region", "start_date"], name="core_event_region_start_idx"
+            ),
+            models.Index(fields=["start_date"], name="core_event_start_idx"),
+        ]
 
     def __str__(self):
         return f"Wildfire at {self.region.name} on {self.start_date.date()}"
 
 
+class WildfireEventRollup(models.Model):
+    """
+    Monthly aggregate of a region's wildfire events, by start date.
+
+    Yearly and month-of-year analytics sum these rows instead of scanning the
+    events (see apps.core.eventstats, which keeps them up to date).
+    """
+
+    region = models.ForeignKey(Region, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    event_count = models.PositiveIntegerField()
+    area_affected = models.FloatField(
+        help_text="Total area affected in square kilometers"
+    )
+    low_count = models.PositiveIntegerField(default=0)
+    medium_count = models.PositiveIntegerField(default=0)
+    high_count = models.PositiveIntegerField(default=0)
+    extreme_count = models.PositiveIntegerField(default=0)
+    contained_count = models.PositiveIntegerField(
+        default=0, help_text="Number of events with an end date"
+    )
+    containment_hours = models.FloatField(
+        default=0, help_text="Total hours from start to end of contained events"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["region", "year", "month"], name="core_event_rollup_uniq"
+            )
+        ]
+        ordering = ["region", "year", "month"]
+
+    def __str__(self):
+        return f"Wildfire events in {self.region.name} in {self.year}-{self.month:02d}"
+
+
 class Forest(models.Model):
     name = models.CharField(max_length=100)
     region = models.ForeignKey(
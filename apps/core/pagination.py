@@ -0,0 +1,123 @@
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Newest-first keyset pagination on (time field, id).
+
+    Each page is fetched with a ``WHERE (time, id) < (cursor)`` condition and a
+    LIMIT, so it costs the same whatever its depth; no COUNT(*) or OFFSET is
+    issued. The view names the time column with a ``time_field`` attribute.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 1000
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def encode_cursor(self, timestamp, pk):
+        value = f"{timestamp.isoformat()}|{pk}"
+        return base64.urlsafe_b64encode(value.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            timestamp, pk = (
+                base64.urlsafe_b64decode(encoded.encode()).decode().split("|")
+            )
+            timestamp = parse_datetime(timestamp)
+            if timestamp is None:
+                raise ValueError
+            return timestamp, int(pk)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def page_queryset(self, queryset, request, view):
+        """Order ``queryset`` and keep the rows after the request's cursor."""
+        self.request = request
+        self.time_field = view.time_field
+        self.page_size_value = self.get_page_size(request)
+
+        queryset = queryset.order_by(f"-{self.time_field}", "-pk")
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            timestamp, pk = cursor
+            # The redundant upper bound lets the database seek the (time, id)
+            # index to the cursor instead of scanning it from the newest row
+            queryset = queryset.filter(
+                Q(**{f"{self.time_field}__lte": timestamp})
+                & (
+                    Q(**{f"{self.time_field}__lt": timestamp})
+                    | Q(**{self.time_field: timestamp, "pk__lt": pk})
+                )
+            )
+        return queryset
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.page_queryset(queryset, request, view)
+        rows = list(queryset[: self.page_size_value + 1])
+        self.has_next = len(rows) > self.page_size_value
+        self.page = rows[: self.page_size_value]
+        if self.page:
+            last = self.page[-1]
+            self.last_key = (getattr(last, self.time_field), last.pk)
+        return self.page
+
+    def paginate_values(self, queryset, request, view, fields):
+        """
+        Like paginate_queryset, but return the page as ``values_list`` tuples
+        of ``fields`` instead of model instances.
+        """
+        queryset = self.page_queryset(queryset, request, view)
+        rows = list(
+            queryset.values_list(*fields, self.time_field, "pk")[
+                : self.page_size_value + 1
+            ]
+        )
+        self.has_next = len(rows) > self.page_size_value
+        self.page = [row[:-2] for row in rows[: self.page_size_value]]
+        if self.page:
+            self.last_key = rows[len(self.page) - 1][-2:]
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(*self.last_key),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([("next", self.get_next_link()), ("results", data)])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
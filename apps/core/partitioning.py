@@ -0,0 +1,200 @@
+"""
+Monthly range partitioning helpers for PostgreSQL.
+
+Time-series tables (weather observations, prediction history) are partitioned
+by month on PostgreSQL so that expired data can be dropped a partition at a
+time. On every other database backend these helpers are no-ops and retention
+falls back to chunked deletes (see ``apps.core.retention``).
+"""
+
+import logging
+import re
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import DatabaseError, connection, transaction
+
+logger = logging.getLogger(__name__)
+
+PARTITION_SUFFIX_RE = re.compile(r"_p(\d{4})(\d{2})$")
+
+
+def supports_partitioning(conn=None):
+    """Return True if the database backend supports declarative partitioning."""
+    conn = conn or connection
+    return conn.vendor == "postgresql"
+
+
+def month_start(value):
+    """Return the first instant (UTC) of the month containing ``value``."""
+    return datetime(value.year, value.month, 1, tzinfo=dt_timezone.utc)
+
+
+def add_months(value, months):
+    """Shift a month-start datetime by a number of months."""
+    month_index = value.year * 12 + value.month - 1 + months
+    return datetime(month_index // 12, month_index % 12 + 1, 1, tzinfo=dt_timezone.utc)
+
+
+def partition_name(table, start):
+    """Return the partition table name for the month starting at ``start``."""
+    return f"{table}_p{start.year:04d}{start.month:02d}"
+
+
+def is_partitioned(table, conn=None):
+    """Check whether ``table`` is a partitioned table."""
+    conn = conn or connection
+    if not supports_partitioning(conn):
+        return False
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table pt "
+            "JOIN pg_class c ON c.oid = pt.partrelid WHERE c.relname = %s",
+            [table],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions(table, conn=None):
+    """
+    List the monthly partitions of ``table``.
+
+    Returns:
+        List of (partition name, range start, range end) tuples ordered by
+        range start. The default partition is not included.
+    """
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid "
+            "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = %s",
+            [table],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+
+    partitions = []
+    for name in names:
+        match = PARTITION_SUFFIX_RE.search(name)
+        if not match:
+            continue
+        start = datetime(
+            int(match.group(1)), int(match.group(2)), 1, tzinfo=dt_timezone.utc
+        )
+        partitions.append((name, start, add_months(start, 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+def create_partition(table, start, conn=None):
+    """
+    Create the monthly partition of ``table`` starting at ``start``.
+
+    Returns True if the partition was created. Creation is skipped (and logged)
+    if the default partition already holds rows for that month.
+    """
+    conn = conn or connection
+    name = partition_name(table, start)
+    qn = conn.ops.quote_name
+    try:
+        with transaction.atomic(using=conn.alias), conn.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE IF NOT EXISTS {qn(name)} PARTITION OF {qn(table)} "
+                f"FOR VALUES FROM (%s) TO (%s)",
+                [start, add_months(start, 1)],
+            )
+        return True
+    except DatabaseError as e:
+        logger.warning(f"Could not create partition {name}: {str(e)}")
+        return False
+
+
+def ensure_partitions(table, months_ahead, now, conn=None):
+    """Create partitions for the current month and ``months_ahead`` months after it."""
+    conn = conn or connection
+    if not is_partitioned(table, conn):
+        return 0
+
+    existing = {name for name, _, _ in list_partitions(table, conn)}
+    created = 0
+    start = month_start(now)
+    for offset in range(months_ahead + 1):
+        month = add_months(start, offset)
+        if partition_name(table, month) in existing:
+            continue
+        if create_partition(table, month, conn):
+            created += 1
+    return created
+
+
+def drop_partition(name, conn=None):
+    """Drop a single partition in constant time."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(f"DROP TABLE IF EXISTS {conn.ops.quote_name(name)}")
+
+
+def partition_table_by_month(
+    schema_editor, table, column, index_name, index_columns, months_ahead=3
+):
+    """
+    Convert an existing Django-managed table into a monthly range-partitioned table.
+
+    Used from migrations via RunPython. The table is recreated as a partitioned
+    parent with a (id, column) primary key, existing rows are copied into monthly
+    partitions and the original table is dropped. Does nothing on backends
+    without declarative partitioning.
+    """
+    conn = schema_editor.connection
+    if not supports_partitioning(conn) or is_partitioned(table, conn):
+        return
+
+    qn = conn.ops.quote_name
+    legacy = f"{table}_unpartitioned"
+    sequence = f"{table}_partitioned_id_seq"
+
+    schema_editor.execute(f"ALTER TABLE {qn(table)} RENAME TO {qn(legacy)}")
+    schema_editor.execute(
+        f"CREATE TABLE {qn(table)} (LIKE {qn(legacy)} INCLUDING DEFAULTS) "
+        f"PARTITION BY RANGE ({qn(column)})"
+    )
+    schema_editor.execute(f"ALTER TABLE {qn(table)} ADD PRIMARY KEY (id, {qn(column)})")
+
+    # The original identity column stays with the legacy table, so the parent
+    # gets its own sequence continuing from the highest existing id.
+    schema_editor.execute(f"CREATE SEQUENCE {qn(sequence)}")
+    schema_editor.execute(
+        f"SELECT setval('{sequence}', COALESCE((SELECT MAX(id) FROM {qn(legacy)}), 0) + 1, false)"
+    )
+    schema_editor.execute(
+        f"ALTER TABLE {qn(table)} ALTER COLUMN id SET DEFAULT nextval('{sequence}')"
+    )
+    schema_editor.execute(f"ALTER SEQUENCE {qn(sequence)} OWNED BY {qn(table)}.id")
+
+    schema_editor.execute(
+        f"ALTER TABLE {qn(table)} ADD CONSTRAINT {qn(table + '_region_id_fk')} "
+        f"FOREIGN KEY (region_id) REFERENCES {qn('core_region')} (id) "
+        f"DEFERRABLE INITIALLY DEFERRED"
+    )
+
+    with conn.cursor() as cursor:
+        cursor.execute(f"SELECT MIN({qn(column)}) FROM {qn(legacy)}")
+        oldest = cursor.fetchone()[0]
+
+    now = datetime.now(dt_timezone.utc)
+    month = month_start(oldest or now)
+    last = add_months(month_start(now), months_ahead)
+    while month <= last:
+        schema_editor.execute(
+            f"CREATE TABLE {qn(partition_name(table, month))} PARTITION OF {qn(table)} "
+            f"FOR VALUES FROM (%s) TO (%s)",
+            [month, add_months(month, 1)],
+        )
+        month = add_months(month, 1)
+    schema_editor.execute(
+        f"CREATE TABLE {qn(table + '_default')} PARTITION OF {qn(table)} DEFAULT"
+    )
+
+    schema_editor.execute(f"INSERT INTO {qn(table)} SELECT * FROM {qn(legacy)}")
+    schema_editor.execute(f"DROP TABLE {qn(legacy)}")
+
+    columns = ", ".join(qn(name) for name in index_columns)
+    schema_editor.execute(f"CREATE INDEX {qn(index_name)} ON {qn(table)} ({columns})")
@@ -0,0 +1,281 @@
+"""
+On-demand request profiling.
+
+``ProfilingMiddleware`` runs a request under cProfile when a staff user asks
+for it (``X-Profile: 1`` header or ``?profile=1``) or when the request is
+picked by ``PROFILING_SAMPLE_RATE``. Traces are kept in a bounded on-disk
+ring buffer (``PROFILING_DIR``, at most ``PROFILING_MAX_TRACES`` files, the
+oldest are dropped) and the profiled response carries an ``X-Profile-Id``
+header naming its trace. Staff can list traces and download them as pstats
+files (``python -m pstats``, snakeviz) or speedscope JSON (flamegraphs at
+https://www.speedscope.app).
+
+Profiling is off unless PROFILING_ENABLED is set. cProfile installs one
+profiler for the whole process, so at most one request is profiled at a
+time; requests arriving meanwhile run unprofiled. cProfile follows the
+thread that runs the view. Under ASGI, work an async view hands to
+``sync_to_async`` threads shows up as time spent awaiting, and the trace
+also includes whatever other coroutines run on the event loop while the
+request awaits.
+"""
+
+import cProfile
+import json
+import logging
+import os
+import pstats
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+from .instrumentation import route_name
+
+logger = logging.getLogger(__name__)
+
+TRACE_ID = re.compile(r"^[0-9]{8}T[0-9]{12}-[0-9a-f]{8}$")
+
+# Held while a request is profiled (a second profiler would replace the
+# first, or raise on Python 3.12+)
+PROFILE_LOCK = threading.Lock()
+
+
+def trace_dir():
+    return settings.PROFILING_DIR
+
+
+def trace_path(trace_id, extension):
+    if not TRACE_ID.match(trace_id):
+        raise ValueError(f"Invalid trace id: {trace_id}")
+    return os.path.join(trace_dir(), f"{trace_id}.{extension}")
+
+
+def save_trace(profile, metadata):
+    """
+    Store a finished profile with its metadata and drop the oldest traces
+    beyond PROFILING_MAX_TRACES.
+
+    Returns:
+        Id of the stored trace
+    """
+    os.makedirs(trace_dir(), exist_ok=True)
+    trace_id = f"{datetime.now(dt_timezone.utc):%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:8]}"
+    profile.dump_stats(trace_path(trace_id, "prof"))
+    with open(trace_path(trace_id, "json"), "w", encoding="utf-8") as f:
+        json.dump({"id": trace_id, **metadata}, f)
+
+    for old_id in list_trace_ids()[settings.PROFILING_MAX_TRACES :]:
+        delete_trace(old_id)
+    return trace_id
+
+
+def list_trace_ids():
+    """Ids of the stored traces, newest first."""
+    try:
+        names = os.listdir(trace_dir())
+    except FileNotFoundError:
+        return []
+    ids = [name[:-5] for name in names if name.endswith(".prof")]
+    return sorted(
+        (trace_id for trace_id in ids if TRACE_ID.match(trace_id)), reverse=True
+    )
+
+
+def delete_trace(trace_id):
+    for extension in ("prof", "json"):
+        try:
+            os.remove(trace_path(trace_id, extension))
+        except FileNotFoundError:
+            pass
+
+
+def list_traces():
+    """Metadata of the stored traces, newest first."""
+    traces = []
+    for trace_id in list_trace_ids():
+        try:
+            with open(trace_path(trace_id, "json"), encoding="utf-8") as f:
+                traces.append(json.load(f))
+        except (FileNotFoundError, ValueError):
+            traces.append({"id": trace_id})
+    return traces
+
+
+def load_stats(trace_id):
+    """pstats.Stats of a stored trace (FileNotFoundError if it was dropped)."""
+    return pstats.Stats(trace_path(trace_id, "prof"))
+
+
+def frame_name(func):
+    filename, line, name = func
+    return {"name": name, "file": filename, "line": line}
+
+
+def to_speedscope(stats, name="profile", min_weight=1e-6):
+    """
+    Convert cProfile stats into a speedscope sampled profile.
+
+    cProfile only records caller/callee pairs, not full stacks, so the time
+    of a function is split between its callers in proportion to the time
+    spent under each of them (the approach of flameprof and gprof2dot).
+
+    Returns:
+        Dictionary in the speedscope file format
+    """
+    frames = []
+    frame_index = {}
+    children = {}
+    for func, (_, _, _, _, callers) in stats.stats.items():
+        for caller, (_, _, _, edge_cumulative) in callers.items():
+            children.setdefault(caller, []).append((func, edge_cumulative))
+
+    def index(func):
+        if func not in frame_index:
+            frame_index[func] = len(frames)
+            frames.append(frame_name(func))
+        return frame_index[func]
+
+    samples = []
+    weights = []
+
+    def walk(func, stack, share):
+        _, _, total, cumulative, _ = stats.stats[func]
+        if share < min_weight:
+            return
+        stack = stack + [index(func)]
+        scale = share / cumulative if cumulative else 0
+        self_time = total * scale
+        if self_time >= min_weight:
+            samples.append(stack)
+            weights.append(self_time)
+        for child, edge_cumulative in children.get(func, []):
+            if frame_index.get(child) in stack:
+                continue  # Recursion: the time is already counted above
+            walk(child, stack, edge_cumulative * scale)
+
+    roots = [func for func, value in stats.stats.items() if not value[4]]
+    if not roots and stats.stats:
+        # Every function has a caller (e.g. a shared wrapper called
+        # recursively); start from the one covering the most time
+        roots = [max(stats.stats, key=lambda func: stats.stats[func][3])]
+    for root in roots:
+        walk(root, [], stats.stats[root][3])
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": name,
+        "exporter": "wildfire-prediction",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+    }
+
+
+def requested_profile(request):
+    return request.headers.get("X-Profile") == "1" or request.GET.get("profile") == "1"
+
+
+def sampled():
+    rate = settings.PROFILING_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+def record(request, response, profile, trigger, elapsed):
+    metadata = {
+        "method": request.method,
+        "path": request.path,
+        "view": route_name(request),
+        "status": response.status_code,
+        "trigger": trigger,
+        "latency_ms": round(elapsed * 1000, 1),
+        "created_at": datetime.now(dt_timezone.utc).isoformat(),
+    }
+    try:
+        trace_id = save_trace(profile, metadata)
+    except OSError as e:
+        logger.error(f"Could not store profile of {request.path}: {e}")
+        return response
+    logger.info(f"Profiled {request.method} {request.path} as trace {trace_id}")
+    response["X-Profile-Id"] = trace_id
+    return response
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests asked for by staff users or picked by sampling.
+
+    Must come after AuthenticationMiddleware.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = settings.PROFILING_ENABLED
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+
+        trigger = self.trigger(request, request.user)
+        if trigger is None or not PROFILE_LOCK.acquire(blocking=False):
+            return self.get_response(request)
+
+        def profiled_request():
+            # Distinct root frame: the middleware chain's own wrappers share
+            # code objects and call each other
+            return self.get_response(request)
+
+        try:
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            response = profile.runcall(profiled_request)
+        finally:
+            PROFILE_LOCK.release()
+        return record(request, response, profile, trigger, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+
+        trigger = self.trigger(request, await request.auser())
+        if trigger is None or not PROFILE_LOCK.acquire(blocking=False):
+            return await self.get_response(request)
+
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            profile.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profile.disable()
+        finally:
+            PROFILE_LOCK.release()
+        return record(request, response, profile, trigger, time.perf_counter() - start)
+
+    def trigger(self, request, user):
+        if requested_profile(request) and user.is_active and user.is_staff:
+            return "requested"
+        if sampled():
+            return "sampled"
+        return None
@@ -0,0 +1,192 @@
+"""
+In-process cache of static region metadata.
+
+Regions, their soil types and forests change perhaps monthly, but every
+dashboard render, prediction list and batch score reads them. Each process
+loads them once (two queries) into a ``RegionMetadata`` of compact arrays
+plus the Region instances themselves, and serves hot paths from memory.
+
+Invalidation:
+
+- saving or deleting a Region, SoilType, Forest or City (see signals) drops
+  the process's copy at once and, when the transaction commits, replaces the
+  version token stored under ``VERSION_KEY`` in the Django cache;
+- every read compares its copy's token with the shared one, so other
+  processes reload on their next read. The shared token only reaches other
+  processes when CACHES points to a shared backend (file-based, memcached,
+  Redis); REGION_CACHE_MAX_AGE bounds staleness otherwise;
+- bulk writes, which send no signals, must call ``changed()``.
+"""
+
+import logging
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+
+from .lazy import lazy_import
+from .models import Forest, Region
+
+logger = logging.getLogger(__name__)
+
+np = lazy_import("numpy")
+
+VERSION_KEY = "region-metadata-version"
+
+# Forests listed per region, largest first
+MAJOR_FORESTS = 3
+
+
+class RegionMetadata:
+    """
+    Static attributes of every region, one array entry per region (ordered
+    by id).
+
+    Attributes:
+        version: Shared version token the metadata was loaded under
+        regions: Region instances with their soil type attached
+        ids, latitude, longitude, vegetation_density: 1-D arrays
+        climate_zone: Array of climate zone codes
+        soil_type_id: Array of soil type ids (-1 without one)
+        moisture_retention: Array of soil moisture retention (NaN without one)
+        forests: Tuple of the names of each region's largest forests
+    """
+
+    def __init__(self, regions, forests, version):
+        self.version = version
+        self.loaded_at = time.monotonic()
+        self.regions = regions
+        self.index = {region.pk: row for row, region in enumerate(regions)}
+
+        self.ids = np.array([region.pk for region in regions], dtype=np.int64)
+        self.latitude = np.array([region.latitude for region in regions], dtype=float)
+        self.longitude = np.array([region.longitude for region in regions], dtype=float)
+        self.vegetation_density = np.array(
+            [region.vegetation_density for region in regions], dtype=float
+        )
+        self.climate_zone = np.array(
+            [region.climate_zone for region in regions], dtype="U20"
+        )
+        self.soil_type_id = np.array(
+            [region.soil_type_id or -1 for region in regions], dtype=np.int64
+        )
+        self.moisture_retention = np.array(
+            [
+                region.soil_type.moisture_retention if region.soil_type else np.nan
+                for region in regions
+            ],
+            dtype=float,
+        )
+        self.forests = tuple(tuple(forests.get(region.pk, ())) for region in regions)
+
+    def __len__(self):
+        return len(self.regions)
+
+    @property
+    def age(self):
+        return time.monotonic() - self.loaded_at
+
+    def region(self, region_id):
+        """Region instance of an id, or None."""
+        row = self.index.get(region_id)
+        return self.regions[row] if row is not None else None
+
+    def major_forests(self, region_id):
+        """Names of a region's largest forests."""
+        row = self.index.get(region_id)
+        return list(self.forests[row]) if row is not None else []
+
+    def coordinates(self):
+        """Array of (latitude, longitude) rows."""
+        return np.column_stack([self.latitude, self.longitude])
+
+
+def load_region_metadata(version):
+    """Load the metadata of every region in two queries."""
+    regions = list(Region.objects.select_related("soil_type").order_by("pk"))
+
+    forests = {}
+    rows = (
+        Forest.objects.annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F("region_id")],
+                order_by=F("area").desc(),
+            )
+        )
+        .filter(row_number__lte=MAJOR_FORESTS)
+        .order_by("region_id", "row_number")
+        .values_list("region_id", "name")
+    )
+    for region_id, name in rows:
+        forests.setdefault(region_id, []).append(name)
+
+    return RegionMetadata(regions, forests, version)
+
+
+def shared_version():
+    """Current version token, created on first use."""
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_version():
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+class RegionCache:
+    """Holds the process's RegionMetadata and reloads it when outdated."""
+
+    def __init__(self):
+        self.metadata = None
+        self.lock = threading.Lock()
+
+    def current(self, metadata, version):
+        return (
+            metadata is not None
+            and metadata.version == version
+            and metadata.age < settings.REGION_CACHE_MAX_AGE
+        )
+
+    def get(self):
+        version = shared_version()
+        metadata = self.metadata
+        if self.current(metadata, version):
+            return metadata
+
+        with self.lock:
+            metadata = self.metadata
+            if not self.current(metadata, version):
+                metadata = load_region_metadata(version)
+                self.metadata = metadata
+                logger.info(f"Loaded metadata of {len(metadata)} regions")
+        return metadata
+
+    def invalidate(self):
+        self.metadata = None
+
+
+REGION_CACHE = RegionCache()
+
+
+def get_region_metadata():
+    """The current RegionMetadata, loaded on first use or after a change."""
+    return REGION_CACHE.get()
+
+
+def changed():
+    """
+    Record a change to regions, soil types, forests or cities: drop this
+    process's copy now and bump the shared version once the transaction
+    commits.
+    """
+    REGION_CACHE.invalidate()
+    transaction.on_commit(bump_version)
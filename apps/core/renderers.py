@@ -0,0 +1,128 @@
+import csv
+import io
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import renderers
+
+from . import columnar
+
+
+def render_json_fallback(data, renderer_context=None):
+    """
+    Render ``data`` (such as an error) as JSON for a binary renderer that
+    cannot encode it, and label the response as JSON so clients can read it.
+    """
+    response = (renderer_context or {}).get("response")
+    if response is not None:
+        response["Content-Type"] = "application/json"
+    return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class NDJSONRenderer(renderers.BaseRenderer):
+    """Render a list as newline-delimited JSON, one object per line."""
+
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if not isinstance(data, list):
+            data = [data]
+        return b"".join(
+            json.dumps(item, cls=DjangoJSONEncoder).encode() + b"\n" for item in data
+        )
+
+
+class CSVRenderer(renderers.BaseRenderer):
+    """
+    Render a list of flat objects as CSV.
+
+    Bulk exports stream their own CSV body; this renderer lets content
+    negotiation select the format and renders small payloads such as errors.
+    """
+
+    media_type = "text/csv"
+    format = "csv"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return ""
+        if not isinstance(data, list):
+            data = [data]
+        buffer = io.StringIO()
+        if data:
+            writer = csv.DictWriter(buffer, fieldnames=list(data[0]))
+            writer.writeheader()
+            writer.writerows(data)
+        return buffer.getvalue()
+
+
+class ParquetRenderer(renderers.BaseRenderer):
+    """
+    Content negotiation placeholder for Parquet exports.
+
+    Parquet bodies are streamed by the export views; anything else rendered
+    through this renderer (such as an error) is sent as JSON.
+    """
+
+    media_type = "application/vnd.apache.parquet"
+    format = "parquet"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return render_json_fallback(data, renderer_context)
+
+
+class GeoJSONRenderer(renderers.JSONRenderer):
+    """
+    Content negotiation for GeoJSON layers.
+
+    Layers build their own encoded bodies; this renderer accepts the GeoJSON
+    media type and renders other payloads, such as errors, as JSON.
+    """
+
+    media_type = "application/geo+json"
+    format = "geojson"
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Render as MessagePack; Columns become typed arrays (see apps.core.columnar).
+    """
+
+    media_type = "application/msgpack"
+    format = "msgpack"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return columnar.packb(data)
+
+
+class ArrowRenderer(renderers.BaseRenderer):
+    """
+    Render Columns, or a page of them, as an Arrow IPC stream.
+
+    Requires the optional ``pyarrow`` package; anything else rendered through
+    this renderer (such as an error) is sent as JSON.
+    """
+
+    media_type = "application/vnd.apache.arrow.stream"
+    format = "arrow"
+    charset = None
+    render_style = "binary"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        results = data.get("results") if isinstance(data, dict) else data
+        if isinstance(results, columnar.Columns) and columnar.arrow_available():
+            return columnar.arrow_body(data)
+        return render_json_fallback(data, renderer_context)
@@ -0,0 +1,284 @@
+"""
+Retention policy for the time-series tables.
+
+Raw ``WeatherData`` observations older than ``RETENTION_WEATHER_RAW_DAYS`` are
+compacted into ``WeatherDailyRollup`` rows and removed, and
+``WildfirePrediction`` history older than ``RETENTION_PREDICTION_DAYS`` is
+removed. On PostgreSQL, where both tables are partitioned by month, expired
+months are dropped a whole partition at a time; anything left in the default
+partition, and every row on SQLite, is deleted in bounded chunks.
+"""
+
+import logging
+from datetime import datetime, time, timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Max, Min, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import partitioning
+
+logger = logging.getLogger(__name__)
+
+ROLLUP_UPDATE_FIELDS = [
+    "sample_count",
+    "temperature_avg",
+    "temperature_min",
+    "temperature_max",
+    "humidity_avg",
+    "humidity_min",
+    "wind_speed_avg",
+    "wind_speed_max",
+    "precipitation_total",
+    "pressure_avg",
+]
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min, tzinfo=timezone.get_current_timezone())
+
+
+def _weighted(existing_value, existing_count, value, count):
+    if existing_value is None:
+        return value
+    if value is None:
+        return existing_value
+    return (existing_value * existing_count + value * count) / (existing_count + count)
+
+
+def _merge_rollup(rollup, row):
+    """Merge a freshly aggregated row into an existing rollup (additive)."""
+    existing_count = rollup.sample_count
+    count = row["sample_count"]
+
+    rollup.temperature_avg = _weighted(
+        rollup.temperature_avg, existing_count, row["temperature_avg"], count
+    )
+    rollup.humidity_avg = _weighted(
+        rollup.humidity_avg, existing_count, row["humidity_avg"], count
+    )
+    rollup.wind_speed_avg = _weighted(
+        rollup.wind_speed_avg, existing_count, row["wind_speed_avg"], count
+    )
+    rollup.pressure_avg = _weighted(
+        rollup.pressure_avg, existing_count, row["pressure_avg"], count
+    )
+    rollup.temperature_min = min(rollup.temperature_min, row["temperature_min"])
+    rollup.temperature_max = max(rollup.temperature_max, row["temperature_max"])
+    rollup.humidity_min = min(rollup.humidity_min, row["humidity_min"])
+    rollup.wind_speed_max = max(rollup.wind_speed_max, row["wind_speed_max"])
+    rollup.precipitation_total += row["precipitation_total"] or 0
+    rollup.sample_count = existing_count + count
+    return rollup
+
+
+def rollup_weather_range(start, end):
+    """
+    Aggregate raw weather observations in [start, end) into daily rollups.
+
+    Existing rollups for the same (region, date) are merged additively, so this
+    must run in the same transaction that removes the aggregated raw rows.
+
+    Returns:
+        Number of rollup rows written
+    """
+    WeatherData = apps.get_model("weather", "WeatherData")
+    WeatherDailyRollup = apps.get_model("weather", "WeatherDailyRollup")
+
+    observations = WeatherData.objects.filter(timestamp__lt=end)
+    if start is not None:
+        observations = observations.filter(timestamp__gte=start)
+
+    rows = list(
+        observations.annotate(day=TruncDate("timestamp"))
+        .values("region_id", "day")
+        .annotate(
+            sample_count=Count("id"),
+            temperature_avg=Avg("temperature"),
+            temperature_min=Min("temperature"),
+            temperature_max=Max("temperature"),
+            humidity_avg=Avg("humidity"),
+            humidity_min=Min("humidity"),
+            wind_speed_avg=Avg("wind_speed"),
+            wind_speed_max=Max("wind_speed"),
+            precipitation_total=Sum("precipitation"),
+            pressure_avg=Avg("pressure"),
+        )
+        .order_by()
+    )
+    if not rows:
+        return 0
+
+    existing = {
+        (rollup.region_id, rollup.date): rollup
+        for rollup in WeatherDailyRollup.objects.filter(
+            date__in={row["day"] for row in rows},
+            region_id__in={row["region_id"] for row in rows},
+        )
+    }
+
+    rollups = []
+    for row in rows:
+        rollup = existing.get((row["region_id"], row["day"]))
+        if rollup is not None:
+            rollups.append(_merge_rollup(rollup, row))
+            continue
+        rollups.append(
+            WeatherDailyRollup(
+                region_id=row["region_id"],
+                date=row["day"],
+                sample_count=row["sample_count"],
+                temperature_avg=row["temperature_avg"],
+                temperature_min=row["temperature_min"],
+                temperature_max=row["temperature_max"],
+                humidity_avg=row["humidity_avg"],
+                humidity_min=row["humidity_min"],
+                wind_speed_avg=row["wind_speed_avg"],
+                wind_speed_max=row["wind_speed_max"],
+                precipitation_total=row["precipitation_total"] or 0,
+                pressure_avg=row["pressure_avg"],
+            )
+        )
+
+    WeatherDailyRollup.objects.bulk_create(
+        rollups,
+        update_conflicts=True,
+        unique_fields=["region", "date"],
+        update_fields=ROLLUP_UPDATE_FIELDS,
+    )
+    return len(rollups)
+
+
+def delete_in_chunks(queryset, chunk_size):
+    """
+    Delete the rows of ``queryset`` in primary-key chunks.
+
+    Keeps each DELETE statement (and the locks it holds) bounded instead of
+    removing millions of rows in one statement.
+
+    Returns:
+        Total number of rows deleted
+    """
+    deleted = 0
+    while True:
+        pks = list(queryset.order_by("pk").values_list("pk", flat=True)[:chunk_size])
+        if not pks:
+            return deleted
+        count, _ = queryset.model.objects.filter(pk__in=pks).delete()
+        deleted += count
+
+
+def _drop_expired_partitions(table, cutoff, before_drop=None):
+    """Drop monthly partitions lying entirely before ``cutoff``."""
+    dropped = 0
+    for name, start, end in partitioning.list_partitions(table):
+        if end > cutoff:
+            break
+        with transaction.atomic():
+            if before_drop is not None:
+                before_drop(start, end)
+            partitioning.drop_partition(name)
+        logger.info(f"Dropped expired partition {name}")
+        dropped += 1
+    return dropped
+
+
+def compact_weather_data(cutoff, chunk_size):
+    """
+    Compact raw weather observations older than ``cutoff`` into daily rollups.
+
+    Returns:
+        Dictionary with the number of dropped partitions and deleted rows
+    """
+    WeatherData = apps.get_model("weather", "WeatherData")
+    table = WeatherData._meta.db_table
+    dropped = 0
+
+    if partitioning.is_partitioned(table):
+        dropped = _drop_expired_partitions(table, cutoff, rollup_weather_range)
+
+    deleted = 0
+    oldest = (
+        WeatherData.objects.filter(timestamp__lt=cutoff)
+        .order_by()
+        .aggregate(oldest=Min("timestamp"))["oldest"]
+    )
+    if oldest is not None:
+        day = timezone.localtime(oldest).date()
+        while _day_start(day) < cutoff:
+            start = _day_start(day)
+            end = min(_day_start(day + timedelta(days=1)), cutoff)
+            with transaction.atomic():
+                rollup_weather_range(start, end)
+                deleted += delete_in_chunks(
+                    WeatherData.objects.filter(timestamp__gte=start, timestamp__lt=end),
+                    chunk_size,
+                )
+            day += timedelta(days=1)
+
+    return {"dropped_partitions": dropped, "deleted_rows": deleted}
+
+
+def expire_rows(model, field, cutoff, chunk_size):
+    """Remove rows of a partitioned time-series model older than ``cutoff``."""
+    table = model._meta.db_table
+    dropped = 0
+    if partitioning.is_partitioned(table):
+        dropped = _drop_expired_partitions(table, cutoff)
+
+    deleted = delete_in_chunks(
+        model.objects.filter(**{f"{field}__lt": cutoff}), chunk_size
+    )
+    return {"dropped_partitions": dropped, "deleted_rows": deleted}
+
+
+def apply_retention(now=None):
+    """
+    Apply the configured retention policy to all time-series tables.
+
+    Returns:
+        Dictionary of per-table results
+    """
+    WeatherData = apps.get_model("weather", "WeatherData")
+    WeatherDailyRollup = apps.get_model("weather", "WeatherDailyRollup")
+    WildfirePrediction = apps.get_model("predictions", "WildfirePrediction")
+
+    now = now or timezone.now()
+    chunk_size = settings.RETENTION_DELETE_CHUNK_SIZE
+    # Align the raw cutoff to midnight so every compacted day is complete.
+    raw_cutoff = _day_start(
+        timezone.localtime(now).date()
+        - timedelta(days=settings.RETENTION_WEATHER_RAW_DAYS)
+    )
+
+    results = {
+        "weather": compact_weather_data(raw_cutoff, chunk_size),
+        "predictions": expire_rows(
+            WildfirePrediction,
+            "prediction_date",
+            now - timedelta(days=settings.RETENTION_PREDICTION_DAYS),
+            chunk_size,
+        ),
+    }
+
+    if settings.RETENTION_WEATHER_ROLLUP_DAYS:
+        rollup_cutoff = timezone.localtime(now).date() - timedelta(
+            days=settings.RETENTION_WEATHER_ROLLUP_DAYS
+        )
+        results["rollups"] = {
+            "deleted_rows": delete_in_chunks(
+                WeatherDailyRollup.objects.filter(date__lt=rollup_cutoff),
+                chunk_size,
+            )
+        }
+
+    if partitioning.supports_partitioning(connection):
+        for model in (WeatherData, WildfirePrediction):
+            partitioning.ensure_partitions(
+                model._meta.db_table, settings.RETENTION_PARTITION_PREMAKE_MONTHS, now
+            )
+
+    return results
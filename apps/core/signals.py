@@ -0,0 +1,59 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import eventstats, regioncache
+from .models import City, Forest, Region, SoilType, WildfireEvent
+
+
+@receiver(post_save, sender=Region)
+@receiver(post_delete, sender=Region)
+@receiver(post_save, sender=SoilType)
+@receiver(post_delete, sender=SoilType)
+@receiver(post_save, sender=Forest)
+@receiver(post_delete, sender=Forest)
+@receiver(post_save, sender=City)
+@receiver(post_delete, sender=City)
+def region_metadata_changed(sender, **kwargs):
+    """
+    Invalidate the cached region metadata (see apps.core.regioncache) and the
+    spatial indexes built from it.
+    """
+    regioncache.changed()
+
+
+@receiver(pre_save, sender=WildfireEvent)
+def remember_event_rollup(sender, instance, **kwargs):
+    """Note the region and year an updated event may be moving out of."""
+    instance._previous_rollup = None
+    if not instance._state.adding:
+        previous = (
+            WildfireEvent.objects.filter(pk=instance.pk)
+            .values_list("region_id", "start_date")
+            .first()
+        )
+        if previous:
+            instance._previous_rollup = (
+                previous[0],
+                eventstats.event_year(previous[1]),
+            )
+
+
+@receiver(post_save, sender=WildfireEvent)
+def event_saved(sender, instance, **kwargs):
+    """Rebuild the event rollups of the event's region and year."""
+    rollups = {(instance.region_id, eventstats.event_year(instance.start_date))}
+    if getattr(instance, "_previous_rollup", None):
+        rollups.add(instance._previous_rollup)
+    for region_id, year in rollups:
+        eventstats.rebuild_rollups([region_id], year)
+
+
+@receiver(post_delete, sender=WildfireEvent)
+def event_deleted(sender, instance, origin=None, **kwargs):
+    """Rebuild the event rollups of the event's region and year."""
+    # Deleting a region deletes its rollups too
+    if isinstance(origin, Region) or getattr(origin, "model", None) is Region:
+        return
+    eventstats.rebuild_rollups(
+        [instance.region_id], eventstats.event_year(instance.start_date)
+    )
@@ -0,0 +1,318 @@
+"""
+Spatial index of regions and cities.
+
+Answers "which regions are nearest to this point" and "which cities lie
+within X km of a fire" without scanning every row. Two backends share the
+same interface (``nearest`` and ``within``, returning (item, distance in km)
+pairs, nearest first):
+
+- ``SpatialIndex`` (the default): a KD-tree over the points' positions on
+  the unit sphere. The straight-line (chord) distance between two such
+  positions grows with the great-circle distance, so KD-tree queries on
+  chords are exact great-circle queries. Indexes are rebuilt whenever the
+  region metadata reloads (see apps.core.regioncache), which includes every
+  change to a region or city;
+- ``DatabaseSpatialIndex``: on PostgreSQL with SPATIAL_INDEX_BACKEND set to
+  "database", queries run against GiST indexes over ``point(longitude,
+  latitude)`` (migration core 0006) and are refined with exact distances
+  here. This uses PostgreSQL's built-in geometric types, so PostGIS is not
+  required.
+
+Forests have no coordinates of their own; region results carry the names of
+each region's largest forests.
+"""
+
+import logging
+import math
+import threading
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField
+from django.db.models.expressions import RawSQL
+
+from .lazy import lazy_import
+from .models import City, Region
+from .regioncache import get_region_metadata
+
+logger = logging.getLogger(__name__)
+
+np = lazy_import("numpy")
+spatial = lazy_import("scipy.spatial")
+
+EARTH_RADIUS_KM = 6371.0
+
+KINDS = ("regions", "cities")
+
+# Expression indexed by the GiST indexes of migration core 0006
+POINT_SQL = "point(longitude, latitude)"
+
+
+def unit_vectors(latitude, longitude):
+    """Positions of (latitude, longitude) degrees on the unit sphere, shape (n, 3)."""
+    latitude = np.radians(np.asarray(latitude, dtype=float))
+    longitude = np.radians(np.asarray(longitude, dtype=float))
+    return np.column_stack(
+        [
+            np.cos(latitude) * np.cos(longitude),
+            np.cos(latitude) * np.sin(longitude),
+            np.sin(latitude),
+        ]
+    )
+
+
+def chord_to_km(chord):
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.asarray(chord) / 2, 1))
+
+
+def km_to_chord(distance_km):
+    return 2 * math.sin(min(distance_km / EARTH_RADIUS_KM, math.pi) / 2)
+
+
+def haversine_km(latitude1, longitude1, latitude2, longitude2):
+    """Great-circle distance in km between points in degrees (broadcasting)."""
+    latitude1, longitude1, latitude2, longitude2 = (
+        np.radians(np.asarray(value, dtype=float))
+        for value in (latitude1, longitude1, latitude2, longitude2)
+    )
+    a = (
+        np.sin((latitude2 - latitude1) / 2) ** 2
+        + np.cos(latitude1)
+        * np.cos(latitude2)
+        * np.sin((longitude2 - longitude1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Latitude/longitude box containing every point within ``radius_km``.
+
+    Returns:
+        (min latitude, min longitude, max latitude, max longitude) in degrees.
+        The box spans every longitude when the circle reaches a pole or
+        crosses the antimeridian.
+    """
+    delta = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_latitude, max_latitude = latitude - delta, latitude + delta
+    if min_latitude <= -90 or max_latitude >= 90:
+        return max(min_latitude, -90.0), -180.0, min(max_latitude, 90.0), 180.0
+
+    delta_longitude = math.degrees(
+        math.asin(
+            min(
+                math.sin(radius_km / EARTH_RADIUS_KM)
+                / math.cos(math.radians(latitude)),
+                1,
+            )
+        )
+    )
+    min_longitude, max_longitude = (
+        longitude - delta_longitude,
+        longitude + delta_longitude,
+    )
+    if min_longitude < -180 or max_longitude > 180:
+        return min_latitude, -180.0, max_latitude, 180.0
+    return min_latitude, min_longitude, max_latitude, max_longitude
+
+
+class SpatialIndex:
+    """
+    In-memory KD-tree over points.
+
+    Args:
+        items: Objects returned by queries, one per point
+        latitude, longitude: Coordinates of the items in degrees
+        source: The RegionMetadata the index was built from
+    """
+
+    def __init__(self, items, latitude, longitude, source=None):
+        self.items = list(items)
+        self.source = source
+        self.tree = (
+            spatial.cKDTree(unit_vectors(latitude, longitude)) if self.items else None
+        )
+
+    def __len__(self):
+        return len(self.items)
+
+    def query(self, points, k=1):
+        """
+        Rows of the ``k`` nearest items of many (latitude, longitude) points.
+
+        Returns:
+            Arrays of rows and distances in km, of shape (points, k). Without
+            enough items, missing rows are ``len(self)`` at an infinite
+            distance.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if self.tree is None:
+            return (
+                np.zeros((len(points), k), dtype=int),
+                np.full((len(points), k), np.inf),
+            )
+        chords, rows = self.tree.query(unit_vectors(points[:, 0], points[:, 1]), k=k)
+        return rows.reshape(len(points), k), chord_to_km(chords).reshape(len(points), k)
+
+    def nearest(self, latitude, longitude, k=1):
+        """The ``k`` nearest items, as (item, distance in km) pairs."""
+        rows, distances = self.query([(latitude, longitude)], k)
+        return [
+            (self.items[row], float(distance))
+            for row, distance in zip(rows[0], distances[0])
+            if row < len(self.items)
+        ]
+
+    def nearest_each(self, points):
+        """
+        The nearest item of each point, as (item, distance in km) pairs; one
+        entry per point, None when the index is empty.
+        """
+        if self.tree is None:
+            return [None] * len(points)
+        rows, distances = self.query(points)
+        return [
+            (self.items[row], float(distance))
+            for row, distance in zip(rows[:, 0], distances[:, 0])
+        ]
+
+    def within(self, latitude, longitude, radius_km):
+        """Items within ``radius_km``, as (item, distance in km) pairs."""
+        if self.tree is None:
+            return []
+        point = unit_vectors([latitude], [longitude])[0]
+        rows = np.array(
+            self.tree.query_ball_point(point, km_to_chord(radius_km)), dtype=int
+        )
+        distances = chord_to_km(np.linalg.norm(self.tree.data[rows] - point, axis=1))
+        order = np.argsort(distances, kind="stable")
+        return [
+            (self.items[rows[position]], float(distances[position]))
+            for position in order
+        ]
+
+
+class DatabaseSpatialIndex:
+    """
+    Queries against the PostgreSQL GiST indexes of a model's points.
+
+    Candidates come from the index (a bounding box, or ordering by planar
+    distance in degrees) and are ranked by exact great-circle distance.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def ranked(self, items, latitude, longitude):
+        distances = haversine_km(
+            latitude,
+            longitude,
+            [item.latitude for item in items],
+            [item.longitude for item in items],
+        )
+        return sorted(zip(items, distances.tolist()), key=lambda pair: pair[1])
+
+    def nearest(self, latitude, longitude, k=1):
+        # The k nearest in degrees bound the distance of the true k nearest,
+        # which all lie in the bounding box of that distance
+        candidates = list(
+            self.queryset.annotate(
+                planar_distance=RawSQL(
+                    f"{POINT_SQL} <-> point(%s, %s)",
+                    (longitude, latitude),
+                    output_field=FloatField(),
+                )
+            ).order_by("planar_distance")[:k]
+        )
+        if len(candidates) < k:
+            return self.ranked(candidates, latitude, longitude)
+        bound = self.ranked(candidates, latitude, longitude)[-1][1]
+        return self.within(latitude, longitude, bound)[:k]
+
+    def nearest_each(self, points):
+        matches = [self.nearest(latitude, longitude) for latitude, longitude in points]
+        return [match[0] if match else None for match in matches]
+
+    def within(self, latitude, longitude, radius_km):
+        min_latitude, min_longitude, max_latitude, max_longitude = bounding_box(
+            latitude, longitude, radius_km
+        )
+        candidates = list(
+            self.queryset.filter(
+                RawSQL(
+                    f"{POINT_SQL} <@ box(point(%s, %s), point(%s, %s))",
+                    (min_longitude, min_latitude, max_longitude, max_latitude),
+                    output_field=BooleanField(),
+                )
+            )
+        )
+        return [
+            (item, distance)
+            for item, distance in self.ranked(candidates, latitude, longitude)
+            if distance <= radius_km
+        ]
+
+
+def build_index(kind, metadata):
+    if kind == "regions":
+        return SpatialIndex(
+            metadata.regions, metadata.latitude, metadata.longitude, metadata
+        )
+    cities = list(City.objects.order_by("pk"))
+    return SpatialIndex(
+        cities,
+        [city.latitude for city in cities],
+        [city.longitude for city in cities],
+        metadata,
+    )
+
+
+class SpatialIndexCache:
+    """Holds the process's in-memory indexes, rebuilt with the region metadata."""
+
+    def __init__(self):
+        self.indexes = {}
+        self.lock = threading.Lock()
+
+    def get(self, kind):
+        metadata = get_region_metadata()
+        index = self.indexes.get(kind)
+        if index is not None and index.source is metadata:
+            return index
+
+        with self.lock:
+            index = self.indexes.get(kind)
+            if index is None or index.source is not metadata:
+                index = build_index(kind, metadata)
+                self.indexes[kind] = index
+                logger.info(f"Built spatial index of {len(index)} {kind}")
+        return index
+
+    def clear(self):
+        self.indexes = {}
+
+
+SPATIAL_INDEXES = SpatialIndexCache()
+
+
+def uses_database():
+    return (
+        settings.SPATIAL_INDEX_BACKEND == "database"
+        and connection.vendor == "postgresql"
+    )
+
+
+def get_spatial_index(kind):
+    """
+    Spatial index of "regions" or "cities".
+
+    Raises:
+        ValueError: For an unknown kind
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown spatial index {kind!r}")
+    if uses_database():
+        if kind == "regions":
+            return DatabaseSpatialIndex(Region.objects.select_related("soil_type"))
+        return DatabaseSpatialIndex(City.objects.all())
+    return SPATIAL_INDEXES.get(kind)
@@ -0,0 +1,48 @@
+"""
+Streaming responses that stay incremental under ASGI.
+
+Django serves a StreamingHttpResponse over a synchronous iterator to an ASGI
+server by reading the whole iterator into a list first, so exports and other
+generated bodies would be held in memory and nothing would be sent until the
+last row was read. ``streaming_response`` gives requests served through ASGI
+an asynchronous iterator instead, which pulls one chunk at a time from the
+synchronous one in the request's sync thread (where its database cursor
+lives). Under WSGI the iterator is served as is.
+"""
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+# Returned by next() once the iterator is exhausted
+EXHAUSTED = object()
+
+
+async def iterate_async(chunks):
+    """Asynchronous iterator over a synchronous iterator's chunks."""
+    chunks = iter(chunks)
+    try:
+        while True:
+            chunk = await sync_to_async(next)(chunks, EXHAUSTED)
+            if chunk is EXHAUSTED:
+                break
+            yield chunk
+    finally:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            await sync_to_async(close)()
+
+
+def streaming_response(request, chunks, **kwargs):
+    """
+    StreamingHttpResponse of ``chunks`` served incrementally by the handler
+    of ``request`` (a Django or DRF request).
+
+    Args:
+        request: The request being answered
+        chunks: Synchronous iterator of str or bytes chunks
+        **kwargs: Passed to StreamingHttpResponse (content_type, status...)
+    """
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        chunks = iterate_async(chunks)
+    return StreamingHttpResponse(chunks, **kwargs)
@@ -0,0 +1,368 @@
+"""
+Synthetic dataset generator for scale testing and model training.
+
+Builds regions with cities and forests, years of hourly weather and wildfire
+events, all from one seed so a dataset can be rebuilt exactly.
+
+Weather series combine a seasonal and a diurnal cycle with autocorrelated
+AR(1) anomalies, so hot, dry and windy spells last for days rather than
+flipping hour to hour. Rain falls while a persistent latent process exceeds
+a seasonal threshold (wet winters, dry summers), giving realistic wet and
+dry spells. Wildfire events are then drawn from a daily fire danger index
+driven by high temperatures, low humidity and the length of the current
+dry and hot-dry streaks, so events cluster in hot, dry periods.
+
+Everything is written with ``bulk_create`` in batches.
+"""
+
+import logging
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from django.db import transaction
+from scipy.signal import lfilter
+from scipy.stats import norm
+
+from apps.weather.models import WeatherData
+from . import eventstats, regioncache
+from .models import City, Forest, Region, SoilType, WildfireEvent
+
+logger = logging.getLogger(__name__)
+
+REGION_PREFIX = "Synthetic region"
+
+LATITUDE_RANGE = (28.0, 36.0)
+LONGITUDE_RANGE = (-13.0, -1.0)
+
+# Typical relative humidity and fraction of rainy hours (at the winter peak)
+CLIMATES = {
+    "mediterranean": {"humidity": 62, "wet_hours": 0.10},
+    "semi_arid": {"humidity": 42, "wet_hours": 0.04},
+    "temperate": {"humidity": 66, "wet_hours": 0.12},
+}
+
+FOREST_SPECIES = ["Cedar", "Cork oak", "Holm oak", "Argan", "Aleppo pine", "Thuya"]
+
+
+def climate_zone(latitude, elevation):
+    if elevation > 1500:
+        return "temperate"
+    if latitude < 31:
+        return "semi_arid"
+    return "mediterranean"
+
+
+def ar1(rng, phi, sigma, size):
+    """Stationary AR(1) series with autocorrelation ``phi`` and std ``sigma``."""
+    noise = rng.normal(0, sigma * math.sqrt(1 - phi**2), size)
+    noise[0] = rng.normal(0, sigma)
+    return lfilter([1.0], [1.0, -phi], noise)
+
+
+def create_regions(count, rng, prefix=REGION_PREFIX):
+    """Bulk create ``count`` regions spread over Morocco."""
+    soil_types = list(SoilType.objects.all())
+    regions = []
+    for index in range(count):
+        latitude = rng.uniform(*LATITUDE_RANGE)
+        elevation = float(rng.gamma(2.0, 400))
+        regions.append(
+            Region(
+                name=f"{prefix} {index}",
+                latitude=round(latitude, 4),
+                longitude=round(rng.uniform(*LONGITUDE_RANGE), 4),
+                elevation=round(elevation),
+                area=round(float(rng.lognormal(7, 0.8)), 1),
+                population=int(rng.lognormal(11, 1.2)),
+                soil_type=(
+                    soil_types[rng.integers(len(soil_types))] if soil_types else None
+                ),
+                vegetation_density=round(float(rng.beta(2, 2)), 2),
+                climate_zone=climate_zone(latitude, elevation),
+            )
+        )
+    regions = Region.objects.bulk_create(regions)
+    regioncache.changed()
+    return regions
+
+
+def create_cities(regions, per_region, rng):
+    cities = City.objects.bulk_create(
+        [
+            City(
+                name=f"{region.name} city {index}",
+                region=region,
+                latitude=round(region.latitude + rng.normal(0, 0.2), 4),
+                longitude=round(region.longitude + rng.normal(0, 0.2), 4),
+                population=int(rng.lognormal(9, 1.3)),
+            )
+            for region in regions
+            for index in range(per_region)
+        ]
+    )
+    regioncache.changed()
+    return cities
+
+
+def create_forests(regions, per_region, rng):
+    forests = Forest.objects.bulk_create(
+        [
+            Forest(
+                name=f"{region.name} forest {index}",
+                region=region,
+                area=round(float(rng.lognormal(3.5, 1.0)), 1),
+                dominant_species=FOREST_SPECIES[rng.integers(len(FOREST_SPECIES))],
+                density=round(float(rng.beta(2 + 4 * region.vegetation_density, 3)), 2),
+            )
+            for region in regions
+            for index in range(per_region)
+        ]
+    )
+    regioncache.changed()
+    return forests
+
+
+class Calendar:
+    """Hourly timestamps of whole UTC days, with their day of year and hour."""
+
+    def __init__(self, start, days):
+        self.days = days
+        self.timestamps = [start + timedelta(hours=hour) for hour in range(days * 24)]
+        self.day_of_year = np.array(
+            [timestamp.timetuple().tm_yday for timestamp in self.timestamps]
+        )
+        self.hour = np.tile(np.arange(24), days)
+        self.dates = self.timestamps[::24]
+
+
+def simulate_weather(region, calendar, rng):
+    """
+    Hourly weather of a region.
+
+    Returns:
+        Dictionary of arrays (one value per hour) keyed by WeatherData field
+    """
+    size = len(calendar.timestamps)
+    climate = CLIMATES[region.climate_zone]
+    arid = region.climate_zone == "semi_arid"
+    # Warmest around mid-July and mid-afternoon
+    season = np.cos(2 * np.pi * (calendar.day_of_year - 200) / 365.25)
+    diurnal = np.cos(2 * np.pi * (calendar.hour - 15) / 24)
+
+    mean_temperature = 22 - 0.4 * (region.latitude - 28) - 0.0065 * region.elevation
+    anomaly = ar1(rng, 0.985, 2.5, size)
+    temperature = (
+        mean_temperature
+        + (10 if arid else 7) * season
+        + (7 if arid else 5) * diurnal
+        + anomaly
+    )
+
+    # Rain while a persistent latent process exceeds a seasonal threshold
+    wet_fraction = climate["wet_hours"] * (
+        0.1 + 0.9 * (1 + np.cos(2 * np.pi * (calendar.day_of_year - 15) / 365.25)) / 2
+    )
+    latent = ar1(rng, 0.95, 1.0, size)
+    excess = latent - norm.ppf(1 - wet_fraction)
+    raining = excess > 0
+    precipitation = np.where(raining, rng.exponential(1.2, size) * (excess + 0.3), 0.0)
+
+    humidity = np.clip(
+        climate["humidity"]
+        - 15 * season
+        - 12 * diurnal
+        - 1.5 * anomaly
+        + 20 * raining
+        + ar1(rng, 0.97, 8, size),
+        5,
+        100,
+    )
+    wind_speed = np.exp(
+        np.log(12)
+        + 0.3 * np.cos(2 * np.pi * (calendar.hour - 16) / 24)
+        + ar1(rng, 0.9, 0.5, size)
+    )
+    wind_direction = np.mod(270 + ar1(rng, 0.95, 60, size), 360)
+    pressure = 1013 + ar1(rng, 0.99, 6, size) - 4 * raining
+
+    return {
+        "temperature": np.round(temperature, 1),
+        "humidity": np.round(humidity, 1),
+        "wind_speed": np.round(wind_speed, 1),
+        "wind_direction": np.round(wind_direction),
+        "precipitation": np.round(precipitation, 1),
+        "pressure": np.round(pressure, 1),
+    }
+
+
+def streak_lengths(flags):
+    """Length of the run of True values ending on each day (0 where False)."""
+    lengths = np.zeros(len(flags), dtype=int)
+    run = 0
+    for index, flag in enumerate(flags):
+        run = run + 1 if flag else 0
+        lengths[index] = run
+    return lengths
+
+
+def fire_danger(weather, days, vegetation_density):
+    """
+    Daily fire danger index (0-1.5) from hourly weather.
+
+    Returns:
+        Tuple of (danger, dry streak days, hot and dry streak days)
+    """
+    daily_max_temperature = weather["temperature"].reshape(days, 24).max(axis=1)
+    daily_min_humidity = weather["humidity"].reshape(days, 24).min(axis=1)
+    daily_rain = weather["precipitation"].reshape(days, 24).sum(axis=1)
+
+    dry_days = streak_lengths(daily_rain < 0.5)
+    hot_dry_days = streak_lengths(
+        (daily_max_temperature > 30) & (daily_min_humidity < 30)
+    )
+    danger = (
+        0.4 * np.clip((daily_max_temperature - 25) / 15, 0, 1)
+        + 0.3 * np.clip((40 - daily_min_humidity) / 35, 0, 1)
+        + 0.2 * np.minimum(dry_days / 30, 1)
+        + 0.1 * np.minimum(hot_dry_days / 7, 1)
+    ) * (0.5 + vegetation_density)
+    return danger, dry_days, hot_dry_days
+
+
+def simulate_events(region, weather, calendar, rng, event_rate=1.0):
+    """Wildfire events drawn from the daily fire danger of a region."""
+    danger, dry_days, hot_dry_days = fire_danger(
+        weather, calendar.days, region.vegetation_density
+    )
+    ignition = np.clip(0.02 * event_rate * danger**3, 0, 1)
+    draws = rng.random(calendar.days)
+
+    events = []
+    day = 0
+    while day < calendar.days:
+        if draws[day] >= ignition[day]:
+            day += 1
+            continue
+
+        score = danger[day] + rng.normal(0, 0.15)
+        severity = int(np.searchsorted([0.35, 0.55, 0.75], score)) + 1
+        duration = int(rng.geometric(1 / (1 + 1.5 * severity)))
+        start = calendar.dates[day] + timedelta(hours=int(rng.integers(10, 19)))
+        area = min(
+            float(rng.lognormal(math.log(0.5 * severity**2), 1.0))
+            * (0.5 + region.vegetation_density),
+            region.area,
+        )
+        events.append(
+            WildfireEvent(
+                region=region,
+                start_date=start,
+                end_date=start + timedelta(days=duration),
+                severity=severity,
+                area_affected=round(area, 2),
+                description=(
+                    f"Synthetic event after {hot_dry_days[day]} hot and dry days "
+                    f"and {dry_days[day]} days without rain"
+                ),
+            )
+        )
+        # No new ignition while the fire is burning
+        day += duration + 1
+    return events
+
+
+def weather_rows(region, weather, calendar):
+    columns = list(weather)
+    values = zip(*(weather[column].tolist() for column in columns))
+    for timestamp, row in zip(calendar.timestamps, values):
+        yield WeatherData(region=region, timestamp=timestamp, **dict(zip(columns, row)))
+
+
+def bulk_insert(model, rows, batch_size):
+    """Insert rows from an iterable in batches; returns the number inserted."""
+    inserted = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            model.objects.bulk_create(batch)
+            inserted += len(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+        inserted += len(batch)
+    return inserted
+
+
+def generate_dataset(
+    regions=10,
+    years=1.0,
+    cities_per_region=3,
+    forests_per_region=4,
+    seed=0,
+    end=None,
+    event_rate=1.0,
+    batch_size=5000,
+    progress=None,
+):
+    """
+    Generate a synthetic dataset.
+
+    Args:
+        regions: Number of regions to create
+        years: Length of the hourly weather history
+        cities_per_region, forests_per_region: Related objects per region
+        seed: Seed of every random draw; the same arguments rebuild the
+            same dataset
+        end: Last day of the history (defaults to today, UTC)
+        event_rate: Multiplier of the wildfire ignition probability
+        batch_size: Rows per bulk insert
+        progress: Optional callable receiving (done, total) regions
+
+    Returns:
+        Dictionary with the number of rows created per model
+    """
+    rng = np.random.default_rng(seed)
+    end = end or datetime.now(dt_timezone.utc).date()
+    days = max(int(round(years * 365)), 1)
+    start = datetime(end.year, end.month, end.day, tzinfo=dt_timezone.utc) - timedelta(
+        days=days - 1
+    )
+    calendar = Calendar(start, days)
+
+    with transaction.atomic():
+        created_regions = create_regions(regions, rng)
+        counts = {
+            "regions": len(created_regions),
+            "cities": len(create_cities(created_regions, cities_per_region, rng)),
+            "forests": len(create_forests(created_regions, forests_per_region, rng)),
+            "weather": 0,
+            "events": 0,
+        }
+
+    for done, region in enumerate(created_regions, start=1):
+        # Each region draws from its own stream, so results do not depend on
+        # batch sizes or on how many regions are generated after it
+        region_rng = np.random.default_rng([seed, done])
+        weather = simulate_weather(region, calendar, region_rng)
+        events = simulate_events(region, weather, calendar, region_rng, event_rate)
+
+        with transaction.atomic():
+            counts["weather"] += bulk_insert(
+                WeatherData, weather_rows(region, weather, calendar), batch_size
+            )
+            counts["events"] += bulk_insert(WildfireEvent, events, batch_size)
+            eventstats.rebuild_rollups([region.pk])
+
+        if progress is not None:
+            progress(done, len(created_regions))
+
+    logger.info(f"Generated synthetic dataset: {counts}")
+    return counts
+
+
+def delete_dataset(prefix=REGION_PREFIX):
+    """Delete previously generated regions and everything attached to them."""
+    deleted, _ = Region.objects.filter(name__startswith=prefix).delete()
+    return deleted
@@ -0,0 +1,52 @@
+"""
+Test helpers shared by the app test suites.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting that a code path runs a bounded number of SQL
+    queries, and that the number does not grow with the amount of data.
+    """
+
+    def capture_queries(self, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        return context.captured_queries
+
+    def assertQueryBudget(self, func, budget, grow=None):
+        """
+        Assert that ``func()`` runs at most ``budget`` queries.
+
+        Args:
+            func: Callable exercising the code path, e.g. a test client request
+            budget: Maximum number of queries allowed
+            grow: Optional callable adding more data (e.g. regions); ``func``
+                is then run again and must issue exactly as many queries
+        """
+        queries = self.capture_queries(func)
+        self.assertLessEqual(
+            len(queries),
+            budget,
+            f"{len(queries)} queries exceed the budget of {budget}:\n"
+            + format_queries(queries),
+        )
+
+        if grow is not None:
+            grow()
+            grown = self.capture_queries(func)
+            self.assertEqual(
+                len(grown),
+                len(queries),
+                f"Query count grows with the data ({len(queries)} -> "
+                f"{len(grown)}):\n" + format_queries(grown),
+            )
+
+
+def format_queries(queries):
+    return "\n".join(
+        f"{index}. {query['sql']}" for index, query in enumerate(queries, start=1)
+    )
@@ -1,5 +1,45 @@
-from django.test import TestCase
-from .models import Region, WildfireEvent
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest import mock
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from prometheus_client import REGISTRY
+
+from apps.weather.models import WeatherData
+from . import (
+    benchmarking,
+    events,
+    eventstats,
+    importtime,
+    instrumentation,
+    loadtest,
+    metrics,
+    profiling,
+    regioncache,
+    spatial,
+    synthetic,
+)
+from .lazy import lazy_import
+from .testing import QueryBudgetMixin
+from .models import (
+    City,
+    Forest,
+    Region,
+    SoilType,
+    WildfireEvent,
+    WildfireEventRollup,
+)
 
 
 class RegionModelTest(TestCase):
@@ -29,3 +69,1015 @@ class WildfireEventModelTest(TestCase):
         self.assertEqual(str(event), "Wildfire at Test Region on 2024-01-01")
         self.assertEqual(event.severity, WildfireEvent.MEDIUM)
         self.assertEqual(event.area_affected, 10.5)
+
+
+class EventBrokerTest(TestCase):
+    def setUp(self):
+        events._broker = None
+
+    async def test_publish_fans_out_to_topic_subscribers_from_any_thread(self):
+        broker = events.InProcessBroker()
+        first = await broker.subscribe(["region.1"])
+        second = await broker.subscribe(["region.1", "region.2"])
+        other = await broker.subscribe(["region.3"])
+
+        thread = threading.Thread(target=broker.publish, args=("region.1", "frame"))
+        thread.start()
+        thread.join()
+
+        self.assertEqual(await first.get(1), "frame")
+        self.assertEqual(await second.get(1), "frame")
+        self.assertIsNone(await other.get(0.01))
+
+        await first.close()
+        self.assertEqual(broker.subscriber_count("region.1"), 1)
+
+    async def test_slow_subscriber_drops_oldest_frames(self):
+        broker = events.InProcessBroker(queue_size=2)
+        subscription = await broker.subscribe(["regions"])
+        for frame in ("a", "b", "c"):
+            broker.publish("regions", frame)
+        await asyncio.sleep(0)
+
+        self.assertEqual(await subscription.get(1), "b")
+        self.assertEqual(await subscription.get(1), "c")
+
+    def test_publish_waits_for_commit_and_encodes_once(self):
+        with mock.patch.object(events, "get_broker") as get_broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                events.publish(7, "weather", {"temperature": 21.5})
+                self.assertFalse(get_broker.return_value.publish.called)
+
+        frames = [c.args for c in get_broker.return_value.publish.call_args_list]
+        self.assertEqual(
+            frames,
+            [
+                (
+                    "region.7",
+                    events.encode_event(
+                        "weather", {"temperature": 21.5, "region_id": 7}
+                    ),
+                ),
+                (
+                    "regions",
+                    events.encode_event(
+                        "weather", {"temperature": 21.5, "region_id": 7}
+                    ),
+                ),
+            ],
+        )
+
+
+class RegionEventStreamTest(TestCase):
+    def setUp(self):
+        events._broker = None
+        self.user = User.objects.create_user("analyst", password="x")
+
+    async def test_anonymous_users_are_rejected(self):
+        response = await self.async_client.get(
+            reverse("core:region_events"), secure=True
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    async def test_stream_is_unavailable_without_a_shared_broker(self):
+        await self.async_client.aforce_login(self.user)
+        for asgi_mode, single_process in ((False, True), (True, False)):
+            with self.settings(
+                ASGI_MODE=asgi_mode, EVENTS_SINGLE_PROCESS=single_process
+            ):
+                response = await self.async_client.get(
+                    reverse("core:region_events"), secure=True
+                )
+            self.assertEqual(response.status_code, 503)
+
+    def test_default_broker_follows_the_deployment(self):
+        def defaults(**env):
+            environ = {
+                key: value
+                for key, value in os.environ.items()
+                if key not in ("REDIS_URL", "WEB_CONCURRENCY")
+                and not key.startswith("EVENTS_")
+            }
+            output = subprocess.run(
+                [
+                    sys.executable,
+                    "-c",
+                    "import django; django.setup(); from django.conf import settings; "
+                    "print(settings.EVENTS_BROKER, settings.EVENTS_SINGLE_PROCESS)",
+                ],
+                cwd=settings.BASE_DIR,
+                env={**environ, **env, "DJANGO_SETTINGS_MODULE": "config.settings"},
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout
+            return output.split()
+
+        self.assertEqual(defaults(), ["apps.core.events.InProcessBroker", "True"])
+        self.assertEqual(defaults(WEB_CONCURRENCY="4")[1], "False")
+        self.assertEqual(
+            defaults(REDIS_URL="redis://localhost:6379/0")[0],
+            "apps.core.events.RedisBroker",
+        )
+
+    @override_settings(ASGI_MODE=True, EVENTS_SINGLE_PROCESS=True)
+    async def test_streams_frames_of_the_requested_region(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(
+            reverse("core:region_events"), {"region": "5"}, secure=True
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content
+
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+        broker = events.get_broker()
+        broker.publish("region.6", "event: weather\ndata: {}\n\n")
+        broker.publish("region.5", "event: prediction\ndata: {}\n\n")
+        self.assertEqual(await anext(stream), b"event: prediction\ndata: {}\n\n")
+        self.assertEqual(broker.subscriber_count("region.5"), 1)
+
+    async def test_stream_unsubscribes_when_closed(self):
+        stream = events.stream_events(["region.5"], heartbeat=0.01)
+
+        self.assertEqual(await anext(stream), "retry: 5000\n\n")
+        self.assertEqual(await anext(stream), ": keep-alive\n\n")
+        await stream.aclose()
+        self.assertEqual(events.get_broker().subscriber_count("region.5"), 0)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class RegionPageQueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        self.region = Region.objects.create(
+            name="Test Region",
+            latitude=35.0,
+            longitude=-5.0,
+            elevation=1000,
+            area=100,
+            population=1000,
+        )
+        self.add_events()
+
+    def add_events(self):
+        for day in range(1, 4):
+            region = Region.objects.create(
+                name=f"Region {Region.objects.count()}",
+                latitude=35.0,
+                longitude=-5.0,
+                elevation=1000,
+                area=100,
+                population=1000,
+            )
+            for event_region in (self.region, region):
+                WildfireEvent.objects.create(
+                    region=event_region,
+                    start_date=f"2024-01-0{day}T00:00:00Z",
+                    severity=WildfireEvent.MEDIUM,
+                    area_affected=10.5,
+                )
+
+    def test_home(self):
+        # regions, recent events with their region
+        self.assertQueryBudget(
+            lambda: self.client.get(reverse("core:home"), secure=True),
+            2,
+            grow=self.add_events,
+        )
+
+    def test_region_detail(self):
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        url = reverse("core:region_detail", args=[self.region.pk])
+
+        # session, user, region with soil type, events
+        self.assertQueryBudget(
+            lambda: self.client.get(url, secure=True), 4, grow=self.add_events
+        )
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class InstrumentationTest(TestCase):
+    def setUp(self):
+        instrumentation.reset_route_stats()
+        Region.objects.create(
+            name="Test Region",
+            latitude=35.0,
+            longitude=-5.0,
+            elevation=1000,
+            area=100,
+            population=1000,
+        )
+
+    def test_requests_are_aggregated_per_route(self):
+        self.client.get(reverse("core:home"), secure=True)
+        self.client.get(reverse("core:home"), secure=True)
+
+        stats = instrumentation.route_stats()["core:home"]
+        self.assertEqual(stats["requests"], 2)
+        self.assertEqual(stats["queries"]["sum"], 4)  # regions, events
+        self.assertEqual(stats["latency_ms"]["buckets"]["+Inf"], 2)
+        self.assertEqual(stats["over_budget"], 0)
+
+    async def test_async_requests_count_queries_run_in_threads(self):
+        await self.async_client.get(reverse("core:home"), secure=True)
+
+        stats = instrumentation.route_stats()["core:home"]
+        self.assertEqual(stats["queries"]["sum"], 2)
+
+    @override_settings(REQUEST_BUDGETS={"core:home": {"queries": 1}})
+    def test_requests_over_budget_are_logged(self):
+        with self.assertLogs("apps.core.instrumentation", "WARNING") as logs:
+            self.client.get(reverse("core:home"), secure=True)
+
+        self.assertIn("over budget (queries)", logs.output[0])
+        self.assertEqual(instrumentation.route_stats()["core:home"]["over_budget"], 1)
+
+    def test_upstream_calls_are_attributed_to_the_request(self):
+        stats = instrumentation.RequestStats()
+        token = instrumentation._current.set(stats)
+        try:
+            with self.assertRaises(ValueError):
+                with instrumentation.record_upstream("openweathermap"):
+                    raise ValueError("upstream failed")
+        finally:
+            instrumentation._current.reset(token)
+
+        self.assertEqual(stats.upstream_calls, 1)
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse("core:request_stats")
+        user = User.objects.create_user("analyst", password="x")
+        self.client.force_login(user)
+        self.assertEqual(self.client.get(url, secure=True).status_code, 302)
+
+        user.is_staff = True
+        user.save()
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("core:request_stats", instrumentation.route_stats())
+
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class MetricsTest(TestCase):
+    def test_upstream_outcomes_are_counted_per_provider(self):
+        name = "wildfire_weather_fetches_total"
+        success = sample(name, provider="noaa", outcome="success")
+        failure = sample(name, provider="noaa", outcome="failure")
+
+        with instrumentation.record_upstream("noaa"):
+            pass
+        with self.assertRaises(ValueError):
+            with instrumentation.record_upstream("noaa"):
+                raise ValueError("upstream failed")
+
+        self.assertEqual(sample(name, provider="noaa", outcome="success"), success + 1)
+        self.assertEqual(sample(name, provider="noaa", outcome="failure"), failure + 1)
+
+    def test_cache_lookups_are_counted(self):
+        name = "wildfire_cache_requests_total"
+        hits = sample(name, cache="test", result="hit")
+
+        metrics.record_cache("test", True, 3)
+        metrics.record_cache("test", False, 0)
+
+        self.assertEqual(sample(name, cache="test", result="hit"), hits + 3)
+        self.assertEqual(sample(name, cache="test", result="miss"), 0)
+
+    @override_settings(DEBUG=True)
+    def test_endpoint_renders_text_exposition(self):
+        metrics.record_ingest_cycle(4)
+
+        response = self.client.get(reverse("core:metrics"), secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+        self.assertIn(b"wildfire_weather_rows_ingested_total", response.content)
+
+    @override_settings(METRICS_TOKEN="secret")
+    def test_endpoint_requires_configured_token(self):
+        url = reverse("core:metrics")
+        self.assertEqual(self.client.get(url, secure=True).status_code, 401)
+
+        response = self.client.get(url, secure=True, HTTP_AUTHORIZATION="Bearer secret")
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_endpoint_is_hidden_in_production_without_a_token(self):
+        response = self.client.get(reverse("core:metrics"), secure=True)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class BenchmarkingTest(TestCase):
+    def test_parametrized_benchmarks_run_each_case(self):
+        calls = []
+        bench = benchmarking.Benchmark(
+            "test.sum", lambda size: lambda: calls.append(sum(range(size))), [1, 10]
+        )
+
+        results = benchmarking.run_benchmarks([bench], repeat=2, min_time=0.001)
+
+        self.assertEqual(list(results), ["test.sum[1]", "test.sum[10]"])
+        self.assertGreater(results["test.sum[10]"]["median"], 0)
+        self.assertIn(45, calls)
+
+    def test_regressions_above_threshold_are_reported(self):
+        baselines = {"fast": {"median": 1.0}, "slow": {"median": 1.0}}
+        results = {
+            "fast": {"median": 1.2},
+            "slow": {"median": 1.5},
+            "new": {"median": 9.0},
+        }
+
+        regressions = benchmarking.compare(results, baselines, threshold=0.25)
+
+        self.assertEqual([case for case, *_ in regressions], ["slow"])
+
+    def test_hot_path_benchmarks_are_discovered(self):
+        names = [bench.name for bench in benchmarking.get_benchmarks()]
+        self.assertIn("risk.calculate_wildfire_risk", names)
+        self.assertIn("dashboard.render", names)
+
+
+class LoadTestTest(TestCase):
+    def test_profile_ramps_linearly_between_stages(self):
+        stages = loadtest.parse_profile("10s:10,20s:10,10s:0")
+
+        self.assertEqual(loadtest.target_users(stages, 0), 0)
+        self.assertEqual(loadtest.target_users(stages, 5), 5)
+        self.assertEqual(loadtest.target_users(stages, 25), 10)
+        self.assertEqual(loadtest.target_users(stages, 35), 5)
+        self.assertEqual(loadtest.target_users(stages, 99), 0)
+
+    def test_unknown_endpoints_are_rejected(self):
+        self.assertEqual(
+            loadtest.parse_mix("dashboard=1,predictions=3"),
+            [("dashboard", 1.0), ("predictions", 3.0)],
+        )
+        with self.assertRaises(ValueError):
+            loadtest.parse_mix("admin=1")
+
+    def test_summary_reports_percentiles_and_error_rate(self):
+        stats = loadtest.EndpointStats()
+        for latency in range(1, 101):
+            stats.record(latency / 1000, 200)
+        stats.record(0.5, 503)
+        stats.record(0.5)
+
+        summary = stats.summary(duration=2)
+
+        self.assertEqual(summary["requests"], 102)
+        self.assertEqual(summary["errors"], 2)
+        self.assertEqual(summary["throughput_rps"], 51)
+        self.assertEqual(summary["status_codes"]["connection_error"], 1)
+        self.assertLess(summary["latency_ms"]["p50"], summary["latency_ms"]["p99"])
+
+
+class SyntheticDataTest(TestCase):
+    def test_dataset_is_reproducible_from_its_seed(self):
+        counts = synthetic.generate_dataset(
+            regions=2, years=0.1, cities_per_region=2, forests_per_region=3, seed=7
+        )
+        self.assertEqual(counts["weather"], 2 * 36 * 24)
+        self.assertEqual(counts["cities"], 4)
+        self.assertEqual(
+            Forest.objects.filter(region__name__startswith="Synthetic").count(), 6
+        )
+
+        first = list(
+            WeatherData.objects.order_by("region__name", "timestamp").values_list(
+                "temperature", "humidity", "precipitation"
+            )
+        )
+        synthetic.delete_dataset()
+        self.assertFalse(WeatherData.objects.exists())
+
+        synthetic.generate_dataset(
+            regions=2, years=0.1, cities_per_region=2, forests_per_region=3, seed=7
+        )
+        second = list(
+            WeatherData.objects.order_by("region__name", "timestamp").values_list(
+                "temperature", "humidity", "precipitation"
+            )
+        )
+        self.assertEqual(first, second)
+
+    def test_hot_dry_streaks_raise_fire_danger(self):
+        days = 10
+        mild = {
+            "temperature": np.full(days * 24, 18.0),
+            "humidity": np.full(days * 24, 70.0),
+            "precipitation": np.full(days * 24, 0.2),
+        }
+        hot_dry = {
+            "temperature": np.full(days * 24, 38.0),
+            "humidity": np.full(days * 24, 12.0),
+            "precipitation": np.zeros(days * 24),
+        }
+
+        mild_danger, _, _ = synthetic.fire_danger(mild, days, 0.5)
+        danger, dry_days, hot_dry_days = synthetic.fire_danger(hot_dry, days, 0.5)
+
+        self.assertEqual(list(hot_dry_days), list(range(1, days + 1)))
+        self.assertEqual(dry_days[-1], days)
+        self.assertTrue((danger > mild_danger).all())
+        self.assertGreater(danger[-1], danger[0])
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class ProfilingTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            PROFILING_ENABLED=True,
+            PROFILING_DIR=directory.name,
+            PROFILING_MAX_TRACES=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.staff = User.objects.create_user("ops", password="x", is_staff=True)
+
+    def test_requests_are_not_profiled_while_another_profile_runs(self):
+        self.client.force_login(self.staff)
+        with profiling.PROFILE_LOCK:
+            response = self.client.get(
+                reverse("core:home"), {"profile": "1"}, secure=True
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(profiling.list_trace_ids(), [])
+
+    def test_only_staff_can_request_a_profile(self):
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        response = self.client.get(reverse("core:home"), {"profile": "1"}, secure=True)
+        self.assertNotIn("X-Profile-Id", response)
+
+        self.client.force_login(self.staff)
+        response = self.client.get(
+            reverse("core:home"), secure=True, HTTP_X_PROFILE="1"
+        )
+        self.assertIn(response["X-Profile-Id"], profiling.list_trace_ids())
+
+    def test_ring_buffer_keeps_the_newest_traces(self):
+        self.client.force_login(self.staff)
+        trace_ids = [
+            self.client.get(reverse("core:home"), {"profile": "1"}, secure=True)[
+                "X-Profile-Id"
+            ]
+            for _ in range(3)
+        ]
+
+        self.assertEqual(sorted(profiling.list_trace_ids()), sorted(trace_ids[1:]))
+        listed = self.client.get(reverse("core:profiles"), secure=True).json()
+        self.assertEqual(listed["results"][0]["view"], "core:home")
+
+    @override_settings(PROFILING_SAMPLE_RATE=1.0)
+    async def test_async_requests_are_sampled(self):
+        response = await self.async_client.get(reverse("core:home"), secure=True)
+
+        trace = profiling.list_traces()[0]
+        self.assertEqual(trace["id"], response["X-Profile-Id"])
+        self.assertEqual(trace["trigger"], "sampled")
+
+    def test_traces_download_as_pstats_and_speedscope(self):
+        self.client.force_login(self.staff)
+        trace_id = self.client.get(reverse("core:home"), {"profile": "1"}, secure=True)[
+            "X-Profile-Id"
+        ]
+        url = reverse("core:profile_download", args=[trace_id])
+
+        response = self.client.get(url, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(b"".join(response.streaming_content))
+
+        response = self.client.get(url, {"format": "speedscope"}, secure=True)
+        document = json.loads(response.content)
+        profile = document["profiles"][0]
+        self.assertEqual(len(profile["samples"]), len(profile["weights"]))
+        names = {frame["name"] for frame in document["shared"]["frames"]}
+        self.assertIn("home", names)
+
+        missing = reverse("core:profile_download", args=["..%2Fsettings"])
+        self.assertEqual(self.client.get(missing, secure=True).status_code, 404)
+
+
+class StartupImportTest(TestCase):
+    def test_url_configuration_does_not_import_the_scientific_stack(self):
+        report = importtime.measure("config.urls")
+
+        packages = {package["package"] for package in report["packages"]}
+        self.assertIn("django", packages)
+        self.assertFalse(packages & set(importtime.HEAVY_PACKAGES), report)
+
+    def test_lazy_module_imports_on_first_use(self):
+        module = lazy_import("json.decoder")
+        self.assertIn("not loaded", repr(module))
+
+        self.assertTrue(issubclass(module.JSONDecodeError, ValueError))
+        self.assertIn("(loaded)", repr(module))
+
+    def test_importtime_output_is_aggregated_by_package(self):
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       100 |        100 |     scipy._lib\n"
+            "import time:       300 |        400 |   scipy\n"
+            "import time:        50 |         50 | json\n"
+        )
+
+        packages = importtime.aggregate_by_package(importtime.parse_importtime(output))
+
+        self.assertEqual(
+            packages,
+            [
+                {"package": "scipy", "self_us": 400, "modules": 2},
+                {"package": "json", "self_us": 50, "modules": 1},
+            ],
+        )
+
+
+class RegionCacheTest(TestCase):
+    def setUp(self):
+        Region.objects.all().delete()
+        self.soil = SoilType.objects.create(
+            name="Loam", description="Loam soil", moisture_retention=0.6
+        )
+        self.north = Region.objects.create(
+            name="North",
+            latitude=35.0,
+            longitude=-5.0,
+            elevation=1000,
+            area=100,
+            population=1000,
+            soil_type=self.soil,
+            vegetation_density=0.7,
+        )
+        self.south = Region.objects.create(
+            name="South",
+            latitude=30.0,
+            longitude=-9.0,
+            elevation=200,
+            area=100,
+            population=1000,
+            climate_zone="semi_arid",
+        )
+        for area in range(1, 5):
+            Forest.objects.create(
+                name=f"Forest {area}",
+                region=self.north,
+                area=area,
+                dominant_species="Cedar",
+                density=0.5,
+            )
+
+    def test_version_changes_reach_other_processes(self):
+        before = regioncache.shared_version()
+
+        subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import django; django.setup(); "
+                "from apps.core import regioncache; regioncache.bump_version()",
+            ],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "config.settings"},
+            check=True,
+        )
+
+        self.assertNotEqual(regioncache.shared_version(), before)
+
+    def test_loads_compact_arrays_once(self):
+        with self.assertNumQueries(2):
+            metadata = regioncache.get_region_metadata()
+        with self.assertNumQueries(0):
+            self.assertIs(regioncache.get_region_metadata(), metadata)
+
+        self.assertEqual(metadata.ids.tolist(), [self.north.pk, self.south.pk])
+        self.assertEqual(metadata.coordinates().tolist(), [[35.0, -5.0], [30.0, -9.0]])
+        self.assertEqual(metadata.climate_zone.tolist(), ["mediterranean", "semi_arid"])
+        self.assertEqual(metadata.soil_type_id.tolist(), [self.soil.pk, -1])
+        self.assertTrue(np.isnan(metadata.moisture_retention[1]))
+        self.assertEqual(
+            metadata.major_forests(self.north.pk), ["Forest 4", "Forest 3", "Forest 2"]
+        )
+        self.assertEqual(metadata.major_forests(self.south.pk), [])
+        self.assertEqual(metadata.region(self.north.pk).soil_type.name, "Loam")
+        self.assertIsNone(metadata.region(0))
+
+    def test_saves_and_deletes_invalidate(self):
+        regioncache.get_region_metadata()
+        self.south.vegetation_density = 0.1
+        self.south.save()
+        self.assertEqual(
+            regioncache.get_region_metadata().vegetation_density.tolist(), [0.7, 0.1]
+        )
+
+        self.soil.moisture_retention = 0.2
+        self.soil.save()
+        self.assertEqual(regioncache.get_region_metadata().moisture_retention[0], 0.2)
+
+        Forest.objects.filter(area=4).delete()
+        self.assertEqual(
+            regioncache.get_region_metadata().major_forests(self.north.pk),
+            ["Forest 3", "Forest 2", "Forest 1"],
+        )
+
+    def test_shared_version_reloads_other_processes(self):
+        metadata = regioncache.get_region_metadata()
+        version = regioncache.shared_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.north.save()
+        self.assertNotEqual(regioncache.shared_version(), version)
+
+        # Another process bumping the version
+        metadata = regioncache.get_region_metadata()
+        regioncache.bump_version()
+        with self.assertNumQueries(2):
+            self.assertIsNot(regioncache.get_region_metadata(), metadata)
+
+    def test_region_index(self):
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        regioncache.get_region_metadata()
+        with self.assertNumQueries(2):  # session, user
+            response = self.client.get(reverse("core:region_index"), secure=True)
+        self.assertEqual(
+            response.json(),
+            [
+                {
+                    "id": self.north.pk,
+                    "name": "North",
+                    "latitude": 35.0,
+                    "longitude": -5.0,
+                },
+                {
+                    "id": self.south.pk,
+                    "name": "South",
+                    "latitude": 30.0,
+                    "longitude": -9.0,
+                },
+            ],
+        )
+
+    @override_settings(REGION_CACHE_MAX_AGE=0)
+    def test_max_age_bounds_staleness(self):
+        metadata = regioncache.get_region_metadata()
+        self.assertIsNot(regioncache.get_region_metadata(), metadata)
+
+
+class SpatialIndexTest(TestCase):
+    def setUp(self):
+        Region.objects.all().delete()
+        rng = np.random.default_rng(7)
+        self.regions = Region.objects.bulk_create(
+            [
+                Region(
+                    name=f"Region {index}",
+                    latitude=float(latitude),
+                    longitude=float(longitude),
+                    elevation=100,
+                    area=100,
+                    population=1000,
+                )
+                for index, (latitude, longitude) in enumerate(
+                    zip(rng.uniform(-80, 80, 200), rng.uniform(-180, 180, 200))
+                )
+            ]
+        )
+        self.regions[0].latitude, self.regions[0].longitude = 35.0, -5.0
+        self.regions[0].save()
+        Forest.objects.create(
+            name="Cedar Forest",
+            region=self.regions[0],
+            area=10,
+            dominant_species="Cedar",
+            density=0.5,
+        )
+        self.points = np.column_stack(
+            [rng.uniform(-90, 90, 50), rng.uniform(-180, 180, 50)]
+        )
+
+    def brute_force(self, latitude, longitude):
+        distances = spatial.haversine_km(
+            latitude,
+            longitude,
+            [region.latitude for region in self.regions],
+            [region.longitude for region in self.regions],
+        )
+        return distances, np.argsort(distances)
+
+    def test_nearest_and_within_match_brute_force(self):
+        index = spatial.get_spatial_index("regions")
+        for latitude, longitude in self.points:
+            distances, order = self.brute_force(latitude, longitude)
+
+            nearest = index.nearest(latitude, longitude, k=5)
+            self.assertEqual(
+                [region.pk for region, _ in nearest],
+                [self.regions[row].pk for row in order[:5]],
+            )
+            np.testing.assert_allclose(
+                [distance for _, distance in nearest], distances[order[:5]], atol=1e-6
+            )
+
+            within = index.within(latitude, longitude, 2000)
+            self.assertEqual(
+                [region.pk for region, _ in within],
+                [self.regions[row].pk for row in order if distances[row] <= 2000],
+            )
+
+        matches = index.nearest_each(self.points)
+        self.assertEqual(
+            [region.pk for region, _ in matches],
+            [self.regions[self.brute_force(*point)[1][0]].pk for point in self.points],
+        )
+
+    def test_nearest_each_has_one_entry_per_point(self):
+        points = [(35.0, -5.0), (-80.0, 120.0)]
+        self.assertEqual(
+            spatial.SpatialIndex([], [], []).nearest_each(points), [None, None]
+        )
+
+        index = spatial.DatabaseSpatialIndex(Region.objects.none())
+        region = self.regions[0]
+        with mock.patch.object(index, "nearest", side_effect=[[(region, 12.0)], []]):
+            self.assertEqual(index.nearest_each(points), [(region, 12.0), None])
+
+    def test_bounding_box_contains_circle(self):
+        rng = np.random.default_rng(3)
+        for latitude, longitude, radius in zip(
+            rng.uniform(-85, 85, 200),
+            rng.uniform(-180, 180, 200),
+            rng.uniform(1, 3000, 200),
+        ):
+            bearing = rng.uniform(0, 2 * np.pi, 50)
+            # Points on the circle around (latitude, longitude)
+            angle = radius / spatial.EARTH_RADIUS_KM
+            lat1, lon1 = np.radians(latitude), np.radians(longitude)
+            lat2 = np.arcsin(
+                np.sin(lat1) * np.cos(angle)
+                + np.cos(lat1) * np.sin(angle) * np.cos(bearing)
+            )
+            lon2 = lon1 + np.arctan2(
+                np.sin(bearing) * np.sin(angle) * np.cos(lat1),
+                np.cos(angle) - np.sin(lat1) * np.sin(lat2),
+            )
+            lon2 = (np.degrees(lon2) + 180) % 360 - 180
+
+            min_lat, min_lon, max_lat, max_lon = spatial.bounding_box(
+                latitude, longitude, radius
+            )
+            self.assertTrue(np.all(np.degrees(lat2) >= min_lat - 1e-9))
+            self.assertTrue(np.all(np.degrees(lat2) <= max_lat + 1e-9))
+            self.assertTrue(np.all(lon2 >= min_lon - 1e-9))
+            self.assertTrue(np.all(lon2 <= max_lon + 1e-9))
+
+        self.assertEqual(spatial.bounding_box(89.0, 0.0, 500)[1::2], (-180.0, 180.0))
+        self.assertEqual(spatial.bounding_box(0.0, 179.9, 50)[1::2], (-180.0, 180.0))
+
+    def test_city_index_rebuilt_on_change(self):
+        self.assertEqual(len(spatial.get_spatial_index("cities")), 0)
+        city = City.objects.create(
+            name="Ifrane", region=self.regions[0], latitude=33.5, longitude=-5.1
+        )
+        [(match, distance)] = spatial.get_spatial_index("cities").nearest(33.5, -5.1)
+        self.assertEqual(match.pk, city.pk)
+        self.assertAlmostEqual(distance, 0)
+
+        city.delete()
+        self.assertEqual(spatial.get_spatial_index("cities").within(33.5, -5.1, 10), [])
+
+    def test_endpoints(self):
+        nearest_url = reverse("core:spatial_nearest")
+        within_url = reverse("core:spatial_within")
+        self.assertEqual(
+            self.client.get(
+                nearest_url, {"lat": 35, "lon": -5}, secure=True
+            ).status_code,
+            403,
+        )
+
+        self.client.force_login(User.objects.create_user("dispatcher", password="x"))
+        response = self.client.get(
+            nearest_url, {"lat": 35.01, "lon": -5, "k": 3}, secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["count"], 3)
+        self.assertEqual(data["results"][0]["id"], self.regions[0].pk)
+        self.assertEqual(data["results"][0]["major_forests"], ["Cedar Forest"])
+        self.assertAlmostEqual(data["results"][0]["distance_km"], 1.112, places=2)
+
+        response = self.client.get(
+            within_url, {"lat": 35, "lon": -5, "radius_km": 1}, secure=True
+        )
+        self.assertEqual(response.json()["count"], 1)
+
+        City.objects.create(
+            name="Ifrane", region=self.regions[0], latitude=33.5, longitude=-5.1
+        )
+        response = self.client.get(
+            within_url,
+            {"lat": 33.5, "lon": -5.1, "radius_km": 5, "kind": "cities"},
+            secure=True,
+        )
+        self.assertEqual(
+            [city["name"] for city in response.json()["results"]], ["Ifrane"]
+        )
+
+        for url, params in (
+            (nearest_url, {"lat": 95, "lon": 0}),
+            (nearest_url, {"lon": 0}),
+            (nearest_url, {"lat": 0, "lon": 0, "k": 0}),
+            (nearest_url, {"lat": 0, "lon": 0, "kind": "forests"}),
+            (within_url, {"lat": 0, "lon": 0}),
+            (within_url, {"lat": 0, "lon": 0, "radius_km": -1}),
+        ):
+            self.assertEqual(self.client.get(url, params, secure=True).status_code, 400)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class EventAnalyticsTest(TestCase):
+    def setUp(self):
+        self.north = Region.objects.create(
+            name="North",
+            latitude=35.0,
+            longitude=-5.0,
+            elevation=1000,
+            area=100,
+            population=1000,
+        )
+        self.south = Region.objects.create(
+            name="South",
+            latitude=30.0,
+            longitude=-9.0,
+            elevation=200,
+            area=100,
+            population=1000,
+        )
+        self.create_event(
+            self.north, "2019-07-02T12:00:00Z", WildfireEvent.HIGH, 5.0, 24
+        )
+        self.create_event(self.north, "2019-07-20T12:00:00Z", WildfireEvent.LOW, 1.0)
+        self.create_event(
+            self.north, "2021-08-01T12:00:00Z", WildfireEvent.EXTREME, 40.0, 72
+        )
+        self.create_event(
+            self.south, "2021-08-03T12:00:00Z", WildfireEvent.MEDIUM, 2.5, 12
+        )
+
+    def create_event(self, region, start, severity, area, hours=None):
+        start = datetime.fromisoformat(start)
+        return WildfireEvent.objects.create(
+            region=region,
+            start_date=start,
+            end_date=start + timedelta(hours=hours) if hours else None,
+            severity=severity,
+            area_affected=area,
+        )
+
+    def rollups(self):
+        return list(
+            WildfireEventRollup.objects.values_list(
+                "region_id", "year", "month", "event_count", "area_affected"
+            )
+        )
+
+    def test_rollups_follow_event_changes(self):
+        self.assertEqual(
+            self.rollups(),
+            [
+                (self.north.pk, 2019, 7, 2, 6.0),
+                (self.north.pk, 2021, 8, 1, 40.0),
+                (self.south.pk, 2021, 8, 1, 2.5),
+            ],
+        )
+
+        # Moving an event to another region and year updates both rollups
+        event = WildfireEvent.objects.get(area_affected=1.0)
+        event.region = self.south
+        event.start_date = datetime.fromisoformat("2020-01-05T00:00:00Z")
+        event.save()
+        WildfireEvent.objects.filter(area_affected=40.0).delete()
+        self.assertEqual(
+            self.rollups(),
+            [
+                (self.north.pk, 2019, 7, 1, 5.0),
+                (self.south.pk, 2020, 1, 1, 1.0),
+                (self.south.pk, 2021, 8, 1, 2.5),
+            ],
+        )
+
+        # A full rebuild (as after bulk inserts) gives the same rollups
+        rollups = self.rollups()
+        self.assertEqual(eventstats.rebuild_rollups(), 3)
+        self.assertEqual(self.rollups(), rollups)
+
+        self.south.delete()
+        self.assertEqual(self.rollups(), [(self.north.pk, 2019, 7, 1, 5.0)])
+
+    def test_statistics(self):
+        [by_region_2021] = [
+            row
+            for row in eventstats.rollup_statistics(["region", "year"])
+            if row["region_id"] == self.north.pk and row["year"] == 2021
+        ]
+        self.assertEqual(by_region_2021["event_count"], 1)
+        self.assertEqual(by_region_2021["avg_containment_hours"], 72)
+
+        [overall] = eventstats.rollup_statistics()
+        self.assertEqual(overall["event_count"], 4)
+        self.assertEqual(overall["area_affected"], 48.5)
+        self.assertEqual(
+            overall["severity"], {"low": 1, "medium": 1, "high": 1, "extreme": 1}
+        )
+        self.assertEqual(overall["avg_containment_hours"], 36)
+
+        by_month = eventstats.rollup_statistics(["month"], start_year=2020)
+        self.assertEqual(
+            [(row["month"], row["event_count"]) for row in by_month], [(8, 2)]
+        )
+
+    def test_analytics_api(self):
+        url = reverse("core:event_analytics")
+        self.assertEqual(self.client.get(url, secure=True).status_code, 403)
+
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        with self.assertNumQueries(3):  # session, user, rollups
+            response = self.client.get(
+                url,
+                {"group_by": "region,year", "region_id": self.north.pk},
+                secure=True,
+            )
+        self.assertEqual(
+            [(row["year"], row["event_count"]) for row in response.json()["results"]],
+            [(2019, 2), (2021, 1)],
+        )
+        for params in ({"group_by": "week"}, {"start_year": "later"}):
+            self.assertEqual(self.client.get(url, params, secure=True).status_code, 400)
+
+    def test_historical_fires_api(self):
+        url = reverse("core:historical_fires")
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+
+        params = {
+            "region_id": self.north.pk,
+            "start_date": "2019-07-01",
+            "end_date": "2019-07-31",
+        }
+        with self.assertNumQueries(3):  # session, user, events
+            data = self.client.get(url, params, secure=True).json()
+        self.assertEqual(data["interval"], "day")
+        self.assertEqual(
+            [(fire["date"], fire["event_count"]) for fire in data["fires"]],
+            [("2019-07-02", 1), ("2019-07-20", 1)],
+        )
+        self.assertEqual(data["statistics"]["event_count"], 2)
+        self.assertEqual(data["statistics"]["avg_containment_hours"], 24)
+
+        # Decades are served from the rollups
+        params.update(start_date="2000-01-01", end_date="2024-12-31")
+        with self.assertNumQueries(3):
+            data = self.client.get(url, params, secure=True).json()
+        self.assertEqual(data["interval"], "year")
+        self.assertEqual(
+            [(fire["date"], fire["event_count"]) for fire in data["fires"]],
+            [("2019-01-01", 2), ("2021-01-01", 1)],
+        )
+
+        params.update(start_date="2019-07-15", end_date="2021-08-31", interval="month")
+        data = self.client.get(url, params, secure=True).json()
+        self.assertEqual(
+            [fire["date"] for fire in data["fires"]], ["2019-07-01", "2021-08-01"]
+        )
+
+        for params in (
+            {},
+            {
+                "region_id": self.north.pk,
+                "start_date": "2020-01-02",
+                "end_date": "2020-01-01",
+            },
+            {"region_id": self.north.pk, "interval": "week"},
+            {"region_id": self.north.pk, "start_date": "yesterday"},
+        ):
+            self.assertEqual(self.client.get(url, params, secure=True).status_code, 400)
+
+    def test_historical_page(self):
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        response = self.client.get(reverse("core:historical_data"), secure=True)
+        self.assertContains(response, "/api/historical-fires/")
@@ -5,4 +5,21 @@ app_name = "core"
 
 urlpatterns = [
     path("", views.home, name="home"),
+    path("regions/", views.region_list, name="regions"),
+    path("regions/<int:pk>/", views.region_detail, name="region_detail"),
+    path("events/", views.region_events, name="region_events"),
+    path("historical/", views.historical_data, name="historical_data"),
+    path("instrumentation/", views.request_stats, name="request_stats"),
+    path("instrumentation/profiles/", views.profile_list, name="profiles"),
+    path(
+        "instrumentation/profiles/<str:trace_id>/",
+        views.profile_download,
+        name="profile_download",
+    ),
+    path("metrics/", views.prometheus_metrics, name="metrics"),
+    path("api/regions/", views.region_index, name="region_index"),
+    path("api/events/analytics/", views.event_analytics, name="event_analytics"),
+    path("api/historical-fires/", views.historical_fires, name="historical_fires"),
+    path("api/spatial/nearest/", views.spatial_nearest, name="spatial_nearest"),
+    path("api/spatial/within/", views.spatial_within, name="spatial_within"),
 ]
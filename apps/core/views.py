@@ -1,11 +1,51 @@
+import hmac
+from datetime import timedelta
+
 from django.shortcuts import render, get_object_or_404
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view
+from rest_framework.response import Response
+
+from . import eventstats, metrics, profiling, spatial
+from .events import (
+    ALL_REGIONS_TOPIC,
+    region_topic,
+    stream_events,
+    streaming_available,
+)
+from .exports import parse_time_bound
+from .instrumentation import route_stats
 from .models import Region, WildfireEvent
+from .regioncache import get_region_metadata
+
+
+# Events listed on a region's page, most recent first
+RECENT_EVENTS = 20
+
+# Longest ranges served per day and per month by the historical fires API;
+# longer ones are served per month and per year
+DAILY_MAX_DAYS = 366
+MONTHLY_MAX_DAYS = 3660
+
+INTERVALS = ("day", "month", "year")
 
 
 def home(request):
     regions = Region.objects.all()
-    recent_events = WildfireEvent.objects.order_by("-start_date")[:5]
+    recent_events = WildfireEvent.objects.select_related("region").order_by(
+        "-start_date"
+    )[:5]
     return render(
         request, "core/home.html", {"regions": regions, "recent_events": recent_events}
     )
@@ -19,8 +59,310 @@ def region_list(request):
 
 @login_required
 def region_detail(request, pk):
-    region = get_object_or_404(Region, pk=pk)
-    events = WildfireEvent.objects.filter(region=region).order_by("-start_date")
+    region = get_object_or_404(Region.objects.select_related("soil_type"), pk=pk)
+    # Older events are browsed on the historical data page
+    events = WildfireEvent.objects.filter(region=region).order_by("-start_date")[
+        :RECENT_EVENTS
+    ]
     return render(
         request, "core/region_detail.html", {"region": region, "events": events}
     )
+
+
+@login_required
+def historical_data(request):
+    return render(request, "historical_data/index.html")
+
+
+async def region_events(request):
+    """
+    Stream live prediction and weather updates as Server-Sent Events.
+
+    ``?region=<id>`` (repeatable) selects the regions to follow; without it
+    updates of every region are streamed. Answers 503 unless served under
+    ASGI with a broker reaching every process (see streaming_available);
+    clients then poll instead.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return JsonResponse({"error": "Authentication required"}, status=403)
+    if not streaming_available():
+        return JsonResponse({"error": "Live updates are not available"}, status=503)
+
+    region_ids = request.GET.getlist("region")
+    if not all(region_id.isdigit() for region_id in region_ids):
+        return JsonResponse({"error": "Invalid region ID"}, status=400)
+    topics = [region_topic(region_id) for region_id in region_ids] or [
+        ALL_REGIONS_TOPIC
+    ]
+
+    response = StreamingHttpResponse(
+        stream_events(topics), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    # Disable response buffering in nginx-style reverse proxies
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@staff_member_required
+def request_stats(request):
+    """Per-route request cost histograms aggregated by this process."""
+    return JsonResponse(route_stats())
+
+
+@staff_member_required
+def profile_list(request):
+    """Stored request profiles, newest first."""
+    return JsonResponse({"results": profiling.list_traces()})
+
+
+@staff_member_required
+def profile_download(request, trace_id):
+    """Download a stored profile as pstats (default) or ``?format=speedscope``."""
+    try:
+        if request.GET.get("format") == "speedscope":
+            stats = profiling.load_stats(trace_id)
+            response = JsonResponse(profiling.to_speedscope(stats, name=trace_id))
+            response["Content-Disposition"] = (
+                f'attachment; filename="{trace_id}.speedscope.json"'
+            )
+            return response
+        return FileResponse(
+            open(profiling.trace_path(trace_id, "prof"), "rb"),
+            as_attachment=True,
+            filename=f"{trace_id}.prof",
+            content_type="application/octet-stream",
+        )
+    except (ValueError, FileNotFoundError):
+        raise Http404("Profile not found")
+
+
+def prometheus_metrics(request):
+    """
+    Metrics of all worker processes in the Prometheus text format.
+
+    Requires METRICS_TOKEN as a bearer token; without one configured the
+    endpoint only exists in DEBUG.
+    """
+    token = settings.METRICS_TOKEN
+    if not token:
+        if not settings.DEBUG:
+            raise Http404
+    else:
+        supplied = request.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(supplied.encode(), token.encode()):
+            return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+
+    body, content_type = metrics.exposition()
+    return HttpResponse(body, content_type=content_type)
+
+
+@api_view(["GET"])
+def region_index(request):
+    """Id, name and coordinates of every region, for region pickers."""
+    return Response(
+        [
+            {
+                "id": region.pk,
+                "name": region.name,
+                "latitude": region.latitude,
+                "longitude": region.longitude,
+            }
+            for region in get_region_metadata().regions
+        ]
+    )
+
+
+def spatial_item(kind, item, distance):
+    if kind == "regions":
+        return {
+            "id": item.pk,
+            "name": item.name,
+            "latitude": item.latitude,
+            "longitude": item.longitude,
+            "distance_km": round(distance, 3),
+            "major_forests": get_region_metadata().major_forests(item.pk),
+        }
+    return {
+        "id": item.pk,
+        "name": item.name,
+        "region_id": item.region_id,
+        "latitude": item.latitude,
+        "longitude": item.longitude,
+        "population": item.population,
+        "distance_km": round(distance, 3),
+    }
+
+
+def spatial_point(params):
+    """
+    Kind and coordinates of a spatial query's parameters.
+
+    Raises:
+        ValueError: If they are missing or out of range
+    """
+    kind = params.get("kind", "regions")
+    if kind not in spatial.KINDS:
+        raise ValueError(f"kind must be one of {', '.join(spatial.KINDS)}")
+    try:
+        latitude = float(params["lat"])
+        longitude = float(params["lon"])
+    except (KeyError, ValueError):
+        raise ValueError("lat and lon are required")
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("lat must be within [-90, 90] and lon within [-180, 180]")
+    return kind, latitude, longitude
+
+
+@api_view(["GET"])
+def spatial_nearest(request):
+    """
+    The ``k`` regions (or ``?kind=cities``) nearest to ``?lat=&lon=``, nearest
+    first.
+    """
+    try:
+        kind, latitude, longitude = spatial_point(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        k = int(request.query_params.get("k", 1))
+    except ValueError:
+        k = 0
+    if not 1 <= k <= settings.SPATIAL_MAX_RESULTS:
+        return Response(
+            {"error": f"k must be within [1, {settings.SPATIAL_MAX_RESULTS}]"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    matches = spatial.get_spatial_index(kind).nearest(latitude, longitude, k)
+    return Response(
+        {
+            "count": len(matches),
+            "results": [spatial_item(kind, *match) for match in matches],
+        }
+    )
+
+
+@api_view(["GET"])
+def spatial_within(request):
+    """
+    Regions (or ``?kind=cities``) within ``?radius_km=`` of ``?lat=&lon=``,
+    nearest first. ``count`` includes matches beyond SPATIAL_MAX_RESULTS.
+    """
+    try:
+        kind, latitude, longitude = spatial_point(request.query_params)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        radius_km = float(request.query_params["radius_km"])
+    except (KeyError, ValueError):
+        radius_km = None
+    if radius_km is None or not 0 <= radius_km < float("inf"):
+        return Response(
+            {"error": "radius_km must be a non-negative number"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+
+    matches = spatial.get_spatial_index(kind).within(latitude, longitude, radius_km)
+    return Response(
+        {
+            "count": len(matches),
+            "results": [
+                spatial_item(kind, *match)
+                for match in matches[: settings.SPATIAL_MAX_RESULTS]
+            ],
+        }
+    )
+
+
+def optional_int(params, name):
+    """
+    Integer query parameter, or None when absent.
+
+    Raises:
+        ValueError: If it is not an integer
+    """
+    value = params.get(name)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+@api_view(["GET"])
+def event_analytics(request):
+    """
+    Wildfire event counts, burned area, severity distribution and mean
+    containment time from the event rollups.
+
+    ``?group_by=`` takes a comma-separated subset of region, year and month
+    (default: year); ``region_id``, ``start_year`` and ``end_year`` filter.
+    """
+    params = request.query_params
+    group_by = [name for name in params.get("group_by", "year").split(",") if name]
+    if any(name not in eventstats.GROUPINGS for name in group_by):
+        return Response(
+            {"error": f"group_by must be among {', '.join(eventstats.GROUPINGS)}"},
+            status=status.HTTP_400_BAD_REQUEST,
+        )
+    try:
+        filters = {
+            name: optional_int(params, name)
+            for name in ("region_id", "start_year", "end_year")
+        }
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(
+        {
+            "group_by": group_by,
+            "results": eventstats.rollup_statistics(group_by, **filters),
+        }
+    )
+
+
+@api_view(["GET"])
+def historical_fires(request):
+    """
+    A region's wildfire events between ``?start_date=`` and ``?end_date=``
+    per day, month or year (``?interval=``; by default the finest one
+    suited to the range), with the statistics of the whole range.
+    """
+    params = request.query_params
+    try:
+        region_id = optional_int(params, "region_id")
+        if region_id is None:
+            raise ValueError("region_id is required")
+        end = parse_time_bound(params.get("end_date"), end_of_day=True)
+        end = end or timezone.now()
+        start = parse_time_bound(params.get("start_date")) or end - timedelta(days=30)
+        if start > end:
+            raise ValueError("start_date must not be after end_date")
+        interval = params.get("interval")
+        if interval and interval not in INTERVALS:
+            raise ValueError(f"interval must be one of {', '.join(INTERVALS)}")
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not interval:
+        days = (end - start).days
+        interval = (
+            "day"
+            if days <= DAILY_MAX_DAYS
+            else "month" if days <= MONTHLY_MAX_DAYS else "year"
+        )
+
+    fires, statistics = eventstats.fire_series(region_id, start, end, interval)
+    return Response(
+        {
+            "region_id": region_id,
+            "interval": interval,
+            "start_date": start,
+            "end_date": end,
+            "fires": fires,
+            "statistics": statistics,
+        }
+    )
@@ -0,0 +1,84 @@
+"""
+Async versions of the I/O-bound prediction views, routed in ASGI mode.
+
+Stale snapshots are refreshed by fetching the weather of every stale region
+concurrently (see ``arefresh_predictions``) instead of one upstream call
+after another; CPU-bound scoring and template rendering run in a thread.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse
+from django.shortcuts import render
+
+from apps.core.caching import not_modified, set_validators
+from apps.core.decorators import async_api_view
+from .snapshots import snapshot_version
+from .views import (
+    PredictionViewSet,
+    aget_current_snapshots,
+    current_regions,
+    dashboard_items,
+    prediction_list_items,
+)
+
+logger = logging.getLogger(__name__)
+
+# Other methods on the results collection get the DRF view's answer (405)
+prediction_results = PredictionViewSet.as_view({"get": "list"})
+
+
+async def load_regions(queryset):
+    return [region async for region in queryset]
+
+
+@async_api_view
+async def prediction_list(request):
+    """Async version of PredictionViewSet.list."""
+    if request.method != "GET":
+        return await sync_to_async(prediction_results)(request)
+
+    max_age = settings.PREDICTION_CACHE_MAX_AGE
+    version = await sync_to_async(snapshot_version)()
+    if version["fresh"]:
+        response = not_modified(
+            request, version["etag"], version["last_modified"], max_age
+        )
+        if response is not None:
+            return response
+
+    try:
+        regions = await load_regions(current_regions())
+        snapshots = await aget_current_snapshots(regions)
+        predictions = await sync_to_async(prediction_list_items)(regions, snapshots)
+
+        if not version["fresh"]:
+            # Stale snapshots were just refreshed
+            version = await sync_to_async(snapshot_version)()
+        return set_validators(
+            JsonResponse(predictions, safe=False),
+            version["etag"],
+            version["last_modified"],
+            max_age,
+        )
+    except Exception as e:
+        logger.error(f"Error in prediction list: {str(e)}")
+        return JsonResponse({"error": "Failed to generate predictions"}, status=500)
+
+
+async def dashboard(request):
+    """Async version of the predictions dashboard."""
+    regions = await load_regions(current_regions())
+    logger.info(f"Found {len(regions)} regions")
+
+    snapshots = await aget_current_snapshots(regions)
+    items = await sync_to_async(dashboard_items)(regions, snapshots)
+    return await sync_to_async(render)(
+        request,
+        "predictions/dashboard.html",
+        {
+            "regions": items,
+        },
+    )
@@ -0,0 +1,239 @@
+"""
+Set-based loading and vectorized scoring for many regions at once.
+
+Used by the batch prediction endpoint: weather and history for every requested
+region are loaded in a fixed number of queries, and the weather risk factors
+are scored for the whole batch with NumPy instead of one region at a time.
+"""
+
+import logging
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from apps.core import metrics
+from apps.core.lazy import lazy_import
+from apps.core.regioncache import get_region_metadata
+from apps.core.spatial import get_spatial_index
+from apps.weather.models import WeatherData
+from .pipeline import LANDSCAPE_FACTOR_NAMES, RISK_PIPELINE, region_landscape
+
+logger = logging.getLogger(__name__)
+
+np = lazy_import("numpy")
+
+RISK_FACTOR_NAMES = [
+    "temperature_risk",
+    "humidity_risk",
+    "wind_risk",
+    "precipitation_risk",
+    "historical_risk",
+    "soil_factor",
+    "vegetation_factor",
+    "climate_factor",
+    "landscape_factor",
+    "environmental_risk",
+]
+SCORE_NAMES = ["risk_level", "confidence"]
+
+
+def load_latest_weather(region_ids):
+    """
+    Load the most recent WeatherData row of each region in one query.
+
+    Returns:
+        Dictionary mapping region id to its latest WeatherData
+    """
+    latest = (
+        WeatherData.objects.filter(region_id__in=region_ids)
+        .annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=[F("region_id")],
+                order_by=F("timestamp").desc(),
+            )
+        )
+        .filter(row_number=1)
+    )
+    return {weather.region_id: weather for weather in latest}
+
+
+def load_temperature_history(region_ids, days=90, now=None):
+    """
+    Load the temperature series of each region over the last ``days`` in one query.
+
+    Returns:
+        Dictionary mapping region id to a chronologically ordered list of values
+    """
+    end_date = now or timezone.now()
+    start_date = end_date - timedelta(days=days)
+
+    history = defaultdict(list)
+    rows = (
+        WeatherData.objects.filter(
+            region_id__in=region_ids, timestamp__range=(start_date, end_date)
+        )
+        .order_by("region_id", "timestamp")
+        .values_list("region_id", "temperature")
+    )
+    for region_id, temperature in rows:
+        history[region_id].append(temperature)
+    return history
+
+
+def load_weather_history(region_ids, days=90, now=None):
+    """
+    Load the observations of each region over the last ``days`` in one query.
+
+    Returns:
+        Dictionary mapping region id to a chronologically ordered list of
+        WeatherData (only the fields used by historical pattern analysis)
+    """
+    end_date = now or timezone.now()
+    start_date = end_date - timedelta(days=days)
+
+    history = defaultdict(list)
+    rows = (
+        WeatherData.objects.filter(
+            region_id__in=region_ids, timestamp__range=(start_date, end_date)
+        )
+        .order_by("region_id", "timestamp")
+        .only(
+            "region_id",
+            "timestamp",
+            "temperature",
+            "humidity",
+            "wind_speed",
+            "precipitation",
+        )
+    )
+    for weather in rows:
+        history[weather.region_id].append(weather)
+    return history
+
+
+def nearest_regions(points):
+    """
+    Match (latitude, longitude) points to their nearest region (see
+    apps.core.spatial).
+
+    Returns:
+        List of (region, distance in km) tuples, one per point (None for
+        every point when there are no regions)
+    """
+    if not points:
+        return []
+    return get_spatial_index("regions").nearest_each(points)
+
+
+def score_batch(
+    temperature,
+    humidity,
+    wind_speed,
+    precipitation,
+    historical_risk=None,
+    regions=None,
+    temperature_history=None,
+    month=None,
+    cache=True,
+):
+    """
+    Vectorized equivalent of calculate_wildfire_risk for arrays of observations.
+
+    Args:
+        temperature, humidity, wind_speed, precipitation: 1-D arrays of
+            current weather values, one entry per location
+        historical_risk: 1-D array of historical risk scores; computed from
+            ``temperature_history`` when omitted
+        regions: Region of each location (soil types preloaded), for the
+            soil, vegetation and climate factors; neutral when omitted
+        temperature_history: Temperature series of each location
+        month: Month of the landscape factors (defaults to the current one)
+        cache: Whether stage outputs may be reused from previous cycles
+
+    Returns:
+        Dictionary with one array per risk factor plus ``risk_level`` and
+        ``confidence`` arrays
+    """
+    start = time.perf_counter()
+    frame = {
+        "temperature": np.asarray(temperature, dtype=float),
+        "humidity": np.asarray(humidity, dtype=float),
+        "wind_speed": np.asarray(wind_speed, dtype=float),
+        "precipitation": np.asarray(precipitation, dtype=float),
+    }
+    size = len(frame["temperature"])
+    if historical_risk is not None:
+        frame["historical_risk"] = np.asarray(historical_risk, dtype=float)
+    elif temperature_history is not None:
+        frame["temperature_history"] = list(temperature_history)
+    if regions is not None:
+        frame["landscape"] = np.array(
+            [region_landscape(region) for region in regions]
+        ).reshape(size, len(LANDSCAPE_FACTOR_NAMES), 12)
+        frame["month"] = month or timezone.now().month
+
+    scores = RISK_PIPELINE.run(frame, size, cache=cache)
+
+    metrics.MODEL_INFERENCE_SECONDS.labels("rules").observe(time.perf_counter() - start)
+    metrics.MODEL_INFERENCE_BATCH_SIZE.labels("rules").observe(size)
+
+    return {name: scores[name] for name in RISK_FACTOR_NAMES + SCORE_NAMES}
+
+
+def predict_regions(region_ids):
+    """
+    Score the given regions using set-based loading and vectorized scoring.
+
+    Returns:
+        Tuple of (regions by id, results by region id). Each result holds the
+        risk level, confidence, features used and the weather observation it
+        was based on. Regions without weather data have no result.
+    """
+    metadata = get_region_metadata()
+    regions = {
+        region_id: metadata.region(region_id)
+        for region_id in region_ids
+        if metadata.region(region_id) is not None
+    }
+    latest_weather = load_latest_weather(list(regions))
+    history = load_temperature_history(list(latest_weather))
+
+    scored_ids = list(latest_weather)
+    if not scored_ids:
+        return regions, {}
+
+    observations = [latest_weather[region_id] for region_id in scored_ids]
+    scores = score_batch(
+        [weather.temperature for weather in observations],
+        [weather.humidity for weather in observations],
+        [weather.wind_speed for weather in observations],
+        [weather.precipitation for weather in observations],
+        regions=[regions[region_id] for region_id in scored_ids],
+        temperature_history=[history.get(region_id, []) for region_id in scored_ids],
+    )
+
+    results = {}
+    for index, region_id in enumerate(scored_ids):
+        weather = observations[index]
+        results[region_id] = {
+            "risk_level": str(scores["risk_level"][index]),
+            "confidence": int(scores["confidence"][index]),
+            "features_used": {
+                "current_weather": {
+                    "temperature": float(weather.temperature),
+                    "humidity": float(weather.humidity),
+                    "wind_speed": float(weather.wind_speed),
+                    "precipitation": float(weather.precipitation),
+                },
+                "risk_factors": {
+                    name: float(scores[name][index]) for name in RISK_FACTOR_NAMES
+                },
+            },
+            "weather": weather,
+        }
+    return regions, results
@@ -0,0 +1,240 @@
+"""
+Benchmarks of the risk scoring, analytics and dashboard hot paths.
+
+Run with ``python manage.py benchmark``. Inputs are synthetic and seeded, so
+every run times the same work.
+"""
+
+import random
+from datetime import timedelta
+
+import numpy as np
+from django.test import RequestFactory
+from django.utils import timezone
+
+from apps.core import regioncache
+from apps.core.benchmarking import benchmark
+from apps.core.models import Forest, Region
+from apps.weather.models import WeatherData
+from . import global_risk_factors as risk_factors
+from .risklayer import RiskLayer
+from .batch import score_batch
+from .ml_model import WildfirePredictionModel
+from .models import PredictionSnapshot, WildfirePrediction
+from .trends import calculate_trend
+from .views import (
+    analyze_historical_patterns,
+    calculate_wildfire_risk,
+    dashboard,
+    generate_prediction_explanation,
+)
+
+SEED = 1337
+HISTORY_DAYS = 90
+
+
+def weather_history(region, days=HISTORY_DAYS, seed=SEED):
+    """Unsaved daily observations with a seasonal temperature cycle and noise."""
+    rng = random.Random(seed)
+    start = timezone.now() - timedelta(days=days)
+    return [
+        WeatherData(
+            region=region,
+            timestamp=start + timedelta(days=day),
+            temperature=24 + 8 * np.sin(day / 7) + rng.gauss(0, 2),
+            humidity=min(max(45 + rng.gauss(0, 15), 5), 100),
+            wind_speed=abs(rng.gauss(12, 8)),
+            precipitation=max(rng.gauss(0, 3), 0),
+            pressure=1013 + rng.gauss(0, 5),
+        )
+        for day in range(days)
+    ]
+
+
+def benchmark_region():
+    return Region(
+        name="Benchmark Region",
+        latitude=33.5,
+        longitude=-7.6,
+        elevation=400,
+        area=1200,
+        population=50000,
+        vegetation_density=0.6,
+        climate_zone="mediterranean",
+    )
+
+
+def seed_dashboard(count, seed=SEED):
+    """Replace all regions with ``count`` regions holding fresh snapshots."""
+    rng = random.Random(seed)
+    Region.objects.all().delete()
+    regions = Region.objects.bulk_create(
+        [
+            Region(
+                name=f"Region {index}",
+                latitude=rng.uniform(28, 36),
+                longitude=rng.uniform(-13, -1),
+                elevation=rng.uniform(0, 3000),
+                area=rng.uniform(100, 5000),
+                population=rng.randint(1000, 1000000),
+            )
+            for index in range(count)
+        ]
+    )
+    now = timezone.now()
+    PredictionSnapshot.objects.bulk_create(
+        [
+            PredictionSnapshot(
+                region=region,
+                prediction_date=now,
+                risk_level=rng.choice(
+                    [choice for choice, _ in WildfirePrediction.RISK_CHOICES]
+                ),
+                confidence=rng.uniform(50, 100),
+                explanation="Benchmark explanation " * 10,
+                model_version="1.0",
+            )
+            for region in regions
+        ]
+    )
+    Forest.objects.bulk_create(
+        [
+            Forest(
+                name=f"Forest {region.pk}-{index}",
+                region=region,
+                area=rng.uniform(1, 500),
+                dominant_species="Cedar",
+                density=rng.random(),
+            )
+            for region in regions
+            for index in range(4)
+        ]
+    )
+    regioncache.changed()
+
+
+@benchmark("analytics.calculate_trend")
+def bench_calculate_trend():
+    temperatures = [
+        observation.temperature for observation in weather_history(benchmark_region())
+    ]
+    return lambda: calculate_trend(temperatures)
+
+
+@benchmark("analytics.analyze_historical_patterns")
+def bench_analyze_historical_patterns():
+    region = benchmark_region()
+    history = weather_history(region)
+    return lambda: analyze_historical_patterns(region, history)
+
+
+@benchmark("risk.calculate_wildfire_risk")
+def bench_calculate_wildfire_risk():
+    region = benchmark_region()
+    history = weather_history(region)
+    patterns = analyze_historical_patterns(region, history)
+    return lambda: calculate_wildfire_risk(history[-1], patterns)
+
+
+@benchmark("risk.generate_prediction_explanation")
+def bench_generate_prediction_explanation():
+    region = benchmark_region()
+    history = weather_history(region)
+    risk = calculate_wildfire_risk(
+        history[-1], analyze_historical_patterns(region, history)
+    )
+    prediction = WildfirePrediction(
+        region=region,
+        prediction_date=timezone.now(),
+        risk_level=risk["risk_level"],
+        confidence=risk["confidence"],
+        features_used=risk["features_used"],
+        model_version="1.0",
+    )
+    return lambda: generate_prediction_explanation(prediction)
+
+
+@benchmark("risk.global_factors", params=[10000])
+def bench_global_factors(count):
+    rng = np.random.default_rng(SEED)
+    soil = risk_factors.soil_indices(rng.choice(["Clay", "Sandy", "Loam"], count))
+    climate = risk_factors.climate_indices(
+        rng.choice(["mediterranean", "semi_arid", "temperate"], count)
+    )
+    months = rng.integers(1, 13, count)
+    retention = rng.uniform(0, 1, count)
+    drought = rng.uniform(0, 3, count)
+    density = rng.uniform(0, 1, count)
+
+    def score():
+        return (
+            risk_factors.soil_risk_factors(soil, months, retention, drought)
+            * risk_factors.vegetation_risk_factors(density)
+            * risk_factors.climate_risk_multipliers(months, climate)
+        )
+
+    return score
+
+
+@benchmark("risk.score_batch", params=[100, 1000])
+def bench_score_batch(count):
+    rng = np.random.default_rng(SEED)
+    regions = [
+        Region(
+            name=f"Region {i}",
+            latitude=0,
+            longitude=0,
+            elevation=0,
+            area=1,
+            population=1,
+            vegetation_density=rng.uniform(0, 1),
+            climate_zone=rng.choice(["mediterranean", "semi_arid", "temperate"]),
+        )
+        for i in range(count)
+    ]
+    history = [
+        (20 + np.cumsum(rng.normal(0, 1, HISTORY_DAYS * 24))).tolist()
+        for _ in range(count)
+    ]
+    weather = [row[-1] for row in history]
+    humidity = rng.uniform(10, 90, count)
+    wind_speed = rng.uniform(0, 50, count)
+    precipitation = rng.choice([0, 1, 3, 8], count)
+
+    # A full cycle: nothing is reused from the previous one
+    return lambda: score_batch(
+        weather,
+        humidity,
+        wind_speed,
+        precipitation,
+        regions=regions,
+        temperature_history=history,
+        cache=False,
+    )
+
+
+@benchmark("model.predict")
+def bench_model_predict():
+    rng = np.random.default_rng(SEED)
+    model = WildfirePredictionModel()
+    X = rng.normal(size=(500, 7))
+    model.model.fit(X, (X[:, 0] - X[:, 1] > 0).astype(int))
+    model.is_trained = True
+
+    features = model.prepare_features(weather_history(benchmark_region())[-1])
+    return lambda: model.predict(features)
+
+
+@benchmark("dashboard.render", params=[10, 100, 1000])
+def bench_dashboard(count):
+    seed_dashboard(count)
+    request = RequestFactory().get("/predictions/")
+    return lambda: dashboard(request).content
+
+
+@benchmark("map.risk_layer", params=[100, 1000])
+def bench_risk_layer(count):
+    seed_dashboard(count)
+    layer = RiskLayer("benchmark", regioncache.get_region_metadata())
+    # An uncached body: the work done once per snapshot version, bbox and zoom
+    return lambda: layer.render(bbox=(-13, 28, -1, 36), zoom=8)
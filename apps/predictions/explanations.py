@@ -0,0 +1,278 @@
+"""
+Memoized prediction explanations.
+
+An explanation only depends on the region's name, soil, vegetation density
+bucket and climate zone, the season, and the current weather rounded to whole
+units. Each factor falls into a band (e.g. "hot" above 30°C) that picks a
+sentence from a per-language template catalog and a qualifier ("typical",
+"unusually high") that depends on the region's context.
+
+Two bounded LRU caches sit in front of the text generation:
+
+- ``paragraph_template`` assembles the format string of a whole explanation
+  for a combination of bands and qualifiers (a few thousand at most);
+- ``explain`` fills it in for one set of rounded inputs, so rendering the
+  explanations of every region again is a dictionary lookup per region.
+"""
+
+import logging
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LANGUAGE = "en"
+
+# Per-language catalog. Sentences are str.format templates over the fields
+# passed by explain(); qualifiers are plain phrases.
+TEMPLATES = {
+    "en": {
+        "region": (
+            "The {region} region, characterized by its {soil} soil and "
+            "{vegetation} vegetation density in a {climate} climate zone, "
+        ),
+        "temperature": {
+            "hot": (
+                "is experiencing significantly high temperatures of "
+                "{temperature}°C, which is {qualifier} for this {season} season "
+                "and significantly increases the risk of vegetation drying out"
+            ),
+            "warm": (
+                "has elevated temperatures of {temperature}°C, which is "
+                "{qualifier} for this {season} season"
+            ),
+            "mild": (
+                "has moderate temperatures of {temperature}°C, providing "
+                "{qualifier} conditions"
+            ),
+            "cool": (
+                "has cool temperatures of {temperature}°C, which is {qualifier} "
+                "for this {season} season"
+            ),
+        },
+        "humidity": {
+            "critical": (
+                "Humidity is critically low at {humidity}%, which is particularly "
+                "concerning given the {soil} soil's moisture retention capacity "
+                "and could lead to rapid drying of vegetation"
+            ),
+            "low": (
+                "Humidity is low at {humidity}%, creating dry conditions that are "
+                "{qualifier} given the soil composition"
+            ),
+            "moderate": (
+                "Humidity is moderate at {humidity}%, helping maintain "
+                "{qualifier} moisture in the soil and vegetation"
+            ),
+            "high": (
+                "Humidity is high at {humidity}%, which helps preserve moisture "
+                "in the {soil} soil and reduces fire risk"
+            ),
+        },
+        "wind": {
+            "strong": (
+                "Strong winds of {wind_speed} km/h pose a significant risk, "
+                "particularly in areas with {vegetation} vegetation where fire "
+                "could spread rapidly"
+            ),
+            "fresh": (
+                "Moderate to strong winds of {wind_speed} km/h, combined with the "
+                "{vegetation} vegetation, could facilitate fire spread if "
+                "ignition occurs"
+            ),
+            "moderate": (
+                "Moderate winds of {wind_speed} km/h are present, with "
+                "{qualifier} potential for fire spread through the {vegetation} "
+                "vegetation"
+            ),
+            "calm": (
+                "Calm winds of {wind_speed} km/h provide favorable conditions, "
+                "though the {vegetation} vegetation could still support fire "
+                "spread if other risk factors are present"
+            ),
+        },
+        "precipitation": {
+            "none": (
+                "There is no precipitation, which is {qualifier} for this "
+                "{climate} climate zone and increases fire risk"
+            ),
+            "minimal": (
+                "Minimal precipitation of {precipitation}mm provides limited "
+                "moisture, which is {qualifier} for this {climate} region"
+            ),
+            "low": (
+                "Low precipitation of {precipitation}mm helps reduce fire risk, "
+                "though it {qualifier} in this climate"
+            ),
+            "significant": (
+                "Significant precipitation of {precipitation}mm provides good "
+                "protection against fire risk, which is {qualifier} for this "
+                "{climate} region"
+            ),
+        },
+        "qualifiers": {
+            "typical": "typical",
+            "unusually_high": "unusually high",
+            "unusually_low": "unusually low",
+            "as_expected": "as expected",
+            "above_average": "above average",
+            "below_average": "below average",
+            "favorable": "favorable",
+            "relatively_safe": "relatively safe",
+            "especially_risky": "especially risky",
+            "moderately_concerning": "moderately concerning",
+            "some": "some",
+            "adequate": "adequate",
+            "increased": "increased",
+            "moderate": "moderate",
+            "particularly_concerning": "particularly concerning",
+            "concerning": "concerning",
+            "may_be_insufficient": "may be insufficient",
+            "provides_moderate_protection": "provides moderate protection",
+            "especially_beneficial": "especially beneficial",
+            "normal_moisture": "maintaining normal moisture levels",
+        },
+        "unavailable": "Unable to generate detailed explanation for {region}.",
+    },
+}
+
+DRY_CLIMATES = ("mediterranean", "semi_arid")
+
+
+def vegetation_bucket(density):
+    """Label of a 0-1 vegetation density."""
+    if density is None:
+        return "moderate"
+    if density < 0.3:
+        return "sparse"
+    if density < 0.7:
+        return "moderate"
+    return "dense"
+
+
+def resolve_language(language=None):
+    """Catalog language for a language code ("en-us" -> "en")."""
+    code = (language or settings.LANGUAGE_CODE).lower().split("-")[0]
+    return code if code in TEMPLATES else DEFAULT_LANGUAGE
+
+
+def temperature_band(temperature, season):
+    if temperature > 30:
+        return "hot", "typical" if season == "summer" else "unusually_high"
+    if temperature > 25:
+        return "warm", (
+            "as_expected" if season in ("summer", "spring") else "above_average"
+        )
+    if temperature > 20:
+        return "mild", (
+            "favorable" if season in ("spring", "autumn") else "relatively_safe"
+        )
+    return "cool", "typical" if season in ("winter", "autumn") else "unusually_low"
+
+
+def humidity_band(humidity, soil):
+    if humidity < 30:
+        return "critical", None
+    if humidity < 40:
+        return "low", (
+            "especially_risky" if soil == "Sandy" else "moderately_concerning"
+        )
+    if humidity < 60:
+        return "moderate", "some" if soil == "Clay" else "adequate"
+    return "high", None
+
+
+def wind_band(wind_speed, vegetation):
+    if wind_speed > 30:
+        return "strong", None
+    if wind_speed > 20:
+        return "fresh", None
+    if wind_speed > 10:
+        return "moderate", "increased" if vegetation == "dense" else "moderate"
+    return "calm", None
+
+
+def precipitation_band(precipitation, climate):
+    dry = climate in DRY_CLIMATES
+    if precipitation == 0:
+        return "none", "particularly_concerning" if dry else "concerning"
+    if precipitation < 5:
+        return "minimal", ("typical" if climate == "semi_arid" else "below_average")
+    if precipitation < 10:
+        return "low", ("may_be_insufficient" if dry else "provides_moderate_protection")
+    return "significant", "especially_beneficial" if dry else "normal_moisture"
+
+
+@lru_cache(maxsize=4096)
+def paragraph_template(language, temperature, humidity, wind, precipitation):
+    """
+    Format string of an explanation.
+
+    Each factor argument is a (band, qualifier) pair; qualifiers are
+    substituted here, the region and weather fields are left to explain().
+    """
+    catalog = TEMPLATES[language]
+    sentences = []
+    for factor, (band, qualifier) in (
+        ("temperature", temperature),
+        ("humidity", humidity),
+        ("wind", wind),
+        ("precipitation", precipitation),
+    ):
+        sentence = catalog[factor][band]
+        if qualifier is not None:
+            sentence = sentence.replace("{qualifier}", catalog["qualifiers"][qualifier])
+        sentences.append(sentence)
+    return catalog["region"] + ". ".join(sentences) + "."
+
+
+@lru_cache(maxsize=settings.EXPLANATION_CACHE_SIZE)
+def explain(
+    language,
+    region,
+    soil,
+    vegetation,
+    climate,
+    season,
+    temperature,
+    humidity,
+    wind_speed,
+    precipitation,
+):
+    """Explanation text for one set of bucketed inputs (see module docstring)."""
+    template = paragraph_template(
+        language,
+        temperature_band(temperature, season),
+        humidity_band(humidity, soil),
+        wind_band(wind_speed, vegetation),
+        precipitation_band(precipitation, climate),
+    )
+    return template.format(
+        region=region,
+        soil=soil.lower(),
+        vegetation=vegetation,
+        climate=climate,
+        season=season,
+        temperature=temperature,
+        humidity=humidity,
+        wind_speed=wind_speed,
+        precipitation=precipitation,
+    )
+
+
+def unavailable(region, language=None):
+    return TEMPLATES[resolve_language(language)]["unavailable"].format(region=region)
+
+
+def cache_info():
+    """Hit and miss statistics of the explanation caches."""
+    return {
+        "explanations": explain.cache_info(),
+        "templates": paragraph_template.cache_info(),
+    }
+
+
+def clear_caches():
+    explain.cache_clear()
+    paragraph_template.cache_clear()
@@ -1,8 +1,21 @@
 """
 Global risk factors and patterns for wildfire prediction.
 This module contains data and analysis methods based on global wildfire patterns.
+
+The dictionaries below are compiled once, on first use, into dense lookup
+tables (see lookup_tables): soil × month, vegetation density bin and climate
+zone × month. The vectorized accessors (soil_risk_factors,
+vegetation_risk_factors, climate_risk_multipliers) score whole arrays of
+regions or grid cells from them, and the scalar calculate_* functions read
+the same tables.
 """
 
+from functools import lru_cache
+
+from apps.core.lazy import lazy_import
+
+np = lazy_import("numpy")
+
 # Global soil type risk factors based on research and historical data
 GLOBAL_SOIL_RISK_FACTORS = {
     "Clay": {
@@ -79,72 +92,163 @@ def get_season(month):
         return "autumn"
 
 
+MONTH_NAMES = (
+    "january",
+    "february",
+    "march",
+    "april",
+    "may",
+    "june",
+    "july",
+    "august",
+    "september",
+    "october",
+    "november",
+    "december",
+)
+
+# Row of each soil type and climate zone in the lookup tables; the last row
+# holds the neutral factors of unknown names
+SOIL_INDEX = {name: index for index, name in enumerate(GLOBAL_SOIL_RISK_FACTORS)}
+UNKNOWN_SOIL = len(SOIL_INDEX)
+CLIMATE_INDEX = {name: index for index, name in enumerate(CLIMATE_ZONE_PATTERNS)}
+UNKNOWN_CLIMATE = len(CLIMATE_INDEX)
+
+
+@lru_cache(maxsize=None)
+def lookup_tables():
+    """
+    Compile the risk factor dictionaries into NumPy tables.
+
+    Returns:
+        Dictionary of arrays:
+        - ``soil_season``: base risk × seasonal variation, (soil, month)
+        - ``soil_moisture``: moisture retention impact per soil
+        - ``soil_drought``: drought multiplier - 1 per soil
+        - ``vegetation_edges`` and ``vegetation``: upper density bound and
+          factor of each vegetation bin
+        - ``climate``: risk multiplier, (climate zone, month)
+    """
+    soil_season = np.ones((UNKNOWN_SOIL + 1, 12))
+    soil_moisture = np.zeros(UNKNOWN_SOIL + 1)
+    soil_drought = np.zeros(UNKNOWN_SOIL + 1)
+    for name, index in SOIL_INDEX.items():
+        soil_data = GLOBAL_SOIL_RISK_FACTORS[name]
+        for month in range(1, 13):
+            soil_season[index, month - 1] = (
+                soil_data["base_risk"]
+                * soil_data["seasonal_variation"][get_season(month)]
+            )
+        soil_moisture[index] = soil_data["moisture_retention_impact"]
+        soil_drought[index] = soil_data["drought_multiplier"] - 1
+
+    bins = sorted(VEGETATION_DENSITY_FACTORS.values())
+    vegetation_edges = np.array([upper for _, upper, _ in bins[:-1]])
+    vegetation = np.array([factor for _, _, factor in bins])
+
+    climate = np.ones((UNKNOWN_CLIMATE + 1, 12))
+    for name, index in CLIMATE_INDEX.items():
+        pattern = CLIMATE_ZONE_PATTERNS[name]
+        for month, month_name in enumerate(MONTH_NAMES, start=1):
+            # Higher risk during peak season
+            if month_name in pattern["peak_season"]:
+                climate[index, month - 1] = pattern["risk_multiplier"]
+
+    tables = {
+        "soil_season": soil_season,
+        "soil_moisture": soil_moisture,
+        "soil_drought": soil_drought,
+        "vegetation_edges": vegetation_edges,
+        "vegetation": vegetation,
+        "climate": climate,
+    }
+    for table in tables.values():
+        table.flags.writeable = False
+    return tables
+
+
+def soil_indices(names):
+    """Table rows of an iterable of soil type names."""
+    return np.array([SOIL_INDEX.get(name, UNKNOWN_SOIL) for name in names])
+
+
+def climate_indices(names):
+    """Table rows of an iterable of climate zone names."""
+    return np.array([CLIMATE_INDEX.get(name, UNKNOWN_CLIMATE) for name in names])
+
+
+def soil_risk_factors(soil, months, moisture_retention, drought_index=None):
+    """
+    Vectorized calculate_soil_risk_factor.
+
+    Args:
+        soil: Array of soil rows (see soil_indices)
+        months: Array of month numbers (1-12)
+        moisture_retention: Array of the soils' moisture retention (0-1)
+        drought_index: Optional array of drought indices; NaN means unknown
+
+    Returns:
+        Array of risk factors, broadcast over the arguments
+    """
+    tables = lookup_tables()
+    soil = np.asarray(soil)
+    risk = tables["soil_season"][soil, np.asarray(months) - 1]
+    # Invert moisture retention (higher retention = lower risk)
+    risk = risk * (2 - tables["soil_moisture"][soil] * moisture_retention)
+    if drought_index is not None:
+        drought_index = np.asarray(drought_index, dtype=float)
+        with np.errstate(invalid="ignore"):
+            drought_impact = np.where(
+                drought_index > 1,
+                np.minimum(drought_index - 1, 1) * tables["soil_drought"][soil],
+                0.0,
+            )
+        risk = risk * (1 + drought_impact)
+    return np.where(soil == UNKNOWN_SOIL, 1.0, risk)
+
+
+def vegetation_risk_factors(density):
+    """Vectorized calculate_vegetation_risk_factor."""
+    tables = lookup_tables()
+    bins = np.searchsorted(tables["vegetation_edges"], density, side="left")
+    return tables["vegetation"][bins]
+
+
+def climate_risk_multipliers(months, climate):
+    """
+    Vectorized calculate_climate_risk_multiplier.
+
+    Args:
+        months: Array of month numbers (1-12)
+        climate: Array of climate zone rows (see climate_indices)
+    """
+    return lookup_tables()["climate"][np.asarray(climate), np.asarray(months) - 1]
+
+
 def calculate_soil_risk_factor(soil_type, current_month, drought_index=None):
     """Calculate soil-based risk factor considering season and conditions."""
-    if soil_type.name not in GLOBAL_SOIL_RISK_FACTORS:
+    index = SOIL_INDEX.get(soil_type.name)
+    if index is None:
         return 1.0  # Default risk factor
 
-    soil_data = GLOBAL_SOIL_RISK_FACTORS[soil_type.name]
-    season = get_season(current_month)
-
-    # Base calculation
-    risk_factor = soil_data["base_risk"]
-
-    # Apply seasonal variation
-    risk_factor *= soil_data["seasonal_variation"][season]
-
-    # Apply moisture retention impact
-    moisture_impact = (
-        soil_data["moisture_retention_impact"] * soil_type.moisture_retention
-    )
-    risk_factor *= (
-        2 - moisture_impact
-    )  # Invert moisture retention (higher retention = lower risk)
+    tables = lookup_tables()
+    risk_factor = float(tables["soil_season"][index, current_month - 1])
+    risk_factor *= 2 - tables["soil_moisture"][index] * soil_type.moisture_retention
 
     # Apply drought conditions if available
     if drought_index and drought_index > 1:
-        drought_impact = min(drought_index - 1, 1) * (
-            soil_data["drought_multiplier"] - 1
-        )
+        drought_impact = min(drought_index - 1, 1) * tables["soil_drought"][index]
         risk_factor *= 1 + drought_impact
 
-    return risk_factor
+    return float(risk_factor)
 
 
 def calculate_vegetation_risk_factor(density):
     """Calculate vegetation-based risk factor."""
-    if density <= VEGETATION_DENSITY_FACTORS["sparse"][1]:
-        return VEGETATION_DENSITY_FACTORS["sparse"][2]
-    elif density <= VEGETATION_DENSITY_FACTORS["moderate"][1]:
-        return VEGETATION_DENSITY_FACTORS["moderate"][2]
-    else:
-        return VEGETATION_DENSITY_FACTORS["dense"][2]
+    return float(vegetation_risk_factors(density))
 
 
 def calculate_climate_risk_multiplier(month, climate_zone="mediterranean"):
     """Calculate climate-based risk multiplier."""
-    if climate_zone not in CLIMATE_ZONE_PATTERNS:
-        return 1.0
-
-    pattern = CLIMATE_ZONE_PATTERNS[climate_zone]
-    month_name = [
-        "january",
-        "february",
-        "march",
-        "april",
-        "may",
-        "june",
-        "july",
-        "august",
-        "september",
-        "october",
-        "november",
-        "december",
-    ][month - 1]
-
-    # Higher risk during peak season
-    if month_name in pattern["peak_season"]:
-        return pattern["risk_multiplier"]
-
-    # Reduced risk outside peak season
-    return 1.0
+    index = CLIMATE_INDEX.get(climate_zone, UNKNOWN_CLIMATE)
+    return float(lookup_tables()["climate"][index, month - 1])
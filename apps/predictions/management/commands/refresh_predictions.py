@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from apps.core.models import Region
+from apps.predictions.views import refresh_predictions
+
+
+class Command(BaseCommand):
+    help = "Recompute predictions for all regions and update their snapshots"
+
+    def handle(self, *args, **options):
+        regions = list(Region.objects.select_related("soil_type"))
+        snapshots = refresh_predictions(regions)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {len(snapshots)} of {len(regions)} region snapshots"
+            )
+        )
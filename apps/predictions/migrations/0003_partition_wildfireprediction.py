@@ -0,0 +1,25 @@
+# Generated manually
+
+from django.db import migrations
+
+from apps.core.partitioning import partition_table_by_month
+
+
+def partition_wildfireprediction(apps, schema_editor):
+    partition_table_by_month(
+        schema_editor,
+        table="predictions_wildfireprediction",
+        column="prediction_date",
+        index_name="predictions_region__dcc8f1_idx",
+        index_columns=["region_id", "prediction_date"],
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("predictions", "0002_alter_wildfireprediction_confidence_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_wildfireprediction, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:52
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_merge_20250404_1643"),
+        ("predictions", "0003_partition_wildfireprediction"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PredictionSnapshot",
+            fields=[
+                (
+                    "region",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="prediction_snapshot",
+                        serialize=False,
+                        to="core.region",
+                    ),
+                ),
+                (
+                    "prediction_date",
+                    models.DateTimeField(
+                        help_text="The date and time of the latest prediction"
+                    ),
+                ),
+                (
+                    "risk_level",
+                    models.CharField(
+                        choices=[
+                            ("low", "Low Risk"),
+                            ("medium", "Medium Risk"),
+                            ("high", "High Risk"),
+                        ],
+                        default="medium",
+                        help_text="Latest wildfire risk level",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "confidence",
+                    models.FloatField(
+                        help_text="Prediction confidence score (0-100)",
+                        validators=[
+                            django.core.validators.MinValueValidator(0.0),
+                            django.core.validators.MaxValueValidator(100.0),
+                        ],
+                    ),
+                ),
+                (
+                    "risk_factors",
+                    models.JSONField(
+                        default=dict,
+                        help_text="Risk factors behind the latest prediction",
+                    ),
+                ),
+                ("explanation", models.TextField(blank=True)),
+                ("model_version", models.CharField(max_length=50)),
+                ("updated_at", models.DateTimeField(auto_now=True, db_index=True)),
+            ],
+            options={
+                "ordering": ["region_id"],
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_merge_20250404_1643"),
+        ("predictions", "0004_predictionsnapshot"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="wildfireprediction",
+            index=models.Index(
+                fields=["prediction_date", "id"], name="predictions_predict_e8c3ce_idx"
+            ),
+        ),
+    ]
@@ -1,10 +1,16 @@
-import numpy as np
-
 # from sklearn.ensemble import RandomForestClassifier # Unused import
-from xgboost import XGBClassifier
 from datetime import datetime, timedelta
 import os
-import joblib  # Example for model persistence
+import time
+
+from apps.core import metrics
+from apps.core.lazy import lazy_import
+
+# xgboost (with pandas and scikit-learn) and joblib are only imported when a
+# model is loaded, not when the views importing this module are
+np = lazy_import("numpy")
+xgboost = lazy_import("xgboost")
+joblib = lazy_import("joblib")  # Example for model persistence
 
 # Define a path for saving/loading the model
 MODEL_DIR = os.path.dirname(__file__)
@@ -31,7 +37,7 @@ class WildfirePredictionModel:
             else:
                 print(f"Model file not found at {MODEL_PATH}. Model needs training.")
                 # Initialize a new model if none exists (optional, depends on workflow)
-                self.model = XGBClassifier(
+                self.model = xgboost.XGBClassifier(
                     n_estimators=100,
                     max_depth=5,
                     learning_rate=0.1,
@@ -42,7 +48,7 @@ class WildfirePredictionModel:
         except Exception as e:
             print(f"Error loading model: {e}. Initializing a new model.")
             # Fallback to a new model instance on error
-            self.model = XGBClassifier(
+            self.model = xgboost.XGBClassifier(
                 n_estimators=100,
                 max_depth=5,
                 learning_rate=0.1,
@@ -125,12 +131,17 @@ class WildfirePredictionModel:
             X = np.array([list(features.values())])
             # Ensure X has the correct shape and feature order expected by the model
 
-            risk_prob = self.model.predict_proba(X)[0][
+            start = time.perf_counter()
+            probabilities = self.model.predict_proba(X)[0]
+            metrics.MODEL_INFERENCE_SECONDS.labels("xgboost").observe(
+                time.perf_counter() - start
+            )
+            metrics.MODEL_INFERENCE_BATCH_SIZE.labels("xgboost").observe(len(X))
+
+            risk_prob = probabilities[
                 1
             ]  # Probability of class 1 (assume positive class is high risk)
-            confidence = max(
-                self.model.predict_proba(X)[0]
-            )  # Probability of the predicted class
+            confidence = max(probabilities)  # Probability of the predicted class
 
             return risk_prob, confidence
         except Exception as e:
@@ -37,7 +37,10 @@ class WildfirePrediction(models.Model):
 
     class Meta:
         # app_label = "predictions" # Removed redundant app_label
-        indexes = [models.Index(fields=["region", "prediction_date"])]
+        indexes = [
+            models.Index(fields=["region", "prediction_date"]),
+            models.Index(fields=["prediction_date", "id"]),
+        ]
         # Add default ordering
         ordering = ["-prediction_date"]
 
@@ -47,3 +50,45 @@ class WildfirePrediction(models.Model):
     def get_risk_level_display(self):
         """Get the display value for the risk level."""
         return dict(self.RISK_CHOICES).get(self.risk_level, self.risk_level)
+
+
+class PredictionSnapshot(models.Model):
+    """Current wildfire prediction for a region, one row per region."""
+
+    region = models.OneToOneField(
+        Region,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="prediction_snapshot",
+    )
+    prediction_date = models.DateTimeField(
+        help_text="The date and time of the latest prediction"
+    )
+    risk_level = models.CharField(
+        max_length=20,
+        choices=WildfirePrediction.RISK_CHOICES,
+        default=WildfirePrediction.MEDIUM_RISK,
+        help_text="Latest wildfire risk level",
+    )
+    confidence = models.FloatField(
+        help_text="Prediction confidence score (0-100)",
+        validators=[MinValueValidator(0.0), MaxValueValidator(100.0)],
+    )
+    risk_factors = models.JSONField(
+        default=dict, help_text="Risk factors behind the latest prediction"
+    )
+    explanation = models.TextField(blank=True)
+    model_version = models.CharField(max_length=50)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        ordering = ["region_id"]
+
+    def __str__(self):
+        return f"Current prediction for {self.region.name}"
+
+    def get_risk_level_display(self):
+        """Get the display value for the risk level."""
+        return dict(WildfirePrediction.RISK_CHOICES).get(
+            self.risk_level, self.risk_level
+        )
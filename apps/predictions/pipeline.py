@@ -0,0 +1,334 @@
+"""
+Composable risk scoring pipeline.
+
+A prediction cycle scores a batch of regions by passing a *frame* (a
+dictionary of equally long arrays, one entry per region or location) through
+a sequence of stages. Each stage reads some columns and adds others:
+
+- ``WeatherStage``: temperature, humidity, wind and precipitation risk
+- ``HistoricalStage``: historical risk from each region's temperature trend
+- ``LandscapeStage``: soil, vegetation and climate multipliers from
+  global_risk_factors, for the cycle's month
+- ``CombineStage``: weighted environmental risk, risk level and confidence
+
+A stage is skipped when the caller already supplied its outputs. Stages
+marked ``cacheable`` keep their outputs in a small LRU keyed on a digest of
+their inputs, so a cycle whose inputs did not change since the previous one
+reuses them. The landscape factors of a region do not depend on the weather
+and are precomputed once per region for all twelve months (landscape_table).
+"""
+
+import hashlib
+import logging
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from functools import lru_cache
+
+from apps.core.lazy import lazy_import
+from . import global_risk_factors as risk_factors
+from .models import WildfirePrediction
+from .trends import calculate_historical_risk, calculate_trends
+
+logger = logging.getLogger(__name__)
+
+np = lazy_import("numpy")
+
+# Landscape multipliers range from about 0.4 (clay soil in winter, sparse
+# vegetation) to 8 (sandy soil at the peak of a mediterranean summer); the
+# environmental risk is scaled by their product raised to this power
+LANDSCAPE_WEIGHT = 0.25
+
+# Moisture retention assumed for regions without a soil type
+DEFAULT_MOISTURE_RETENTION = 0.5
+
+LANDSCAPE_FACTOR_NAMES = ("soil_factor", "vegetation_factor", "climate_factor")
+
+# Risk level of environmental risks below 0.5, below 0.7 and above
+RISK_LEVELS = (
+    WildfirePrediction.LOW_RISK,
+    WildfirePrediction.MEDIUM_RISK,
+    WildfirePrediction.HIGH_RISK,
+)
+
+
+@lru_cache(maxsize=4096)
+def landscape_table(soil_name, moisture_retention, vegetation_density, climate_zone):
+    """
+    Soil, vegetation and climate factors of a region for every month.
+
+    Keyed on the region's attributes rather than its id, so editing a region
+    or its soil type picks up new factors and regions sharing attributes
+    share an entry.
+
+    Returns:
+        Read-only array of shape (3, 12): one row per LANDSCAPE_FACTOR_NAMES,
+        one column per month
+    """
+    months = np.arange(1, 13)
+    table = np.vstack(
+        [
+            risk_factors.soil_risk_factors(
+                risk_factors.soil_indices([soil_name]), months, moisture_retention
+            ),
+            np.full(
+                12, risk_factors.calculate_vegetation_risk_factor(vegetation_density)
+            ),
+            risk_factors.climate_risk_multipliers(
+                months, risk_factors.climate_indices([climate_zone])
+            ),
+        ]
+    )
+    table.flags.writeable = False
+    return table
+
+
+def region_landscape(region):
+    """landscape_table of a Region (its soil type should be preloaded)."""
+    soil_type = region.soil_type
+    return landscape_table(
+        soil_type.name if soil_type else None,
+        soil_type.moisture_retention if soil_type else DEFAULT_MOISTURE_RETENTION,
+        region.vegetation_density,
+        region.climate_zone,
+    )
+
+
+def fingerprint(values):
+    """Digest of a stage input: an array or a list of variable-length series."""
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(values, list):
+        for series in values:
+            data = np.asarray(series if series is not None else [], dtype=float)
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data.tobytes())
+    else:
+        data = np.ascontiguousarray(values)
+        digest.update(str((data.dtype, data.shape)).encode())
+        digest.update(data.tobytes())
+    return digest.digest()
+
+
+class Stage(ABC):
+    """
+    One step of the pipeline.
+
+    Attributes:
+        name: Identifies the stage in the cache
+        inputs: Frame columns read by the stage
+        outputs: Frame columns added by the stage
+        cacheable: Whether outputs are worth caching (the stage costs more
+            than hashing its inputs)
+    """
+
+    name = None
+    inputs = ()
+    outputs = ()
+    cacheable = False
+
+    @abstractmethod
+    def run(self, frame, size):
+        """Return a dictionary with an array of ``size`` per output column."""
+
+
+@lru_cache(maxsize=None)
+def lookup_array(values):
+    """Read-only array of a tuple of constants, built once."""
+    array = np.array(values)
+    array.flags.writeable = False
+    return array
+
+
+def banded(values, edges, risks, side):
+    """Risk of each value from the band it falls in (see WeatherStage)."""
+    return lookup_array(risks)[lookup_array(edges).searchsorted(values, side)]
+
+
+class WeatherStage(Stage):
+    """
+    Weather risk bands.
+
+    Temperature and wind bands are closed above (a temperature of exactly
+    30°C is "warm", not "hot"), humidity and precipitation bands below.
+    """
+
+    name = "weather"
+    inputs = ("temperature", "humidity", "wind_speed", "precipitation")
+    outputs = ("temperature_risk", "humidity_risk", "wind_risk", "precipitation_risk")
+
+    def run(self, frame, size):
+        temperature = frame["temperature"]
+        precipitation = frame["precipitation"]
+        return {
+            "temperature_risk": banded(
+                temperature, (20, 25, 30, 35), (0.2, 0.4, 0.6, 0.8, 1.0), "left"
+            ),
+            "humidity_risk": banded(
+                frame["humidity"], (20, 30, 40, 50), (1.0, 0.8, 0.6, 0.4, 0.2), "right"
+            ),
+            "wind_risk": banded(
+                frame["wind_speed"], (10, 20, 30, 40), (0.2, 0.4, 0.6, 0.8, 1.0), "left"
+            ),
+            # No rain is riskiest when it is hot
+            "precipitation_risk": np.where(
+                precipitation == 0,
+                np.where(temperature > 30, 1.0, 0.8),
+                banded(precipitation, (2, 5), (0.6, 0.4, 0.2), "right"),
+            ),
+        }
+
+
+class HistoricalStage(Stage):
+    """Historical risk of each row's temperature series (0.5 without one)."""
+
+    name = "historical"
+    inputs = ("temperature_history",)
+    outputs = ("historical_risk",)
+    cacheable = True
+
+    def run(self, frame, size):
+        history = frame.get("temperature_history")
+        if history is None:
+            return {"historical_risk": np.full(size, 0.5)}
+
+        trends = calculate_trends(history)
+        return {
+            "historical_risk": np.array(
+                [
+                    (
+                        calculate_historical_risk({"temperature": {"trends": trend}})
+                        if series
+                        else 0.5
+                    )
+                    for series, trend in zip(history, trends)
+                ],
+                dtype=float,
+            )
+        }
+
+
+class LandscapeStage(Stage):
+    """Landscape factors for the cycle's month (neutral without regions)."""
+
+    name = "landscape"
+    inputs = ("landscape", "month")
+    outputs = LANDSCAPE_FACTOR_NAMES + ("landscape_factor",)
+
+    def run(self, frame, size):
+        landscape = frame.get("landscape")
+        if landscape is None:
+            factors = np.ones((3, size))
+        else:
+            factors = landscape[:, :, frame["month"] - 1].T
+        return {
+            **dict(zip(LANDSCAPE_FACTOR_NAMES, factors)),
+            "landscape_factor": factors.prod(axis=0),
+        }
+
+
+class CombineStage(Stage):
+    name = "combine"
+    inputs = (
+        "temperature_risk",
+        "humidity_risk",
+        "wind_risk",
+        "precipitation_risk",
+        "historical_risk",
+        "landscape_factor",
+    )
+    outputs = ("environmental_risk", "risk_level", "confidence")
+
+    def run(self, frame, size):
+        weather_risk = (
+            frame["temperature_risk"] * 0.25
+            + frame["humidity_risk"] * 0.25
+            + frame["wind_risk"] * 0.2
+            + frame["precipitation_risk"] * 0.2
+            + frame["historical_risk"] * 0.1
+        )
+        environmental_risk = np.minimum(
+            np.maximum(weather_risk * frame["landscape_factor"] ** LANDSCAPE_WEIGHT, 0),
+            1,
+        )
+
+        levels = lookup_array((0.5, 0.7)).searchsorted(environmental_risk, "right")
+        return {
+            "environmental_risk": environmental_risk,
+            "risk_level": lookup_array(RISK_LEVELS)[levels],
+            "confidence": np.minimum(
+                np.maximum(np.trunc(environmental_risk * 100), 50), 100
+            ),
+        }
+
+
+class RiskPipeline:
+    """
+    Run stages in order over a frame.
+
+    Args:
+        stages: Stage instances, in execution order
+        cache_size: Input digests remembered per cacheable stage
+    """
+
+    def __init__(self, stages, cache_size=32):
+        self.stages = list(stages)
+        self.cache_size = cache_size
+        self.caches = {stage.name: OrderedDict() for stage in self.stages}
+        self.lock = threading.Lock()
+
+    def run(self, frame, size, cache=True):
+        """
+        Score a frame of ``size`` rows.
+
+        Returns:
+            The frame with every stage's outputs added
+        """
+        frame = dict(frame)
+        for stage in self.stages:
+            if all(name in frame for name in stage.outputs):
+                continue
+            key = None
+            if cache and stage.cacheable:
+                key = self.cache_key(stage, frame, size)
+                outputs = self.cached(stage, key)
+                if outputs is not None:
+                    frame.update(outputs)
+                    continue
+
+            outputs = stage.run(frame, size)
+            if key is not None:
+                for values in outputs.values():
+                    values.flags.writeable = False  # Shared with later cycles
+                self.store(stage, key, outputs)
+            frame.update(outputs)
+        return frame
+
+    def cache_key(self, stage, frame, size):
+        return (size,) + tuple(
+            fingerprint(frame[name]) if name in frame else None for name in stage.inputs
+        )
+
+    def cached(self, stage, key):
+        with self.lock:
+            cache = self.caches[stage.name]
+            outputs = cache.get(key)
+            if outputs is not None:
+                cache.move_to_end(key)
+            return outputs
+
+    def store(self, stage, key, outputs):
+        with self.lock:
+            cache = self.caches[stage.name]
+            cache[key] = outputs
+            while len(cache) > self.cache_size:
+                cache.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            for cache in self.caches.values():
+                cache.clear()
+
+
+RISK_PIPELINE = RiskPipeline(
+    [WeatherStage(), HistoricalStage(), LandscapeStage(), CombineStage()]
+)
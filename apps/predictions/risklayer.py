@@ -0,0 +1,250 @@
+"""
+GeoJSON risk layer of the maps.
+
+One FeatureCollection holds a Point feature per region (its current
+prediction snapshot with its explanation, and its largest forests) and per
+city (the risk of its region). Forests have no coordinates and are listed on
+their region.
+
+The layer is built once per version of the snapshots and region metadata:
+every feature's properties are serialized up front, so answering a request
+only filters coordinates by bounding box, rounds them to the precision the
+map's zoom level can show and joins prepared strings. Encoded bodies are
+kept per (bbox, zoom, encoding) in a small LRU on the layer.
+"""
+
+import json
+import logging
+import math
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from apps.core.compression import compress
+from apps.core.lazy import lazy_import
+from apps.core.models import City
+from apps.core.regioncache import get_region_metadata
+from .models import PredictionSnapshot, WildfirePrediction
+from .utils import get_risk_color
+
+logger = logging.getLogger(__name__)
+
+np = lazy_import("numpy")
+
+RISK_LABELS = dict(WildfirePrediction.RISK_CHOICES)
+
+# Cities are left out of zoomed-out maps, where they would hide the regions
+CITY_MIN_ZOOM = 7
+
+# Ground size of a map pixel at zoom 0 on the equator, and of a degree
+METERS_PER_PIXEL_AT_ZOOM_0 = 156543.03
+METERS_PER_DEGREE = 111320.0
+
+# Decimals kept without a zoom level (about 10 cm)
+FULL_PRECISION = 6
+
+
+def coordinate_precision(zoom=None):
+    """Decimals of a coordinate below one pixel at ``zoom``."""
+    if zoom is None:
+        return FULL_PRECISION
+    pixels_per_degree = METERS_PER_DEGREE * 2**zoom / METERS_PER_PIXEL_AT_ZOOM_0
+    return min(max(math.ceil(math.log10(pixels_per_degree)), 0), FULL_PRECISION)
+
+
+def dumps(value):
+    return json.dumps(value, cls=DjangoJSONEncoder, separators=(",", ":"))
+
+
+class RiskLayer:
+    """
+    Prepared features of one layer version.
+
+    Args:
+        key: Identifies the snapshot and metadata version of the layer
+        metadata: RegionMetadata the regions come from
+    """
+
+    def __init__(self, key, metadata):
+        self.key = key
+        self.metadata = metadata
+        self.bodies = OrderedDict()
+        self.lock = threading.Lock()
+
+        snapshots = {
+            row[0]: row[1:]
+            for row in PredictionSnapshot.objects.values_list(
+                "region_id",
+                "risk_level",
+                "confidence",
+                "prediction_date",
+                "explanation",
+            )
+        }
+        cities = list(
+            City.objects.order_by("pk").values_list(
+                "pk", "name", "region_id", "latitude", "longitude", "population"
+            )
+        )
+
+        prefixes = []
+        for region in metadata.regions:
+            risk_level, confidence, prediction_date, explanation = snapshots.get(
+                region.pk, (None, None, None, None)
+            )
+            prefixes.append(
+                self.prefix(
+                    f"region-{region.pk}",
+                    {
+                        "kind": "region",
+                        "id": region.pk,
+                        "name": region.name,
+                        "risk_level": risk_level,
+                        "risk_level_display": RISK_LABELS.get(risk_level),
+                        "risk_color": get_risk_color(risk_level),
+                        "confidence": confidence,
+                        "prediction_date": prediction_date,
+                        "explanation": explanation,
+                        "forests": metadata.major_forests(region.pk),
+                    },
+                )
+            )
+        for pk, name, region_id, _, _, population in cities:
+            risk_level = snapshots.get(region_id, (None,))[0]
+            prefixes.append(
+                self.prefix(
+                    f"city-{pk}",
+                    {
+                        "kind": "city",
+                        "id": pk,
+                        "name": name,
+                        "region_id": region_id,
+                        "population": population,
+                        "risk_level": risk_level,
+                        "risk_level_display": RISK_LABELS.get(risk_level),
+                        "risk_color": get_risk_color(risk_level),
+                    },
+                )
+            )
+
+        self.prefixes = prefixes
+        self.longitude = np.concatenate(
+            [metadata.longitude, [city[4] for city in cities]]
+        )
+        self.latitude = np.concatenate(
+            [metadata.latitude, [city[3] for city in cities]]
+        )
+        self.is_city = np.arange(len(prefixes)) >= len(metadata.regions)
+
+    def prefix(self, feature_id, properties):
+        """A feature's JSON up to its coordinates."""
+        return (
+            f'{{"type":"Feature","id":"{feature_id}",'
+            f'"properties":{dumps(properties)},'
+            f'"geometry":{{"type":"Point","coordinates":['
+        )
+
+    def __len__(self):
+        return len(self.prefixes)
+
+    def select(self, bbox=None, zoom=None):
+        """Rows of the features shown for a bbox (west, south, east, north) and zoom."""
+        mask = np.ones(len(self), dtype=bool)
+        if zoom is not None and zoom < CITY_MIN_ZOOM:
+            mask &= ~self.is_city
+        if bbox is not None:
+            west, south, east, north = bbox
+            mask &= (
+                (self.longitude >= west)
+                & (self.longitude <= east)
+                & (self.latitude >= south)
+                & (self.latitude <= north)
+            )
+        return np.flatnonzero(mask)
+
+    def render(self, bbox=None, zoom=None):
+        """The FeatureCollection as UTF-8 JSON."""
+        digits = coordinate_precision(zoom)
+        rows = self.select(bbox, zoom)
+        longitude = np.round(self.longitude[rows], digits).tolist()
+        latitude = np.round(self.latitude[rows], digits).tolist()
+        features = ",".join(
+            f"{self.prefixes[row]}{lon!r},{lat!r}]}}}}"
+            for row, lon, lat in zip(rows.tolist(), longitude, latitude)
+        )
+        return f'{{"type":"FeatureCollection","features":[{features}]}}'.encode()
+
+    def body(self, bbox=None, zoom=None, encoding=None):
+        """
+        Encoded body of a request, cached.
+
+        Returns:
+            The body and its content encoding (None when uncompressed)
+        """
+        key = (bbox, zoom, encoding)
+        with self.lock:
+            cached = self.bodies.get(key)
+            if cached is not None:
+                self.bodies.move_to_end(key)
+                return cached
+
+        cached = compress(self.render(bbox, zoom), encoding)
+        with self.lock:
+            self.bodies[key] = cached
+            while len(self.bodies) > settings.RISK_LAYER_CACHE_SIZE:
+                self.bodies.popitem(last=False)
+        return cached
+
+
+class RiskLayerCache:
+    """Holds the process's latest RiskLayer, rebuilt when its version changes."""
+
+    def __init__(self):
+        self.layer = None
+        self.lock = threading.Lock()
+
+    def current(self, layer, key, metadata):
+        return layer is not None and layer.key == key and layer.metadata is metadata
+
+    def get(self, key):
+        metadata = get_region_metadata()
+        layer = self.layer
+        if self.current(layer, key, metadata):
+            return layer
+
+        with self.lock:
+            layer = self.layer
+            if not self.current(layer, key, metadata):
+                layer = RiskLayer(key, metadata)
+                self.layer = layer
+                logger.info(f"Built risk layer of {len(layer)} features")
+        return layer
+
+    def clear(self):
+        self.layer = None
+
+
+RISK_LAYER_CACHE = RiskLayerCache()
+
+
+def get_risk_layer(key):
+    """RiskLayer of a snapshot version key (see snapshot_version)."""
+    return RISK_LAYER_CACHE.get(key)
+
+
+def parse_bbox(value):
+    """
+    Parse a ``west,south,east,north`` bounding box in degrees.
+
+    Raises:
+        ValueError: If it is malformed or out of range
+    """
+    try:
+        west, south, east, north = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be west,south,east,north in degrees")
+    if not (-180 <= west <= east <= 180 and -90 <= south <= north <= 90):
+        raise ValueError("bbox must be west,south,east,north in degrees")
+    return west, south, east, north
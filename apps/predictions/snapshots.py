@@ -0,0 +1,143 @@
+"""
+Current-state prediction snapshots.
+
+Every prediction the pipeline computes is appended to ``WildfirePrediction``
+and mirrored into ``PredictionSnapshot`` (one row per region) in the same
+transaction, so readers that only need the latest risk per region can use a
+single indexed scan instead of recomputing.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.utils import timezone
+
+from apps.core import events, metrics
+from apps.core.caching import make_etag
+from apps.core.models import Region
+from .models import PredictionSnapshot, WildfirePrediction
+from .utils import get_risk_color
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_UPDATE_FIELDS = [
+    "prediction_date",
+    "risk_level",
+    "confidence",
+    "risk_factors",
+    "explanation",
+    "model_version",
+    "updated_at",
+]
+
+
+def record_predictions(predictions, explanations):
+    """
+    Store new predictions and update the snapshot of their regions atomically.
+
+    Args:
+        predictions: Unsaved WildfirePrediction instances (one per region)
+        explanations: Explanation text for each prediction, in the same order
+
+    Returns:
+        Dictionary mapping region id to the updated PredictionSnapshot
+    """
+    if not predictions:
+        return {}
+
+    snapshots = [
+        PredictionSnapshot(
+            region=prediction.region,
+            prediction_date=prediction.prediction_date,
+            risk_level=prediction.risk_level,
+            confidence=prediction.confidence,
+            risk_factors=prediction.features_used.get("risk_factors", {}),
+            explanation=explanation,
+            model_version=prediction.model_version,
+        )
+        for prediction, explanation in zip(predictions, explanations)
+    ]
+
+    with transaction.atomic():
+        WildfirePrediction.objects.bulk_create(predictions)
+        PredictionSnapshot.objects.bulk_create(
+            snapshots,
+            update_conflicts=True,
+            unique_fields=["region"],
+            update_fields=SNAPSHOT_UPDATE_FIELDS,
+        )
+        for snapshot in snapshots:
+            events.publish(snapshot.region_id, "prediction", snapshot_event(snapshot))
+
+    metrics.record_prediction_cycle(len(predictions))
+    return {snapshot.region_id: snapshot for snapshot in snapshots}
+
+
+def snapshot_event(snapshot):
+    """Payload pushed to live subscribers when a snapshot changes."""
+    return {
+        "risk_level": snapshot.risk_level,
+        "risk_color": get_risk_color(snapshot.risk_level),
+        "confidence": snapshot.confidence,
+        "explanation": snapshot.explanation,
+        "prediction_date": snapshot.prediction_date,
+    }
+
+
+def is_stale(snapshot, now=None):
+    """Check whether a snapshot is older than PREDICTION_SNAPSHOT_MAX_AGE."""
+    if snapshot is None:
+        return True
+    now = now or timezone.now()
+    max_age = timedelta(seconds=settings.PREDICTION_SNAPSHOT_MAX_AGE)
+    return snapshot.updated_at < now - max_age
+
+
+def snapshot_version(now=None):
+    """
+    Summarize the state of all region snapshots in a single aggregate query.
+
+    The prediction list only changes when a region or a snapshot changes, so
+    the counts and latest update times identify its version.
+
+    Returns:
+        Dictionary with the ``etag`` and ``last_modified`` validators and
+        ``fresh``, which is False when some region has a missing or stale
+        snapshot (the list would recompute it, so it must not answer 304).
+    """
+    stats = Region.objects.aggregate(
+        regions=Count("pk"),
+        snapshots=Count("prediction_snapshot"),
+        regions_updated=Max("updated_at"),
+        latest=Max("prediction_snapshot__updated_at"),
+        oldest=Min("prediction_snapshot__updated_at"),
+    )
+    now = now or timezone.now()
+    max_age = timedelta(seconds=settings.PREDICTION_SNAPSHOT_MAX_AGE)
+    fresh = stats["snapshots"] == stats["regions"] and (
+        stats["oldest"] is None or stats["oldest"] >= now - max_age
+    )
+    updates = [value for value in (stats["latest"], stats["regions_updated"]) if value]
+
+    return {
+        "etag": make_etag(
+            "predictions",
+            stats["regions"],
+            stats["snapshots"],
+            stats["latest"] and stats["latest"].isoformat(),
+            stats["regions_updated"] and stats["regions_updated"].isoformat(),
+        ),
+        "last_modified": max(updates) if updates else None,
+        "fresh": fresh,
+    }
+
+
+def get_region_snapshot(region):
+    """Return the snapshot loaded with ``region`` (via select_related), if any."""
+    try:
+        return region.prediction_snapshot
+    except PredictionSnapshot.DoesNotExist:
+        return None
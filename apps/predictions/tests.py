@@ -0,0 +1,966 @@
+import asyncio
+import gzip
+import json
+from datetime import timedelta
+from unittest import mock, skipUnless
+
+from types import SimpleNamespace
+
+import httpx
+import msgpack
+import numpy as np
+from scipy import stats
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import compression
+from apps.core.models import City, Forest, Region, SoilType
+from apps.core.regioncache import get_region_metadata
+from apps.core.testing import QueryBudgetMixin
+from apps.weather.models import WeatherData
+from . import (
+    async_views,
+    explanations,
+    global_risk_factors as risk_factors,
+    pipeline,
+    risklayer,
+)
+from .batch import load_latest_weather, score_batch
+from .models import PredictionSnapshot, WildfirePrediction
+from .trends import calculate_trend, calculate_trends, trend_kernel
+from .views import (
+    calculate_historical_risk,
+    calculate_wildfire_risk,
+    current_regions,
+    generate_prediction_explanation,
+    score_and_record,
+)
+
+
+def create_region(name="Test Region", **kwargs):
+    defaults = {
+        "latitude": 35.0,
+        "longitude": -5.0,
+        "elevation": 1000,
+        "area": 100,
+        "population": 1000,
+    }
+    defaults.update(kwargs)
+    return Region.objects.create(name=name, **defaults)
+
+
+def create_weather(region, timestamp=None, **kwargs):
+    values = {
+        "temperature": 32.0,
+        "humidity": 25.0,
+        "wind_speed": 12.0,
+        "wind_direction": 90.0,
+        "precipitation": 0.0,
+        "pressure": 1010.0,
+    }
+    values.update(kwargs)
+    return WeatherData.objects.create(
+        region=region, timestamp=timestamp or timezone.now(), **values
+    )
+
+
+def fake_fetch_current_weather(region):
+    return create_weather(region)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+@mock.patch(
+    "apps.predictions.views.fetch_current_weather",
+    side_effect=fake_fetch_current_weather,
+)
+class PredictionSnapshotTest(TestCase):
+    def setUp(self):
+        Region.objects.all().delete()
+        self.region = create_region()
+
+    def test_dashboard_creates_snapshot_and_history(self, fetch):
+        response = self.client.get(reverse("predictions:dashboard"), secure=True)
+
+        self.assertEqual(response.status_code, 200)
+        snapshot = PredictionSnapshot.objects.get(region=self.region)
+        prediction = WildfirePrediction.objects.get(region=self.region)
+        self.assertEqual(snapshot.risk_level, prediction.risk_level)
+        self.assertEqual(snapshot.confidence, prediction.confidence)
+        self.assertTrue(snapshot.explanation)
+        self.assertIn("environmental_risk", snapshot.risk_factors)
+
+    def test_fresh_snapshot_is_reused(self, fetch):
+        self.client.get(reverse("predictions:dashboard"), secure=True)
+        self.client.get(reverse("predictions:dashboard"), secure=True)
+
+        self.assertEqual(fetch.call_count, 1)
+        self.assertEqual(WildfirePrediction.objects.count(), 1)
+
+    @override_settings(PREDICTION_SNAPSHOT_MAX_AGE=0)
+    def test_stale_snapshot_is_replaced(self, fetch):
+        self.client.get(reverse("predictions:dashboard"), secure=True)
+        PredictionSnapshot.objects.update(
+            updated_at=timezone.now() - timedelta(minutes=1)
+        )
+        self.client.get(reverse("predictions:dashboard"), secure=True)
+
+        self.assertEqual(fetch.call_count, 2)
+        self.assertEqual(PredictionSnapshot.objects.count(), 1)
+        self.assertEqual(WildfirePrediction.objects.count(), 2)
+
+    def test_list_reads_snapshots(self, fetch):
+        user = User.objects.create_user("analyst", password="secret")
+        self.client.force_login(user)
+
+        response = self.client.get(
+            reverse("predictions:predictionresult-list"), secure=True
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()), 1)
+        self.assertEqual(response.json()[0]["region"]["id"], self.region.pk)
+        self.assertEqual(PredictionSnapshot.objects.count(), 1)
+
+    def test_list_answers_304_when_snapshots_are_unchanged(self, fetch):
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        url = reverse("predictions:predictionresult-list")
+        first = self.client.get(url, secure=True)
+        self.assertIn("max-age", first["Cache-Control"])
+
+        with self.assertNumQueries(3):  # session, user, version aggregate
+            cached = self.client.get(
+                url, secure=True, headers={"if-none-match": first["ETag"]}
+            )
+        self.assertEqual(cached.status_code, 304)
+
+        since = self.client.get(
+            url, secure=True, headers={"if-modified-since": first["Last-Modified"]}
+        )
+        self.assertEqual(since.status_code, 304)
+
+        PredictionSnapshot.objects.update(risk_level=WildfirePrediction.HIGH_RISK)
+        PredictionSnapshot.objects.update(updated_at=timezone.now())
+        changed = self.client.get(
+            url, secure=True, headers={"if-none-match": first["ETag"]}
+        )
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+        self.assertEqual(fetch.call_count, 1)
+
+
+def async_get(path, user, headers=None, **params):
+    request = AsyncRequestFactory().get(path, params, headers=headers)
+
+    async def auser():
+        return user
+
+    request.auser = auser
+    return request
+
+
+class AsyncPredictionViewTest(TestCase):
+    def setUp(self):
+        Region.objects.all().delete()
+        self.regions = [create_region(f"Region {i}") for i in range(3)]
+        self.user = User.objects.create_user("analyst", password="x")
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def weather_api(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return httpx.Response(
+            200,
+            json={
+                "main": {"temp": 31.0, "humidity": 25, "pressure": 1010},
+                "wind": {"speed": 12.0, "deg": 90},
+            },
+        )
+
+    def http_client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.weather_api))
+
+    async def test_list_fetches_stale_regions_concurrently(self):
+        with mock.patch("apps.predictions.views.async_http_client", self.http_client):
+            response = await async_views.prediction_list(
+                async_get("/predictions/api/results/", self.user)
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(json.loads(response.content)), 3)
+        self.assertEqual(self.max_in_flight, 3)
+        self.assertEqual(await PredictionSnapshot.objects.acount(), 3)
+
+        cached = await async_views.prediction_list(
+            async_get(
+                "/predictions/api/results/",
+                self.user,
+                headers={"if-none-match": response["ETag"]},
+            )
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    async def test_session_writes_require_a_csrf_token(self):
+        request = AsyncRequestFactory().post("/predictions/api/results/", {})
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        response = await async_views.prediction_list(request)
+
+        self.assertEqual(response.status_code, 403)
+        self.assertIn("CSRF Failed", json.loads(response.content)["detail"])
+        self.assertEqual(await WildfirePrediction.objects.acount(), 0)
+
+    async def test_list_requires_authentication(self):
+        response = await async_views.prediction_list(
+            async_get("/predictions/api/results/", AnonymousUser())
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+class BatchPredictionTest(TestCase):
+    def setUp(self):
+        Region.objects.all().delete()
+        self.north = create_region("North", latitude=35.0, longitude=-5.0)
+        self.south = create_region("South", latitude=30.0, longitude=-9.0)
+        for days in range(5, 0, -1):
+            create_weather(self.north, timezone.now() - timedelta(days=days))
+            create_weather(
+                self.south,
+                timezone.now() - timedelta(days=days),
+                temperature=15.0,
+                humidity=70.0,
+                precipitation=8.0,
+            )
+        self.client.force_login(User.objects.create_user("alerts", password="x"))
+        self.url = reverse("predictions:predictionresult-predict-batch")
+        get_region_metadata()
+
+    def post(self, data, **extra):
+        return self.client.post(
+            self.url, data, content_type="application/json", secure=True, **extra
+        )
+
+    def test_scores_regions_and_points(self):
+        missing_id = self.south.pk + 100
+        response = self.post(
+            {
+                "region_ids": [self.north.pk, self.south.pk, missing_id],
+                "points": [{"latitude": 30.1, "longitude": -9.1}],
+            }
+        )
+
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0]["risk_level"], WildfirePrediction.HIGH_RISK)
+        self.assertEqual(results[1]["risk_level"], WildfirePrediction.LOW_RISK)
+        self.assertEqual(results[2]["error"], "Region not found")
+        self.assertEqual(results[3]["region_id"], self.south.pk)
+        self.assertLess(results[3]["distance_km"], 20)
+        self.assertFalse(WildfirePrediction.objects.exists())
+
+    def test_query_count_does_not_grow_with_batch_size(self):
+        # session, user, latest weather, history; regions come from the cache
+        with self.assertNumQueries(4):
+            self.post({"region_ids": [self.north.pk]})
+        with self.assertNumQueries(4):
+            self.post({"region_ids": [self.north.pk, self.south.pk]})
+
+    def test_streams_ndjson(self):
+        response = self.post(
+            {"region_ids": [self.north.pk, self.south.pk]},
+            HTTP_ACCEPT="application/x-ndjson",
+        )
+
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 2)
+
+    def test_persist_records_snapshots(self):
+        self.post({"region_ids": [self.north.pk, self.south.pk], "persist": True})
+
+        self.assertEqual(PredictionSnapshot.objects.count(), 2)
+        self.assertEqual(WildfirePrediction.objects.count(), 2)
+
+    def test_points_without_regions_are_not_found(self):
+        Region.objects.all().delete()
+
+        response = self.post({"points": [{"latitude": 30.1, "longitude": -9.1}]})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_rejects_invalid_points(self):
+        response = self.post({"points": [{"latitude": 200, "longitude": 0}]})
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_vectorized_scores_match_scalar_scoring(self):
+        cases = [
+            (36, 15, 45, 0, 0.8),
+            (31, 25, 35, 0, 0.6),
+            (26, 35, 25, 1, 0.4),
+            (21, 45, 15, 3, 0.2),
+            (10, 80, 5, 12, 0.5),
+        ]
+        scores = score_batch(*zip(*cases))
+
+        for index, (temp, humidity, wind, precip, historical) in enumerate(cases):
+            weather = SimpleNamespace(
+                temperature=temp,
+                humidity=humidity,
+                wind_speed=wind,
+                precipitation=precip,
+            )
+            with mock.patch(
+                "apps.predictions.views.calculate_historical_risk",
+                return_value=historical,
+            ):
+                expected = calculate_wildfire_risk(weather, {"temperature": {}})
+            self.assertEqual(scores["risk_level"][index], expected["risk_level"])
+            self.assertEqual(scores["confidence"][index], expected["confidence"])
+
+
+class PredictionHistoryTest(TestCase):
+    def test_history_is_paginated_by_prediction_date(self):
+        region = create_region()
+        now = timezone.now()
+        for hours in range(3):
+            WildfirePrediction.objects.create(
+                region=region,
+                prediction_date=now - timedelta(hours=hours),
+                confidence=60,
+                features_used={},
+                model_version="1.0",
+            )
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+
+        response = self.client.get(
+            reverse("predictions:predictionresult-history"),
+            {"page_size": 2, "region_id": region.pk},
+            secure=True,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["results"]), 2)
+        self.assertIsNotNone(response.json()["next"])
+
+        response = self.client.get(
+            reverse("predictions:predictionresult-history"),
+            {"page_size": 2, "region_id": region.pk, "format": "msgpack"},
+            secure=True,
+        )
+
+        self.assertEqual(response.status_code, 200)
+        page = msgpack.unpackb(response.content)
+        columns = page["results"]["columns"]
+        self.assertEqual(columns["risk_level"], ["medium", "medium"])
+        self.assertEqual(columns["features_used"], [{}, {}])
+        confidence = columns["confidence"]
+        self.assertEqual(
+            np.frombuffer(confidence["data"], confidence["dtype"]).tolist(),
+            [60.0, 60.0],
+        )
+        self.assertIsNotNone(page["next"])
+
+    def test_stored_predictions_cannot_be_written_through_the_api(self):
+        region = create_region()
+        prediction = WildfirePrediction.objects.create(
+            region=region,
+            prediction_date=timezone.now(),
+            confidence=60,
+            features_used={},
+            model_version="1.0",
+        )
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        detail = reverse("predictions:predictionresult-detail", args=[prediction.pk])
+
+        created = self.client.post(
+            reverse("predictions:predictionresult-list"),
+            {"region": region.pk, "confidence": 90, "model_version": "x"},
+            secure=True,
+        )
+        deleted = self.client.delete(detail, secure=True)
+
+        self.assertEqual(created.status_code, 405)
+        self.assertEqual(deleted.status_code, 405)
+        self.assertEqual(self.client.get(detail, secure=True).status_code, 200)
+        self.assertEqual(WildfirePrediction.objects.count(), 1)
+
+
+@override_settings(
+    STATICFILES_STORAGE="django.contrib.staticfiles.storage.StaticFilesStorage"
+)
+class PredictionQueryBudgetTest(QueryBudgetMixin, TestCase):
+    def setUp(self):
+        Region.objects.all().delete()
+        self.soil = SoilType.objects.create(
+            name="Sandy",
+            description="Sandy soil",
+            fire_risk_factor=0.8,
+            moisture_retention=0.2,
+            organic_matter=0.1,
+        )
+        self.add_regions(2)
+
+    def add_regions(self, count):
+        start = Region.objects.count()
+        for index in range(start, start + count):
+            region = create_region(f"Region {index}", soil_type=self.soil)
+            for size in range(4):
+                Forest.objects.create(
+                    name=f"Forest {index}-{size}",
+                    region=region,
+                    area=size + 1,
+                    dominant_species="Cedar",
+                    density=0.5,
+                )
+            create_weather(region, timezone.now() - timedelta(days=1))
+            PredictionSnapshot.objects.create(
+                region=region,
+                prediction_date=timezone.now(),
+                risk_level=WildfirePrediction.LOW_RISK,
+                confidence=60,
+                explanation="Calm conditions",
+            )
+
+    def test_dashboard(self):
+        url = reverse("predictions:dashboard")
+
+        def get():
+            response = self.client.get(url, secure=True)
+            self.assertEqual(response.status_code, 200)
+            self.assertContains(response, "Forest 0-3, Forest 0-2, Forest 0-1")
+
+        def grow():
+            self.add_regions(5)
+            get_region_metadata()
+
+        # regions with snapshot and soil type; forests come from the cache
+        get_region_metadata()
+        self.assertQueryBudget(get, 1, grow=grow)
+
+    def test_list(self):
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        url = reverse("predictions:predictionresult-list")
+
+        # session, user, version aggregate, regions with snapshot and soil type
+        self.assertQueryBudget(
+            lambda: self.client.get(url, secure=True),
+            4,
+            grow=lambda: self.add_regions(5),
+        )
+
+    def test_risk_layer(self):
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        url = reverse("predictions:risk_layer")
+
+        def grow():
+            self.add_regions(5)
+            # The layer is rebuilt (snapshots and cities) once per version
+            self.client.get(url, secure=True)
+
+        # session, user, version aggregate
+        grow()
+        self.assertQueryBudget(lambda: self.client.get(url, secure=True), 3, grow=grow)
+
+    def test_refresh_scoring(self):
+        def scoring_queries():
+            regions = list(current_regions())
+            weather = load_latest_weather([region.pk for region in regions])
+            observations = [(region, weather[region.pk]) for region in regions]
+            return self.capture_queries(lambda: score_and_record(observations))
+
+        queries = scoring_queries()
+        self.add_regions(5)
+
+        self.assertEqual(len(scoring_queries()), len(queries))
+        # history, prediction insert, snapshot upsert, savepoint pair
+        self.assertLessEqual(len(queries), 5)
+
+
+def reference_trend(values, window_size=7):
+    """The scipy/np.convolve implementation calculate_trend replaced."""
+    data = np.array(values, dtype=float)
+    result = stats.linregress(np.arange(len(data)), data)
+    moving_average = []
+    if len(data) >= window_size:
+        moving_average = np.convolve(
+            data, np.ones(window_size) / window_size, mode="valid"
+        ).tolist()
+    seasonality = 0
+    if len(data) - window_size > 1:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            seasonality = np.corrcoef(data[window_size:], data[:-window_size])[0, 1]
+    return {
+        "linear_trend": float(result.slope),
+        "r_squared": float(result.rvalue**2),
+        "moving_average": moving_average,
+        "volatility": float(np.std(data)),
+        "seasonality": float(seasonality),
+    }
+
+
+class TrendKernelTest(TestCase):
+    def assertTrendEqual(self, actual, expected):
+        self.assertEqual(actual.keys(), expected.keys())
+        for key, value in expected.items():
+            np.testing.assert_allclose(
+                actual[key], value, rtol=1e-9, atol=1e-9, err_msg=key
+            )
+
+    def test_matches_scipy_reference(self):
+        rng = np.random.default_rng(7)
+        series = [
+            (20 + np.cumsum(rng.normal(0, 1, 90))).tolist(),
+            rng.uniform(0, 100, 30).tolist(),
+            [float(value) for value in range(10)],
+            [5.0] * 12,
+            [1.0, 3.0],
+            [1.0, 2.0, 4.0, 8.0, 16.0, 32.0, 64.0, 128.0],
+            [1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0],
+        ]
+        for values in series:
+            with self.subTest(length=len(values)):
+                self.assertTrendEqual(calculate_trend(values), reference_trend(values))
+
+    def test_nan_only_spoils_windows_containing_it(self):
+        values = [float(value) for value in range(20)]
+        values[10] = float("nan")
+        result = calculate_trend(values)
+        expected = reference_trend(values)
+        self.assertTrue(np.isnan(result["linear_trend"]))
+        np.testing.assert_allclose(result["moving_average"], expected["moving_average"])
+        self.assertFalse(np.isnan(result["moving_average"][0]))
+
+    def test_short_and_invalid_series(self):
+        empty = {
+            "linear_trend": 0,
+            "r_squared": 0,
+            "moving_average": [],
+            "volatility": 0,
+            "seasonality": 0,
+        }
+        self.assertEqual(calculate_trend([]), empty)
+        self.assertEqual(calculate_trend([3.0]), empty)
+        with self.assertLogs("apps.predictions.trends", "ERROR"):
+            self.assertEqual(calculate_trend(["a", "b", "c"]), empty)
+
+    def test_batched_series_match_single_series(self):
+        rng = np.random.default_rng(11)
+        values = rng.normal(25, 5, (4, 60))
+        result = trend_kernel(values)
+        self.assertEqual(result["moving_average"].shape, (4, 54))
+        series = [row.tolist() for row in values] + [[1.0, 2.0, 4.0], []]
+        for values, trend in zip(series, calculate_trends(series)):
+            self.assertTrendEqual(trend, calculate_trend(values))
+
+
+class ExplanationTest(TestCase):
+    def setUp(self):
+        explanations.clear_caches()
+        self.soil = SoilType.objects.create(name="Sandy", description="Sandy soil")
+        self.region = create_region(
+            "Explained Region",
+            soil_type=self.soil,
+            vegetation_density=0.8,
+            climate_zone="semi_arid",
+        )
+
+    def prediction(self, region=None, **weather):
+        current_weather = {
+            "temperature": 32.4,
+            "humidity": 35.2,
+            "wind_speed": 14.6,
+            "precipitation": 0.2,
+        }
+        current_weather.update(weather)
+        return WildfirePrediction(
+            region=region or self.region,
+            prediction_date=timezone.now(),
+            risk_level="HIGH",
+            confidence=0.8,
+            features_used={"current_weather": current_weather},
+        )
+
+    @mock.patch("apps.predictions.views.get_current_season", return_value="summer")
+    def test_explanation_text(self, _):
+        self.assertEqual(
+            generate_prediction_explanation(self.prediction()),
+            "The Explained Region region, characterized by its sandy soil and "
+            "dense vegetation density in a semi_arid climate zone, is "
+            "experiencing significantly high temperatures of 32°C, which is "
+            "typical for this summer season and significantly increases the risk "
+            "of vegetation drying out. Humidity is low at 35%, creating dry "
+            "conditions that are especially risky given the soil composition. "
+            "Moderate winds of 15 km/h are present, with increased potential for "
+            "fire spread through the dense vegetation. There is no precipitation, "
+            "which is particularly concerning for this semi_arid climate zone and "
+            "increases fire risk.",
+        )
+
+    def test_repeated_inputs_are_cache_hits(self):
+        other = create_region("Other Region", vegetation_density=0.1)
+        for region in [self.region, other] * 3:
+            generate_prediction_explanation(self.prediction(region))
+        # Rounding buckets the weather: 32.4 and 31.6 both read 32°C
+        generate_prediction_explanation(self.prediction(temperature=31.6))
+
+        info = explanations.cache_info()
+        self.assertEqual(info["explanations"].misses, 2)
+        self.assertEqual(info["explanations"].hits, 5)
+        self.assertIn(
+            "sparse vegetation", generate_prediction_explanation(self.prediction(other))
+        )
+
+    def test_language_falls_back_to_english(self):
+        self.assertEqual(explanations.resolve_language("en-us"), "en")
+        self.assertEqual(explanations.resolve_language("xx"), "en")
+        explanation = generate_prediction_explanation(self.prediction(), "fr")
+        self.assertTrue(explanation.startswith("The Explained Region region"))
+
+    def test_missing_features_fall_back(self):
+        prediction = self.prediction()
+        prediction.features_used = "not json"
+        with self.assertLogs("apps.predictions.views", "ERROR"):
+            self.assertEqual(
+                generate_prediction_explanation(prediction),
+                "Unable to generate detailed explanation for Explained Region.",
+            )
+
+
+class GlobalRiskFactorTablesTest(TestCase):
+    def test_scalar_factors(self):
+        sandy = SimpleNamespace(name="Sandy", moisture_retention=0.5)
+        # 1.3 base × 1.5 summer × (2 - 0.3 × 0.5), then half the drought boost
+        self.assertAlmostEqual(
+            risk_factors.calculate_soil_risk_factor(sandy, 7), 1.3 * 1.5 * 1.85
+        )
+        self.assertAlmostEqual(
+            risk_factors.calculate_soil_risk_factor(sandy, 7, drought_index=1.5),
+            1.3 * 1.5 * 1.85 * 1.3,
+        )
+        self.assertEqual(
+            risk_factors.calculate_soil_risk_factor(
+                SimpleNamespace(name="Peat", moisture_retention=0.5), 7
+            ),
+            1.0,
+        )
+        self.assertEqual(risk_factors.calculate_vegetation_risk_factor(0.3), 0.8)
+        self.assertEqual(risk_factors.calculate_vegetation_risk_factor(0.31), 1.2)
+        self.assertEqual(risk_factors.calculate_vegetation_risk_factor(0.9), 1.5)
+        self.assertEqual(
+            risk_factors.calculate_climate_risk_multiplier(8, "mediterranean"), 1.4
+        )
+        self.assertEqual(
+            risk_factors.calculate_climate_risk_multiplier(6, "mediterranean"), 1.0
+        )
+        self.assertEqual(
+            risk_factors.calculate_climate_risk_multiplier(8, "polar"), 1.0
+        )
+
+    def test_vectorized_factors_match_scalar(self):
+        rng = np.random.default_rng(3)
+        size = 500
+        names = rng.choice(["Clay", "Sandy", "Loam", "Peat"], size).tolist()
+        zones = rng.choice(["mediterranean", "semi_arid", "temperate", "polar"], size)
+        months = rng.integers(1, 13, size)
+        retention = rng.uniform(0, 1, size)
+        drought = rng.uniform(0, 3, size)
+        drought[::7] = np.nan
+        density = rng.uniform(0, 1, size)
+
+        soil = risk_factors.soil_risk_factors(
+            risk_factors.soil_indices(names), months, retention, drought
+        )
+        vegetation = risk_factors.vegetation_risk_factors(density)
+        climate = risk_factors.climate_risk_multipliers(
+            months, risk_factors.climate_indices(zones)
+        )
+        for i in range(size):
+            soil_type = SimpleNamespace(name=names[i], moisture_retention=retention[i])
+            self.assertEqual(
+                soil[i],
+                risk_factors.calculate_soil_risk_factor(
+                    soil_type, int(months[i]), drought[i]
+                ),
+            )
+            self.assertEqual(
+                vegetation[i],
+                risk_factors.calculate_vegetation_risk_factor(density[i]),
+            )
+            self.assertEqual(
+                climate[i],
+                risk_factors.calculate_climate_risk_multiplier(
+                    int(months[i]), zones[i]
+                ),
+            )
+
+    def test_tables_are_read_only(self):
+        tables = risk_factors.lookup_tables()
+        self.assertEqual(tables["climate"].shape, (4, 12))
+        with self.assertRaises(ValueError):
+            tables["climate"][0, 0] = 2.0
+
+
+class RiskPipelineTest(TestCase):
+    def setUp(self):
+        pipeline.RISK_PIPELINE.clear()
+        self.soil = SoilType.objects.create(
+            name="Sandy", description="Sandy soil", moisture_retention=0.4
+        )
+        self.region = create_region(
+            "Landscape Region",
+            soil_type=self.soil,
+            vegetation_density=0.8,
+            climate_zone="semi_arid",
+        )
+
+    def test_stages_must_implement_run(self):
+        class Incomplete(pipeline.Stage):
+            name = "incomplete"
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_landscape_factors_scale_environmental_risk(self):
+        weather = SimpleNamespace(
+            temperature=27, humidity=45, wind_speed=15, precipitation=3
+        )
+        neutral = calculate_wildfire_risk(weather)
+        with mock.patch("apps.predictions.batch.timezone.now") as now:
+            now.return_value.month = 7
+            scored = calculate_wildfire_risk(weather, region=self.region)
+
+        factors = scored["features_used"]["risk_factors"]
+        self.assertAlmostEqual(
+            factors["soil_factor"],
+            risk_factors.calculate_soil_risk_factor(self.soil, 7),
+        )
+        self.assertEqual(factors["vegetation_factor"], 1.5)
+        self.assertEqual(factors["climate_factor"], 1.3)
+        self.assertAlmostEqual(
+            factors["environmental_risk"],
+            neutral["features_used"]["risk_factors"]["environmental_risk"]
+            * factors["landscape_factor"] ** pipeline.LANDSCAPE_WEIGHT,
+        )
+        self.assertEqual(
+            neutral["features_used"]["risk_factors"]["landscape_factor"], 1
+        )
+
+    def test_region_landscape_is_computed_once(self):
+        pipeline.landscape_table.cache_clear()
+        for _ in range(3):
+            table = pipeline.region_landscape(self.region)
+        self.assertEqual(table.shape, (3, 12))
+        self.assertEqual(pipeline.landscape_table.cache_info().misses, 1)
+
+        self.region.vegetation_density = 0.1
+        self.assertEqual(pipeline.region_landscape(self.region)[1, 0], 0.8)
+
+    def test_batch_matches_single_observation_scoring(self):
+        history = [
+            create_weather(self.region, timezone.now() - timedelta(hours=h))
+            for h in range(30, 0, -1)
+        ]
+        temperatures = [
+            weather.temperature + i % 5 for i, weather in enumerate(history)
+        ]
+        scores = score_batch(
+            [31],
+            [25],
+            [22],
+            [0],
+            regions=[self.region],
+            temperature_history=[temperatures],
+        )
+
+        expected = calculate_historical_risk(
+            {"temperature": {"trends": calculate_trends([temperatures])[0]}}
+        )
+        self.assertEqual(scores["historical_risk"][0], expected)
+        single = calculate_wildfire_risk(
+            SimpleNamespace(
+                temperature=31, humidity=25, wind_speed=22, precipitation=0
+            ),
+            {"temperature": {"trends": calculate_trends([temperatures])[0]}},
+            self.region,
+        )
+        self.assertEqual(scores["risk_level"][0], single["risk_level"])
+        self.assertEqual(scores["confidence"][0], single["confidence"])
+
+    def test_unchanged_inputs_reuse_cached_stage_outputs(self):
+        history = [[20.0 + i % 7 for i in range(48)], [15.0] * 48]
+        args = ([30, 20], [20, 60], [25, 5], [0, 6])
+        with mock.patch.object(
+            pipeline.HistoricalStage,
+            "run",
+            autospec=True,
+            side_effect=pipeline.HistoricalStage.run,
+        ) as run:
+            first = score_batch(*args, temperature_history=history)
+            second = score_batch(*args, temperature_history=history)
+            self.assertEqual(run.call_count, 1)
+
+            history[1] = history[1] + [16.0]
+            score_batch(*args, temperature_history=history)
+            self.assertEqual(run.call_count, 2)
+
+        np.testing.assert_array_equal(
+            first["historical_risk"], second["historical_risk"]
+        )
+        with self.assertRaises(ValueError):
+            second["historical_risk"][0] = 1.0
+
+
+class RiskLayerTest(TestCase):
+    def setUp(self):
+        Region.objects.all().delete()
+        self.north = create_region("North", latitude=35.123456, longitude=-5.654321)
+        self.south = create_region("South", latitude=30.0, longitude=-9.0)
+        Forest.objects.create(
+            name="Cedar Forest",
+            region=self.north,
+            area=10,
+            dominant_species="Cedar",
+            density=0.5,
+        )
+        self.city = City.objects.create(
+            name="Tetouan", region=self.north, latitude=35.57, longitude=-5.37
+        )
+        PredictionSnapshot.objects.create(
+            region=self.north,
+            prediction_date=timezone.now(),
+            risk_level=WildfirePrediction.HIGH_RISK,
+            confidence=80,
+            explanation="Hot and dry.",
+        )
+        self.url = reverse("predictions:risk_layer")
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+
+    def get(self, params=None, **headers):
+        response = self.client.get(self.url, params or {}, secure=True, **headers)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def features(self, params=None):
+        return {
+            feature["id"]: feature
+            for feature in json.loads(self.get(params).content)["features"]
+        }
+
+    def test_regions_and_cities_with_risk(self):
+        response = self.get()
+        self.assertEqual(response["Content-Type"], "application/geo+json")
+        features = self.features()
+
+        self.assertEqual(
+            set(features),
+            {
+                f"region-{self.north.pk}",
+                f"region-{self.south.pk}",
+                f"city-{self.city.pk}",
+            },
+        )
+        north = features[f"region-{self.north.pk}"]
+        self.assertEqual(north["geometry"]["coordinates"], [-5.654321, 35.123456])
+        self.assertEqual(
+            north["properties"]["risk_level"], WildfirePrediction.HIGH_RISK
+        )
+        self.assertEqual(north["properties"]["risk_color"], "danger")
+        self.assertEqual(north["properties"]["forests"], ["Cedar Forest"])
+        self.assertEqual(north["properties"]["explanation"], "Hot and dry.")
+        self.assertIsNone(
+            features[f"region-{self.south.pk}"]["properties"]["risk_level"]
+        )
+        self.assertEqual(
+            features[f"city-{self.city.pk}"]["properties"]["risk_level"],
+            WildfirePrediction.HIGH_RISK,
+        )
+
+    def test_bbox_and_zoom(self):
+        features = self.features({"bbox": "-6,34,-5,36", "zoom": 10})
+        self.assertEqual(
+            set(features), {f"region-{self.north.pk}", f"city-{self.city.pk}"}
+        )
+        self.assertEqual(
+            features[f"region-{self.north.pk}"]["geometry"]["coordinates"],
+            [-5.654, 35.123],
+        )
+
+        # Zoomed out: regions only, at coarse precision
+        features = self.features({"zoom": 3})
+        self.assertEqual(
+            set(features), {f"region-{self.north.pk}", f"region-{self.south.pk}"}
+        )
+        self.assertEqual(
+            features[f"region-{self.north.pk}"]["geometry"]["coordinates"], [-5.7, 35.1]
+        )
+
+        self.assertEqual(
+            [risklayer.coordinate_precision(z) for z in (0, 6, 10, 18)], [0, 2, 3, 6]
+        )
+
+        for params in ({"bbox": "1,2,3"}, {"bbox": "5,0,4,1"}, {"zoom": "-1"}):
+            response = self.client.get(self.url, params, secure=True)
+            self.assertEqual(response.status_code, 400)
+
+    def test_compression_and_revalidation(self):
+        for index in range(20):
+            City.objects.create(
+                name=f"City {index}", region=self.south, latitude=30.1, longitude=-9.1
+            )
+        plain = self.get().content
+
+        response = self.get(HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), plain)
+        self.assertIn("Accept-Encoding", response["Vary"])
+
+        etag = response["ETag"]
+        response = self.client.get(
+            self.url,
+            secure=True,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 304)
+
+        # A new snapshot is a new version
+        PredictionSnapshot.objects.filter(region=self.north).update(
+            risk_level=WildfirePrediction.LOW_RISK, updated_at=timezone.now()
+        )
+        response = self.client.get(
+            self.url,
+            secure=True,
+            HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=etag,
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(gzip.decompress(response.content), plain)
+
+    @skipUnless(compression.brotli_available(), "brotli is not installed")
+    def test_brotli(self):
+        import brotli
+
+        for index in range(20):
+            City.objects.create(
+                name=f"City {index}", region=self.south, latitude=30.1, longitude=-9.1
+            )
+        plain = self.get().content
+
+        response = self.get(HTTP_ACCEPT_ENCODING="gzip;q=0.5, br")
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), plain)
+
+        response = self.get(HTTP_ACCEPT_ENCODING="gzip, br;q=0")
+        self.assertEqual(response["Content-Encoding"], "gzip")
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import PredictionViewSet, dashboard
+from . import async_views
+from .views import PredictionViewSet, dashboard, risk_layer
 
 app_name = "predictions"
 
@@ -14,5 +16,15 @@ router.register(r"results", PredictionViewSet, basename="predictionresult")
 # - /results/predict-for-region/ (custom action)
 urlpatterns = [
     path("", dashboard, name="dashboard"),
+    path("api/risk-layer/", risk_layer, name="risk_layer"),
     path("api/", include(router.urls)),
 ]
+
+if settings.ASGI_MODE:
+    # Serve the async versions of the dashboard and the prediction list
+    urlpatterns = [
+        path("", async_views.dashboard, name="dashboard"),
+        path("api/results/", async_views.prediction_list),
+        path("api/risk-layer/", risk_layer, name="risk_layer"),
+        path("api/", include(router.urls)),
+    ]
@@ -1,13 +1,15 @@
 import logging
 from django.utils import timezone
 from datetime import timedelta
-import numpy as np
-from scipy import stats
+from apps.core.lazy import lazy_import
 from apps.weather.models import WeatherData
 from .models import WildfirePrediction
+from .trends import calculate_trends
 
 logger = logging.getLogger(__name__)
 
+np = lazy_import("numpy")
+
 
 def analyze_historical_patterns(region):
     """Analyze historical weather patterns for a region."""
@@ -47,10 +49,9 @@ def analyze_historical_patterns(region):
 
         # Calculate trends if we have enough data points
         if len(historical_data) > 1:
-            temp_trends = calculate_trend(temperatures)
-            humidity_trends = calculate_trend(humidity_values)
-            wind_trends = calculate_trend(wind_speeds)
-            precip_trends = calculate_trend(precipitation_values)
+            temp_trends, humidity_trends, wind_trends, precip_trends = calculate_trends(
+                [temperatures, humidity_values, wind_speeds, precipitation_values]
+            )
         else:
             # Use simplified trends for single data point
             temp_trends = {
@@ -172,90 +173,6 @@ def analyze_historical_patterns(region):
         return None
 
 
-def calculate_trend(data_points, window_size=7):
-    """
-    Calculate trend metrics for a series of data points.
-
-    Args:
-        data_points: List of numerical values
-        window_size: Window size for moving average
-
-    Returns:
-        Dictionary containing trend metrics
-    """
-    try:
-        if not data_points or len(data_points) < 2:
-            return {
-                "linear_trend": 0,
-                "r_squared": 0,
-                "moving_average": [],
-                "volatility": 0,
-                "seasonality": 0,
-            }
-
-        # Convert to numpy array
-        data = np.array(data_points)
-
-        # Calculate linear trend
-        x = np.arange(len(data))
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, data)
-
-        # Calculate moving average
-        moving_avg = []
-        if len(data) >= window_size:
-            moving_avg = np.convolve(
-                data, np.ones(window_size) / window_size, mode="valid"
-            )
-
-        # Calculate volatility (standard deviation)
-        volatility = np.std(data)
-
-        # Calculate basic seasonality (correlation with shifted series)
-        if len(data) > window_size:
-            shifted = np.roll(data, window_size)
-            # Ensure we're working with 1D arrays
-            data_slice = data[window_size:]
-            shifted_slice = shifted[window_size:]
-
-            # Calculate correlation coefficient safely
-            if len(data_slice) > 1 and len(shifted_slice) > 1:
-                try:
-                    # Reshape arrays to 2D for correlation
-                    data_2d = data_slice.reshape(-1, 1)
-                    shifted_2d = shifted_slice.reshape(-1, 1)
-                    corr_matrix = np.corrcoef(data_2d.T, shifted_2d.T)
-                    seasonality = (
-                        float(corr_matrix[0, 1]) if corr_matrix.shape == (2, 2) else 0
-                    )
-                except Exception as e:
-                    logger.error(f"Error calculating correlation: {str(e)}")
-                    seasonality = 0
-            else:
-                seasonality = 0
-        else:
-            seasonality = 0
-
-        return {
-            "linear_trend": float(slope),
-            "r_squared": float(r_value**2),
-            "moving_average": (
-                [float(x) for x in moving_avg.tolist()] if len(moving_avg) > 0 else []
-            ),
-            "volatility": float(volatility),
-            "seasonality": float(seasonality),
-        }
-
-    except Exception as e:
-        logger.error(f"Error calculating trend: {str(e)}")
-        return {
-            "linear_trend": 0,
-            "r_squared": 0,
-            "moving_average": [],
-            "volatility": 0,
-            "seasonality": 0,
-        }
-
-
 def get_season(month):
     """Determine the season based on the month."""
     if month in [12, 1, 2]:
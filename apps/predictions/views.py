@@ -1,116 +1,76 @@
-from rest_framework import viewsets, status
-from rest_framework.decorators import action
+from asgiref.sync import sync_to_async
+from rest_framework import mixins, viewsets, status
+from rest_framework.decorators import action, api_view, renderer_classes
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, render
+from django.utils.cache import patch_vary_headers
 from django.utils import timezone
 from datetime import timedelta, datetime
+import asyncio
 import random
 import logging
 from django.db.models import Avg, Max, Min, Count
-import numpy as np
-from scipy import stats
+from apps.core.lazy import lazy_import
 import json
 from django.contrib.auth.decorators import login_required
 
 from .models import WildfirePrediction
 from .serializers import WildfirePredictionSerializer
+from .snapshots import (
+    get_region_snapshot,
+    is_stale,
+    record_predictions,
+    snapshot_version,
+)
+from . import explanations, risklayer
+from .batch import (
+    RISK_FACTOR_NAMES,
+    load_weather_history,
+    nearest_regions,
+    predict_regions,
+    score_batch,
+)
 from .ml_model import WildfirePredictionModel
 from apps.core.models import Region
 from apps.weather.models import WeatherData
-from apps.weather.services import fetch_current_weather
+from apps.weather.services import (
+    afetch_current_weather,
+    async_http_client,
+    fetch_current_weather,
+)
 from .global_risk_factors import (
     calculate_soil_risk_factor,
     calculate_vegetation_risk_factor,
     calculate_climate_risk_multiplier,
 )
+from apps.core import metrics
+from apps.core.caching import make_etag, not_modified, set_validators
+from apps.core.compression import negotiate_encoding
+from apps.core import columnar
+from apps.core.exports import EXPORTS, export_response
+from apps.core.filters import RegionTimeRangeFilter
+from apps.core.pagination import KeysetPagination
+from apps.core.regioncache import get_region_metadata
+from apps.core.renderers import (
+    ArrowRenderer,
+    CSVRenderer,
+    GeoJSONRenderer,
+    MessagePackRenderer,
+    NDJSONRenderer,
+    ParquetRenderer,
+)
 from apps.core.serializers import RegionSerializer
+from apps.core.streaming import streaming_response
+from .trends import calculate_historical_risk, calculate_trends
 from .utils import analyze_historical_patterns, get_risk_color
 
 logger = logging.getLogger(__name__)
 
-
-def calculate_trend(data_points, window_size=7):
-    """
-    Calculate trend metrics for a series of data points.
-
-    Args:
-        data_points: List of numerical values
-        window_size: Window size for moving average
-
-    Returns:
-        Dictionary containing trend metrics
-    """
-    try:
-        if not data_points or len(data_points) < 2:
-            return {
-                "linear_trend": 0,
-                "r_squared": 0,
-                "moving_average": [],
-                "volatility": 0,
-                "seasonality": 0,
-            }
-
-        # Convert to numpy array
-        data = np.array(data_points)
-
-        # Calculate linear trend
-        x = np.arange(len(data))
-        slope, intercept, r_value, p_value, std_err = stats.linregress(x, data)
-
-        # Calculate moving average
-        moving_avg = []
-        if len(data) >= window_size:
-            moving_avg = np.convolve(
-                data, np.ones(window_size) / window_size, mode="valid"
-            )
-
-        # Calculate volatility (standard deviation)
-        volatility = np.std(data)
-
-        # Calculate basic seasonality (correlation with shifted series)
-        if len(data) > window_size:
-            shifted = np.roll(data, window_size)
-            # Ensure we're working with 1D arrays
-            data_slice = data[window_size:]
-            shifted_slice = shifted[window_size:]
-
-            # Calculate correlation coefficient safely
-            if len(data_slice) > 1 and len(shifted_slice) > 1:
-                try:
-                    # Reshape arrays to 2D for correlation
-                    data_2d = data_slice.reshape(-1, 1)
-                    shifted_2d = shifted_slice.reshape(-1, 1)
-                    corr_matrix = np.corrcoef(data_2d.T, shifted_2d.T)
-                    seasonality = (
-                        float(corr_matrix[0, 1]) if corr_matrix.shape == (2, 2) else 0
-                    )
-                except Exception as e:
-                    logger.error(f"Error calculating correlation: {str(e)}")
-                    seasonality = 0
-            else:
-                seasonality = 0
-        else:
-            seasonality = 0
-
-        return {
-            "linear_trend": float(slope),
-            "r_squared": float(r_value**2),
-            "moving_average": (
-                [float(x) for x in moving_avg.tolist()] if len(moving_avg) > 0 else []
-            ),
-            "volatility": float(volatility),
-            "seasonality": float(seasonality),
-        }
-
-    except Exception as e:
-        logger.error(f"Error calculating trend: {str(e)}")
-        return {
-            "linear_trend": 0,
-            "r_squared": 0,
-            "moving_average": [],
-            "volatility": 0,
-            "seasonality": 0,
-        }
+np = lazy_import("numpy")
 
 
 # Instantiate the model (consider how this is managed in a production environment - singleton?)
@@ -118,16 +78,24 @@ def calculate_trend(data_points, window_size=7):
 # prediction_model = WildfirePredictionModel() # DEFER INSTANTIATION
 
 
-def analyze_historical_patterns(region):
-    """Analyze historical weather patterns for a region with enhanced metrics."""
+def analyze_historical_patterns(region, historical_data=None):
+    """
+    Analyze historical weather patterns for a region with enhanced metrics.
+
+    Args:
+        region: Region to analyze
+        historical_data: The region's observations of the past 90 days in
+            chronological order, if already loaded (see load_weather_history)
+    """
     try:
-        # Get historical weather data for the past 90 days
-        end_date = timezone.now()
-        start_date = end_date - timedelta(days=90)
+        if historical_data is None:
+            # Get historical weather data for the past 90 days
+            end_date = timezone.now()
+            start_date = end_date - timedelta(days=90)
 
-        historical_data = WeatherData.objects.filter(
-            region=region, timestamp__range=(start_date, end_date)
-        ).order_by("timestamp")
+            historical_data = WeatherData.objects.filter(
+                region=region, timestamp__range=(start_date, end_date)
+            ).order_by("timestamp")
 
         if not historical_data:
             logger.warning(f"No historical data found for region {region.name}")
@@ -141,10 +109,9 @@ def analyze_historical_patterns(region):
 
         # Calculate enhanced trends with error handling
         try:
-            temp_trends = calculate_trend(temperatures)
-            humidity_trends = calculate_trend(humidity_values)
-            wind_trends = calculate_trend(wind_speeds)
-            precip_trends = calculate_trend(precipitation_values)
+            temp_trends, humidity_trends, wind_trends, precip_trends = calculate_trends(
+                [temperatures, humidity_values, wind_speeds, precipitation_values]
+            )
         except Exception as e:
             logger.error(f"Error calculating trends: {str(e)}")
             temp_trends = humidity_trends = wind_trends = precip_trends = {
@@ -278,114 +245,51 @@ def get_season(month):
         return "autumn"
 
 
-def calculate_wildfire_risk(weather_data, historical_data=None):
-    """Calculate wildfire risk based on weather data and historical patterns."""
-    try:
-        # Initialize risk factors
-        risk_factors = {
-            "temperature_risk": 0,
-            "humidity_risk": 0,
-            "wind_risk": 0,
-            "precipitation_risk": 0,
-            "historical_risk": 0,
-            "environmental_risk": 0,
-        }
+def calculate_wildfire_risk(weather_data, historical_data=None, region=None):
+    """
+    Calculate wildfire risk based on weather data and historical patterns.
 
-        # Calculate temperature risk (adjusted for Moroccan climate)
+    Scores a single observation with the risk pipeline (see score_batch);
+    the region, when given, adds its soil, vegetation and climate factors.
+    """
+    try:
         temp = float(getattr(weather_data, "temperature", 0))
-        if temp > 35:  # Very hot
-            risk_factors["temperature_risk"] = 1.0
-        elif temp > 30:  # Hot
-            risk_factors["temperature_risk"] = 0.8
-        elif temp > 25:  # Warm
-            risk_factors["temperature_risk"] = 0.6
-        elif temp > 20:  # Mild
-            risk_factors["temperature_risk"] = 0.4
-        else:  # Cool
-            risk_factors["temperature_risk"] = 0.2
-
-        # Calculate humidity risk
         humidity = float(getattr(weather_data, "humidity", 0))
-        if humidity < 20:  # Very dry
-            risk_factors["humidity_risk"] = 1.0
-        elif humidity < 30:  # Dry
-            risk_factors["humidity_risk"] = 0.8
-        elif humidity < 40:  # Moderate
-            risk_factors["humidity_risk"] = 0.6
-        elif humidity < 50:  # Humid
-            risk_factors["humidity_risk"] = 0.4
-        else:  # Very humid
-            risk_factors["humidity_risk"] = 0.2
-
-        # Calculate wind risk
         wind_speed = float(getattr(weather_data, "wind_speed", 0))
-        if wind_speed > 40:  # Very strong winds
-            risk_factors["wind_risk"] = 1.0
-        elif wind_speed > 30:  # Strong winds
-            risk_factors["wind_risk"] = 0.8
-        elif wind_speed > 20:  # Moderate winds
-            risk_factors["wind_risk"] = 0.6
-        elif wind_speed > 10:  # Light winds
-            risk_factors["wind_risk"] = 0.4
-        else:  # Very light winds
-            risk_factors["wind_risk"] = 0.2
-
-        # Calculate precipitation risk
         precipitation = float(getattr(weather_data, "precipitation", 0))
-        if precipitation == 0 and temp > 30:  # No rain and hot
-            risk_factors["precipitation_risk"] = 1.0
-        elif precipitation == 0:  # No rain but cooler
-            risk_factors["precipitation_risk"] = 0.8
-        elif precipitation < 2:  # Very light rain
-            risk_factors["precipitation_risk"] = 0.6
-        elif precipitation < 5:  # Light rain
-            risk_factors["precipitation_risk"] = 0.4
-        else:  # Significant rain
-            risk_factors["precipitation_risk"] = 0.2
 
         # Calculate historical risk if data is available
         if historical_data:
-            risk_factors["historical_risk"] = float(
-                calculate_historical_risk(historical_data)
-            )
+            historical_risk = float(calculate_historical_risk(historical_data))
         else:
-            risk_factors["historical_risk"] = 0.5  # Default moderate risk
-
-        # Calculate environmental risk with adjusted weights
-        risk_factors["environmental_risk"] = float(
-            risk_factors["temperature_risk"] * 0.25  # Temperature is important
-            + risk_factors["humidity_risk"] * 0.25  # Humidity is equally important
-            + risk_factors["wind_risk"] * 0.2  # Wind has significant impact
-            + risk_factors["precipitation_risk"] * 0.2  # Precipitation is important
-            + risk_factors["historical_risk"]
-            * 0.1  # Historical patterns have some influence
+            historical_risk = 0.5  # Default moderate risk
+
+        scores = score_batch(
+            [temp],
+            [humidity],
+            [wind_speed],
+            [precipitation],
+            [historical_risk],
+            regions=[region] if region is not None else None,
+            cache=False,
         )
 
-        # Determine risk level based on environmental risk score
-        if risk_factors["environmental_risk"] >= 0.7:  # High risk threshold
-            risk_level = WildfirePrediction.HIGH_RISK
-        elif risk_factors["environmental_risk"] >= 0.5:  # Medium risk threshold
-            risk_level = WildfirePrediction.MEDIUM_RISK
-        else:
-            risk_level = WildfirePrediction.LOW_RISK
-
-        # Calculate confidence based on the strength of the risk factors
-        confidence = min(100, max(50, int(risk_factors["environmental_risk"] * 100)))
-
         # Ensure all values are JSON serializable
         features_used = {
             "current_weather": {
-                "temperature": float(temp),
-                "humidity": float(humidity),
-                "wind_speed": float(wind_speed),
-                "precipitation": float(precipitation),
+                "temperature": temp,
+                "humidity": humidity,
+                "wind_speed": wind_speed,
+                "precipitation": precipitation,
+            },
+            "risk_factors": {
+                name: float(scores[name][0]) for name in RISK_FACTOR_NAMES
             },
-            "risk_factors": {k: float(v) for k, v in risk_factors.items()},
         }
 
         return {
-            "risk_level": risk_level,
-            "confidence": confidence,
+            "risk_level": str(scores["risk_level"][0]),
+            "confidence": int(scores["confidence"][0]),
             "features_used": features_used,
         }
 
@@ -404,56 +308,13 @@ def get_risk_color(risk_level):
     return color_map.get(risk_level, "secondary")
 
 
-def calculate_historical_risk(historical_data):
-    """Calculate historical risk based on past wildfire patterns."""
-    try:
-        if not historical_data:
-            return 0.5  # Default moderate risk if no historical data
-
-        # Extract temperature data from historical data
-        temperature_data = historical_data.get("temperature", {})
-        if not temperature_data:
-            return 0.5
-
-        # Get trend data
-        temp_trends = temperature_data.get("trends", {})
-        if not temp_trends:
-            return 0.5
-
-        # Calculate risk based on trend metrics
-        linear_trend = temp_trends.get("linear_trend", 0)
-        r_squared = temp_trends.get("r_squared", 0)
-        volatility = temp_trends.get("volatility", 0)
-        seasonality = temp_trends.get("seasonality", 0)
-
-        # Weight the different trend factors
-        trend_score = (
-            abs(linear_trend) * 0.4  # Linear trend (positive or negative)
-            + r_squared * 0.3  # How well the trend fits
-            + min(volatility, 1.0) * 0.2  # Volatility (capped at 1.0)
-            + abs(seasonality) * 0.1  # Seasonal patterns
-        )
-
-        # Normalize trend score to 0-1 range
-        normalized_score = min(max(trend_score, 0), 1)
-
-        # Map to risk levels
-        if normalized_score > 0.7:
-            return 0.8  # High historical risk
-        elif normalized_score > 0.4:
-            return 0.6  # Moderate historical risk
-        elif normalized_score > 0.2:
-            return 0.4  # Slightly elevated historical risk
-        else:
-            return 0.2  # Low historical risk
-
-    except Exception as e:
-        logger.error(f"Error calculating historical risk: {str(e)}")
-        return 0.5  # Default to moderate risk on error
-
+def generate_prediction_explanation(prediction, language=None):
+    """
+    Generate a human-readable explanation for a wildfire prediction.
 
-def generate_prediction_explanation(prediction):
-    """Generate a human-readable explanation for a wildfire prediction."""
+    Explanations are memoized on the bucketed inputs (see
+    apps.predictions.explanations).
+    """
     try:
         # Get current weather data from features_used
         features = prediction.features_used
@@ -461,109 +322,25 @@ def generate_prediction_explanation(prediction):
             features = json.loads(features)
 
         current_weather = features.get("current_weather", {})
-        temperature = round(current_weather.get("temperature", 0))
-        humidity = round(current_weather.get("humidity", 0))
-        wind_speed = round(current_weather.get("wind_speed", 0))
-        precipitation = round(current_weather.get("precipitation", 0))
-
-        # Get region-specific information
         region = prediction.region
-        region_name = region.name
-        region_type = getattr(region, "type", "region")
-        soil_type = str(getattr(region, "soil_type", "Unknown"))
-        vegetation_density = getattr(region, "vegetation_density", "moderate")
-        climate_zone = getattr(region, "climate_zone", "temperate")
-
-        # Get current season for context
-        season = get_current_season()
-
-        # Create region-specific context with more detail
-        region_context = f"The {region_name} region, characterized by its {soil_type.lower()} soil and {vegetation_density} vegetation density in a {climate_zone} climate zone, "
-
-        # Build detailed weather conditions explanation
-        weather_conditions = []
-
-        # Temperature explanation with seasonal context
-        if temperature > 30:
-            weather_conditions.append(
-                f"is experiencing significantly high temperatures of {temperature}°C, which is {'typical' if season in ['summer'] else 'unusually high'} for this {season} season and significantly increases the risk of vegetation drying out"
-            )
-        elif temperature > 25:
-            weather_conditions.append(
-                f"has elevated temperatures of {temperature}°C, which is {'as expected' if season in ['summer', 'spring'] else 'above average'} for this {season} season"
-            )
-        elif temperature > 20:
-            weather_conditions.append(
-                f"has moderate temperatures of {temperature}°C, providing {'favorable' if season in ['spring', 'autumn'] else 'relatively safe'} conditions"
-            )
-        else:
-            weather_conditions.append(
-                f"has cool temperatures of {temperature}°C, which is {'typical' if season in ['winter', 'autumn'] else 'unusually low'} for this {season} season"
-            )
-
-        # Humidity explanation with soil context
-        if humidity < 30:
-            weather_conditions.append(
-                f"Humidity is critically low at {humidity}%, which is particularly concerning given the {soil_type.lower()} soil's moisture retention capacity and could lead to rapid drying of vegetation"
-            )
-        elif humidity < 40:
-            weather_conditions.append(
-                f"Humidity is low at {humidity}%, creating dry conditions that are {'especially risky' if soil_type == 'Sandy' else 'moderately concerning'} given the soil composition"
-            )
-        elif humidity < 60:
-            weather_conditions.append(
-                f"Humidity is moderate at {humidity}%, helping maintain {'some' if soil_type == 'Clay' else 'adequate'} moisture in the soil and vegetation"
-            )
-        else:
-            weather_conditions.append(
-                f"Humidity is high at {humidity}%, which helps preserve moisture in the {soil_type.lower()} soil and reduces fire risk"
-            )
-
-        # Wind explanation with vegetation context
-        if wind_speed > 30:
-            weather_conditions.append(
-                f"Strong winds of {wind_speed} km/h pose a significant risk, particularly in areas with {vegetation_density} vegetation where fire could spread rapidly"
-            )
-        elif wind_speed > 20:
-            weather_conditions.append(
-                f"Moderate to strong winds of {wind_speed} km/h, combined with the {vegetation_density} vegetation, could facilitate fire spread if ignition occurs"
-            )
-        elif wind_speed > 10:
-            weather_conditions.append(
-                f"Moderate winds of {wind_speed} km/h are present, with {'increased' if vegetation_density == 'dense' else 'moderate'} potential for fire spread through the {vegetation_density} vegetation"
-            )
-        else:
-            weather_conditions.append(
-                f"Calm winds of {wind_speed} km/h provide favorable conditions, though the {vegetation_density} vegetation could still support fire spread if other risk factors are present"
-            )
-
-        # Precipitation explanation with climate context
-        if precipitation == 0:
-            weather_conditions.append(
-                f"There is no precipitation, which is {'particularly concerning' if climate_zone in ['mediterranean', 'semi_arid'] else 'concerning'} for this {climate_zone} climate zone and increases fire risk"
-            )
-        elif precipitation < 5:
-            weather_conditions.append(
-                f"Minimal precipitation of {precipitation}mm provides limited moisture, which is {'typical' if climate_zone == 'semi_arid' else 'below average'} for this {climate_zone} region"
-            )
-        elif precipitation < 10:
-            weather_conditions.append(
-                f"Low precipitation of {precipitation}mm helps reduce fire risk, though it {'may be insufficient' if climate_zone in ['mediterranean', 'semi_arid'] else 'provides moderate protection'} in this climate"
-            )
-        else:
-            weather_conditions.append(
-                f"Significant precipitation of {precipitation}mm provides good protection against fire risk, which is {'especially beneficial' if climate_zone in ['mediterranean', 'semi_arid'] else 'maintaining normal moisture levels'} for this {climate_zone} region"
-            )
-
-        # Combine all explanations with proper punctuation
-        weather_text = ". ".join(weather_conditions)
-        explanation = f"{region_context}{weather_text}."
-
-        return explanation
+        soil_type = getattr(region, "soil_type", None)
+
+        return explanations.explain(
+            explanations.resolve_language(language),
+            region.name,
+            str(soil_type) if soil_type is not None else "Unknown",
+            explanations.vegetation_bucket(getattr(region, "vegetation_density", None)),
+            getattr(region, "climate_zone", "temperate"),
+            get_current_season(),
+            round(current_weather.get("temperature", 0)),
+            round(current_weather.get("humidity", 0)),
+            round(current_weather.get("wind_speed", 0)),
+            round(current_weather.get("precipitation", 0)),
+        )
 
     except Exception as e:
         logger.error(f"Error generating prediction explanation: {str(e)}")
-        return f"Unable to generate detailed explanation for {prediction.region.name}."
+        return explanations.unavailable(prediction.region.name, language)
 
 
 def get_current_season():
@@ -579,7 +356,20 @@ def get_current_season():
         return "autumn"
 
 
-class PredictionViewSet(viewsets.ModelViewSet):
+class PredictionViewSet(mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    Current predictions, stored prediction history and scoring actions.
+
+    Stored predictions are read-only through this viewset: they are written
+    by the scoring actions, never by generic create/update/delete routes.
+    """
+
+    queryset = WildfirePrediction.objects.all()
+    serializer_class = WildfirePredictionSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [RegionTimeRangeFilter]
+    time_field = "prediction_date"
+
     @action(detail=False, methods=["post"])
     def predict_for_region(self, request):
         region_id = request.data.get("region_id")
@@ -589,7 +379,7 @@ class PredictionViewSet(viewsets.ModelViewSet):
             )
 
         try:
-            region = Region.objects.get(id=region_id)
+            region = Region.objects.select_related("soil_type").get(id=region_id)
         except Region.DoesNotExist:
             return Response(
                 {"error": "Region not found"}, status=status.HTTP_404_NOT_FOUND
@@ -615,15 +405,17 @@ class PredictionViewSet(viewsets.ModelViewSet):
             )
 
         # Calculate risk
-        risk_prediction = calculate_wildfire_risk(current_weather, historical_patterns)
+        risk_prediction = calculate_wildfire_risk(
+            current_weather, historical_patterns, region
+        )
         if not risk_prediction:
             return Response(
                 {"error": "Could not calculate risk prediction"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-        # Create prediction record
-        prediction = WildfirePrediction.objects.create(
+        # Create prediction record and update the region's snapshot
+        prediction = WildfirePrediction(
             region=region,
             prediction_date=timezone.now(),
             risk_level=risk_prediction["risk_level"],
@@ -631,57 +423,185 @@ class PredictionViewSet(viewsets.ModelViewSet):
             features_used=risk_prediction["features_used"],
             model_version="1.0",
         )
+        explanation = generate_prediction_explanation(prediction)
+        record_predictions([prediction], [explanation])
 
         return Response(
             {
                 "prediction_id": prediction.id,
                 "risk_level": prediction.get_risk_level_display(),
                 "confidence": prediction.confidence,
-                "explanation": generate_prediction_explanation(prediction),
+                "explanation": explanation,
             }
         )
 
-    def list(self, request, *args, **kwargs):
-        try:
-            # Get all regions
-            regions = Region.objects.all()
-            predictions = []
+    @action(
+        detail=False,
+        methods=["post"],
+        renderer_classes=api_settings.DEFAULT_RENDERER_CLASSES + [NDJSONRenderer],
+    )
+    def predict_batch(self, request):
+        """
+        Score many regions and/or raw coordinates in one request.
+
+        Accepts ``region_ids`` (list of region IDs) and ``points`` (list of
+        ``{"latitude": ..., "longitude": ...}``); points are scored with the
+        weather of their nearest region. Set ``persist`` to record the results
+        as predictions. Responds with NDJSON when requested via
+        ``?format=ndjson`` or an ``application/x-ndjson`` Accept header.
+        """
+        region_ids = request.data.get("region_ids", [])
+        points = request.data.get("points", [])
 
-            for region in regions:
-                # Get current weather data
-                current_weather = fetch_current_weather(region)
+        try:
+            region_ids = [int(region_id) for region_id in region_ids]
+            points = [parse_point(point) for point in points]
+        except (TypeError, ValueError, KeyError):
+            return Response(
+                {
+                    "error": "region_ids must be a list of IDs and points a list "
+                    "of latitude/longitude pairs"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-                # Get historical patterns
-                historical_patterns = analyze_historical_patterns(region)
+        if not region_ids and not points:
+            return Response(
+                {"error": "region_ids or points are required"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if len(region_ids) + len(points) > settings.PREDICTION_BATCH_MAX_ITEMS:
+            return Response(
+                {
+                    "error": f"At most {settings.PREDICTION_BATCH_MAX_ITEMS} "
+                    "regions and points can be scored per request"
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-                # Calculate risk
-                risk_prediction = calculate_wildfire_risk(
-                    current_weather, historical_patterns
+        matches = []
+        if points:
+            matches = nearest_regions(points)
+            if None in matches:
+                return Response(
+                    {"error": "No region to match points to"},
+                    status=status.HTTP_404_NOT_FOUND,
                 )
 
-                if not risk_prediction:
-                    continue
+        requested_ids = set(region_ids) | {region.pk for region, _ in matches}
+        regions, results = predict_regions(requested_ids)
 
-                # Create a WildfirePrediction object for explanation
-                prediction_obj = WildfirePrediction(
-                    region=region,
-                    risk_level=risk_prediction["risk_level"],
-                    confidence=risk_prediction["confidence"],
-                    risk_factors=risk_prediction.get("risk_factors", {}),
+        items = [batch_item(region_id, regions, results) for region_id in region_ids]
+        for (latitude, longitude), (region, distance) in zip(points, matches):
+            item = batch_item(region.pk, regions, results)
+            item.update(
+                {
+                    "latitude": latitude,
+                    "longitude": longitude,
+                    "distance_km": round(distance, 3),
+                }
+            )
+            items.append(item)
+
+        if str(request.data.get("persist", "")).lower() in ("true", "1"):
+            now = timezone.now()
+            predictions = [
+                WildfirePrediction(
+                    region=regions[region_id],
+                    prediction_date=now,
+                    risk_level=result["risk_level"],
+                    confidence=result["confidence"],
+                    features_used=result["features_used"],
+                    model_version="1.0",
                 )
+                for region_id, result in results.items()
+            ]
+            record_predictions(
+                predictions,
+                [generate_prediction_explanation(p) for p in predictions],
+            )
 
-                predictions.append(
-                    {
-                        "region": RegionSerializer(region).data,
-                        "risk_level": risk_prediction["risk_level"],
-                        "confidence": risk_prediction["confidence"],
-                        "risk_color": get_risk_color(risk_prediction["risk_level"]),
-                        "explanation": generate_prediction_explanation(prediction_obj),
-                        "timestamp": timezone.now().strftime("%Y-%m-%d %H:%M:%S"),
-                    }
-                )
+        if request.accepted_renderer.format == NDJSONRenderer.format:
+            return streaming_response(
+                request,
+                (json.dumps(item) + "\n" for item in items),
+                content_type="application/x-ndjson",
+            )
+
+        return Response({"count": len(items), "results": items})
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[
+            NDJSONRenderer,
+            CSVRenderer,
+            ParquetRenderer,
+            MessagePackRenderer,
+            ArrowRenderer,
+        ],
+    )
+    def export(self, request):
+        """
+        Stream the prediction history as NDJSON, CSV, Parquet, MessagePack
+        or Arrow.
+
+        Optional filters: region_id, start and end (ISO dates or datetimes).
+        """
+        return export_response(request, "predictions")
+
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=api_settings.DEFAULT_RENDERER_CLASSES
+        + [MessagePackRenderer, ArrowRenderer],
+    )
+    def history(self, request):
+        """
+        List stored predictions newest first with keyset pagination.
+
+        Optional filters: region_id, start and end (ISO dates or datetimes).
+        With ``?format=msgpack`` or ``?format=arrow`` (or the matching Accept
+        header) each page is sent as typed columns instead of JSON objects.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        if request.accepted_renderer.format in columnar.FORMATS:
+            return columnar.paginated_columns(self, queryset, EXPORTS["predictions"][2])
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    def list(self, request, *args, **kwargs):
+        """
+        Current prediction of every region.
+
+        Supports ETag/Last-Modified revalidation: when every snapshot is
+        fresh and the client's copy is current, a 304 is returned after a
+        single aggregate query.
+        """
+        max_age = settings.PREDICTION_CACHE_MAX_AGE
+        version = snapshot_version()
+        if version["fresh"]:
+            response = not_modified(
+                request, version["etag"], version["last_modified"], max_age
+            )
+            if response is not None:
+                return response
 
-            return Response(predictions)
+        try:
+            regions = list(current_regions())
+            snapshots = get_current_snapshots(regions)
+            predictions = prediction_list_items(regions, snapshots)
+
+            if not version["fresh"]:
+                # Stale snapshots were just refreshed
+                version = snapshot_version()
+            return set_validators(
+                Response(predictions),
+                version["etag"],
+                version["last_modified"],
+                max_age,
+            )
         except Exception as e:
             logger.error(f"Error in prediction list: {str(e)}")
             return Response(
@@ -734,7 +654,7 @@ class PredictionViewSet(viewsets.ModelViewSet):
 
                     # Calculate wildfire risk
                     risk_prediction = calculate_wildfire_risk(
-                        current_weather, historical_patterns
+                        current_weather, historical_patterns, region
                     )
 
                     if not risk_prediction:
@@ -872,90 +792,328 @@ def generate_test_weather_data():
             logger.info(f"Region {region.name} already has recent weather data")
 
 
-def dashboard(request):
-    """Render the predictions dashboard with current predictions for all regions."""
-    regions = Region.objects.all()
-    logger.info(f"Found {regions.count()} regions")
+def parse_point(point):
+    """Parse a ``{"latitude", "longitude"}`` mapping or a pair into a tuple."""
+    if isinstance(point, dict):
+        latitude, longitude = point["latitude"], point["longitude"]
+    else:
+        latitude, longitude = point
+    latitude, longitude = float(latitude), float(longitude)
+    if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+        raise ValueError("Coordinates out of range")
+    return latitude, longitude
 
-    predictions = []
 
+def batch_item(region_id, regions, results):
+    """Build the response entry of one region in a batch prediction."""
+    if region_id not in regions:
+        return {"region_id": region_id, "error": "Region not found"}
+
+    result = results.get(region_id)
+    if result is None:
+        return {
+            "region_id": region_id,
+            "region_name": regions[region_id].name,
+            "error": "No weather data available for the region",
+        }
+
+    return {
+        "region_id": region_id,
+        "region_name": regions[region_id].name,
+        "risk_level": result["risk_level"],
+        "risk_level_display": dict(WildfirePrediction.RISK_CHOICES)[
+            result["risk_level"]
+        ],
+        "risk_color": get_risk_color(result["risk_level"]),
+        "confidence": result["confidence"],
+        "risk_factors": result["features_used"]["risk_factors"],
+        "weather_timestamp": result["weather"].timestamp.isoformat(),
+    }
+
+
+def refresh_predictions(regions):
+    """
+    Fetch current weather, score and record fresh predictions for regions.
+
+    Returns:
+        Dictionary mapping region id to the updated PredictionSnapshot
+    """
+    observations = []
     for region in regions:
-        try:
-            logger.info(f"Processing region: {region.name}")
-
-            # Get current weather data from OpenWeatherMap API
-            current_weather = fetch_current_weather(region)
-
-            if not current_weather:
-                logger.warning(f"No weather data found for region {region.name}")
-                predictions.append(
-                    {
-                        "region": region,
-                        "risk_level": None,
-                        "risk_color": "secondary",
-                        "major_forests": [],
-                    }
-                )
-                continue
+        logger.info(f"Processing region: {region.name}")
 
-            # Round the weather values to whole numbers
-            current_weather.temperature = round(current_weather.temperature)
-            current_weather.humidity = round(current_weather.humidity)
-            current_weather.wind_speed = round(current_weather.wind_speed)
-            current_weather.precipitation = round(current_weather.precipitation)
-            current_weather.pressure = round(current_weather.pressure)
+        # Get current weather data from OpenWeatherMap API
+        observations.append((region, fetch_current_weather(region)))
 
-            # Get historical patterns
-            historical_patterns = analyze_historical_patterns(region)
+    metrics.record_ingest_cycle(sum(1 for _, weather in observations if weather))
+    return score_and_record(observations)
 
-            # Calculate wildfire risk
-            risk_prediction = calculate_wildfire_risk(
-                current_weather, historical_patterns
-            )
 
-            if not risk_prediction:
-                logger.error(f"Could not calculate risk for region {region.name}")
-                continue
+async def arefresh_predictions(regions):
+    """
+    Async version of refresh_predictions.
+
+    Weather for all regions is fetched concurrently over one pooled HTTP
+    client; scoring and recording then run in a worker thread.
+    """
+    async with async_http_client() as client:
+        weather = await asyncio.gather(
+            *(afetch_current_weather(region, client) for region in regions)
+        )
+
+    metrics.record_ingest_cycle(sum(1 for observation in weather if observation))
+    return await sync_to_async(score_and_record)(list(zip(regions, weather)))
+
+
+def score_and_record(observations):
+    """
+    Score current weather observations and record the resulting predictions.
+
+    All observed regions are scored in one pass through the risk pipeline.
+
+    Args:
+        observations: List of (region, WeatherData or None) tuples
+
+    Returns:
+        Dictionary mapping region id to the updated PredictionSnapshot
+    """
+    observed = []
+    for region, current_weather in observations:
+        if not current_weather:
+            logger.warning(f"No weather data found for region {region.name}")
+            continue
+
+        # Round the weather values to whole numbers
+        current_weather.temperature = round(current_weather.temperature)
+        current_weather.humidity = round(current_weather.humidity)
+        current_weather.wind_speed = round(current_weather.wind_speed)
+        current_weather.precipitation = round(current_weather.precipitation)
+        current_weather.pressure = round(current_weather.pressure)
+        observed.append((region, current_weather))
+
+    if not observed:
+        return {}
 
-            # Create prediction record
-            prediction = WildfirePrediction.objects.create(
+    history = load_weather_history([region.pk for region, _ in observed])
+    try:
+        scores = score_batch(
+            [weather.temperature for _, weather in observed],
+            [weather.humidity for _, weather in observed],
+            [weather.wind_speed for _, weather in observed],
+            [weather.precipitation for _, weather in observed],
+            regions=[region for region, _ in observed],
+            temperature_history=[
+                [data.temperature for data in history.get(region.pk, [])]
+                for region, _ in observed
+            ],
+        )
+    except Exception as e:
+        logger.error(f"Error calculating wildfire risk: {str(e)}")
+        return {}
+
+    predictions = []
+    explanations = []
+    for index, (region, current_weather) in enumerate(observed):
+        try:
+            prediction = WildfirePrediction(
                 region=region,
                 prediction_date=timezone.now(),
-                risk_level=risk_prediction["risk_level"],
-                confidence=round(
-                    risk_prediction["confidence"]
-                ),  # Round confidence to whole number
-                features_used=risk_prediction["features_used"],
+                risk_level=str(scores["risk_level"][index]),
+                confidence=int(scores["confidence"][index]),
+                features_used={
+                    "current_weather": {
+                        "temperature": float(current_weather.temperature),
+                        "humidity": float(current_weather.humidity),
+                        "wind_speed": float(current_weather.wind_speed),
+                        "precipitation": float(current_weather.precipitation),
+                    },
+                    "risk_factors": {
+                        name: float(scores[name][index]) for name in RISK_FACTOR_NAMES
+                    },
+                },
                 model_version="1.0",
             )
-
-            # Get major forests for the region
-            major_forests = region.forests.all().order_by("-area")[
-                :3
-            ]  # Get top 3 largest forests
-
-            predictions.append(
-                {
-                    "region": region,
-                    "prediction": prediction,
-                    "risk_level": prediction.risk_level,
-                    "risk_level_display": prediction.get_risk_level_display(),
-                    "risk_color": get_risk_color(prediction.risk_level),
-                    "confidence": prediction.confidence,
-                    "timestamp": prediction.prediction_date.strftime("%Y-%m-%d %H:%M"),
-                    "explanation": generate_prediction_explanation(prediction),
-                    "major_forests": [forest.name for forest in major_forests],
-                }
-            )
+            predictions.append(prediction)
+            explanations.append(generate_prediction_explanation(prediction))
 
         except Exception as e:
             logger.error(f"Error processing region {region.name}: {str(e)}")
             continue
 
+    return record_predictions(predictions, explanations)
+
+
+def current_regions():
+    """
+    Regions with their snapshot and soil type, as read by the prediction views
+    and by refreshes (explanations mention the soil type).
+    """
+    return Region.objects.select_related("prediction_snapshot", "soil_type")
+
+
+def get_current_snapshots(regions):
+    """
+    Return the current snapshot of each region, refreshing stale ones.
+
+    Regions should be loaded with current_regions(). If a refresh fails, the
+    previous (stale) snapshot is kept.
+    """
+    snapshots, stale_regions = split_stale_snapshots(regions)
+    if stale_regions:
+        logger.info(f"Refreshing predictions for {len(stale_regions)} regions")
+        snapshots.update(refresh_predictions(stale_regions))
+
+    return snapshots
+
+
+async def aget_current_snapshots(regions):
+    """Async version of get_current_snapshots."""
+    snapshots, stale_regions = split_stale_snapshots(regions)
+    if stale_regions:
+        logger.info(f"Refreshing predictions for {len(stale_regions)} regions")
+        snapshots.update(await arefresh_predictions(stale_regions))
+
+    return snapshots
+
+
+def split_stale_snapshots(regions):
+    """
+    Split regions loaded with their snapshot into current snapshots and
+    regions whose snapshot is missing or stale.
+
+    Returns:
+        Tuple of (snapshots by region id, list of stale regions)
+    """
+    now = timezone.now()
+    snapshots = {}
+    stale_regions = []
+
+    for region in regions:
+        snapshot = get_region_snapshot(region)
+        if snapshot is not None:
+            snapshots[region.pk] = snapshot
+        if is_stale(snapshot, now):
+            stale_regions.append(region)
+
+    metrics.record_cache("prediction_snapshot", True, len(regions) - len(stale_regions))
+    metrics.record_cache("prediction_snapshot", False, len(stale_regions))
+    return snapshots, stale_regions
+
+
+def prediction_list_items(regions, snapshots):
+    """Build the prediction list API payload from region snapshots."""
+    predictions = []
+    for region in regions:
+        snapshot = snapshots.get(region.pk)
+        if snapshot is None:
+            continue
+
+        predictions.append(
+            {
+                "region": RegionSerializer(region).data,
+                "risk_level": snapshot.risk_level,
+                "confidence": snapshot.confidence,
+                "risk_color": get_risk_color(snapshot.risk_level),
+                "explanation": snapshot.explanation,
+                "timestamp": snapshot.prediction_date.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        )
+    return predictions
+
+
+def dashboard(request):
+    """Render the predictions dashboard with current predictions for all regions."""
+    regions = list(current_regions())
+    logger.info(f"Found {len(regions)} regions")
+
+    snapshots = get_current_snapshots(regions)
     return render(
         request,
         "predictions/dashboard.html",
         {
-            "regions": predictions,
+            "regions": dashboard_items(regions, snapshots),
         },
     )
+
+
+def dashboard_items(regions, snapshots):
+    """Build the dashboard rows of each region from its current snapshot."""
+    # Largest forests come from the region metadata cache
+    metadata = get_region_metadata()
+    predictions = []
+
+    for region in regions:
+        snapshot = snapshots.get(region.pk)
+
+        if snapshot is None:
+            predictions.append(
+                {
+                    "region": region,
+                    "risk_level": None,
+                    "risk_color": "secondary",
+                    "major_forests": [],
+                }
+            )
+            continue
+
+        predictions.append(
+            {
+                "region": region,
+                "prediction": snapshot,
+                "risk_level": snapshot.risk_level,
+                "risk_level_display": snapshot.get_risk_level_display(),
+                "risk_color": get_risk_color(snapshot.risk_level),
+                "confidence": snapshot.confidence,
+                "timestamp": snapshot.prediction_date.strftime("%Y-%m-%d %H:%M"),
+                "explanation": snapshot.explanation,
+                "major_forests": metadata.major_forests(region.pk),
+            }
+        )
+
+    return predictions
+
+
+@api_view(["GET"])
+@renderer_classes([GeoJSONRenderer, JSONRenderer])
+def risk_layer(request):
+    """
+    GeoJSON layer of every region and city with its current risk.
+
+    ``?bbox=west,south,east,north`` keeps the features inside a box and
+    ``?zoom=`` rounds coordinates to the map's resolution (and leaves cities
+    out below CITY_MIN_ZOOM). Snapshots are served as stored; the prediction
+    cycle keeps them fresh. Bodies are gzip or brotli encoded and revalidated
+    with an ETag of the snapshot and region metadata versions.
+    """
+    try:
+        bbox = request.query_params.get("bbox")
+        bbox = risklayer.parse_bbox(bbox) if bbox else None
+        zoom = request.query_params.get("zoom")
+        zoom = int(zoom) if zoom else None
+        if zoom is not None and not 0 <= zoom <= 24:
+            raise ValueError("zoom must be within [0, 24]")
+    except ValueError as e:
+        return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    version = snapshot_version()
+    encoding = negotiate_encoding(request)
+    # Each encoding is a separate representation with its own ETag
+    etag = make_etag(
+        "risk-layer",
+        version["etag"],
+        get_region_metadata().version,
+        bbox,
+        zoom,
+        encoding,
+    )
+    max_age = settings.PREDICTION_CACHE_MAX_AGE
+
+    response = not_modified(request, etag, version["last_modified"], max_age)
+    if response is None:
+        layer = risklayer.get_risk_layer(version["etag"])
+        body, content_encoding = layer.body(bbox, zoom, encoding)
+        response = HttpResponse(body, content_type="application/geo+json")
+        if content_encoding:
+            response["Content-Encoding"] = content_encoding
+    patch_vary_headers(response, ["Accept-Encoding"])
+    return set_validators(response, etag, version["last_modified"], max_age)
@@ -0,0 +1,110 @@
+"""
+Async versions of the I/O-bound weather views, routed in ASGI mode.
+
+They mirror the DRF actions in ``views.py`` but await the upstream weather
+API with httpx and use Django's async ORM, so a worker does not block on
+slow upstream calls.
+"""
+
+import logging
+
+import httpx
+from django.conf import settings
+from django.http import JsonResponse
+from django.utils import timezone
+
+from apps.core import metrics
+from apps.core.caching import not_modified, set_validators
+from apps.core.decorators import async_api_view
+from apps.core.instrumentation import record_upstream
+from apps.core.models import Region
+from .models import WeatherData
+from .serializers import WeatherDataSerializer
+from .views import (
+    observation_etag,
+    observation_values,
+    remaining_freshness,
+    weather_api_url,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@async_api_view
+async def fetch_current_weather(request):
+    """Async version of WeatherViewSet.fetch_current_weather."""
+    if request.method != "GET":
+        return JsonResponse(
+            {"detail": f'Method "{request.method}" not allowed.'}, status=405
+        )
+
+    region_id = request.GET.get("region_id")
+    if not region_id:
+        return JsonResponse({"error": "Region ID is required"}, status=400)
+    if not region_id.isdigit():
+        return JsonResponse({"error": "Region not found"}, status=404)
+
+    latest = (
+        await WeatherData.objects.filter(region_id=region_id)
+        .order_by("-timestamp")
+        .afirst()
+    )
+    max_age = remaining_freshness(latest)
+    metrics.record_cache("weather_observation", max_age > 0)
+    if max_age > 0:
+        etag = observation_etag(latest)
+        response = not_modified(request, etag, latest.timestamp, max_age)
+        if response is None:
+            response = JsonResponse(WeatherDataSerializer(latest).data)
+        return set_validators(response, etag, latest.timestamp, max_age)
+
+    region = await Region.objects.filter(pk=region_id).afirst()
+    if region is None:
+        return JsonResponse({"error": "Region not found"}, status=404)
+
+    api_key = settings.WEATHER_API_KEY
+    if not api_key:
+        logger.error("Weather API key is not configured.")
+        return JsonResponse(
+            {"error": "Weather service configuration error"}, status=500
+        )
+
+    data = None
+    try:
+        async with httpx.AsyncClient(timeout=settings.WEATHER_HTTP_TIMEOUT) as client:
+            with record_upstream("openweathermap"):
+                response = await client.get(weather_api_url(region, api_key))
+                response.raise_for_status()
+        data = response.json()
+
+        values = observation_values(data)
+        if values is None:
+            logger.error(f"Incomplete weather data received from API: {data}")
+            return JsonResponse(
+                {"error": "Incomplete data from weather service"}, status=500
+            )
+
+        weather_data = await WeatherData.objects.acreate(
+            region=region, timestamp=timezone.now(), **values
+        )
+
+        return set_validators(
+            JsonResponse(WeatherDataSerializer(weather_data).data),
+            observation_etag(weather_data),
+            weather_data.timestamp,
+            settings.WEATHER_OBSERVATION_MAX_AGE,
+        )
+
+    except httpx.HTTPError as e:
+        logger.error(f"Error fetching weather data from API: {e}")
+        return JsonResponse(
+            {"error": "Could not connect to weather service"}, status=503
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        logger.error(f"Error processing weather data: {e} - Data: {data}")
+        return JsonResponse({"error": "Error processing weather data"}, status=500)
+    except Exception:
+        logger.exception(
+            f"An unexpected error occurred while fetching weather data for region {region_id}"
+        )
+        return JsonResponse({"error": "An unexpected error occurred"}, status=500)
@@ -0,0 +1,70 @@
+"""
+Benchmarks of weather history encodings.
+
+Run with ``python manage.py benchmark -k weather``. Inputs are synthetic and
+seeded, so every run times the same work.
+"""
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+import numpy as np
+from rest_framework.renderers import JSONRenderer
+
+from apps.core import columnar
+from apps.core.benchmarking import benchmark
+from apps.core.exports import EXPORTS
+from apps.core.models import Region
+from .models import WeatherData
+from .serializers import WeatherDataSerializer
+
+SEED = 1337
+
+# Rows of a history page (the keyset paginator's max_page_size)
+PAGE_ROWS = 1000
+
+
+def seed_weather(count=PAGE_ROWS):
+    """Replace all regions with one holding ``count`` hourly observations."""
+    rng = np.random.default_rng(SEED)
+    Region.objects.all().delete()
+    region = Region.objects.create(
+        name="Benchmark Region",
+        latitude=33.5,
+        longitude=-7.6,
+        elevation=400,
+        area=1200,
+        population=50000,
+    )
+    start = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+    WeatherData.objects.bulk_create(
+        [
+            WeatherData(
+                region=region,
+                timestamp=start + timedelta(hours=hour),
+                temperature=float(rng.normal(25, 5)),
+                humidity=float(rng.uniform(10, 90)),
+                wind_speed=float(rng.gamma(2, 3)),
+                wind_direction=float(rng.uniform(0, 360)),
+                precipitation=float(rng.exponential(0.5)),
+                pressure=float(rng.normal(1013, 5)),
+            )
+            for hour in range(count)
+        ]
+    )
+    return WeatherData.objects.filter(region=region).order_by("-timestamp", "-pk")
+
+
+@benchmark("weather.history_page", params=["json", "msgpack"])
+def bench_history_page(encoding):
+    # Query and encode one page: ModelSerializer + JSON, or values_list columns
+    queryset = seed_weather()
+    fields = EXPORTS["weather"][2]
+    if encoding == "json":
+        return lambda: JSONRenderer().render(
+            WeatherDataSerializer(queryset[:PAGE_ROWS], many=True).data
+        )
+    return lambda: columnar.packb(
+        columnar.Columns.from_rows(
+            queryset.values_list(*fields)[:PAGE_ROWS], fields, WeatherData
+        )
+    )
@@ -0,0 +1,111 @@
+"""
+Fake OpenWeatherMap current weather API for load tests and local runs.
+
+Responses have the shape of the real ``/data/2.5/weather`` endpoint and are
+derived from the coordinates and the current hour, so the same location gets
+stable weather while different regions get different risk levels. Latency
+and an error rate can be injected to see how the app behaves when the
+provider is slow or failing.
+"""
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+API_PATH = "/data/2.5/weather"
+
+
+def fake_current_weather(latitude, longitude, when=None):
+    """OpenWeatherMap-style payload for a location at the hour of ``when``."""
+    when = when or timezone.now()
+    rng = random.Random(zlib.crc32(f"{latitude:.3f},{longitude:.3f}".encode()))
+    hour_angle = 2 * math.pi * (when.hour - 15) / 24
+    dryness = rng.random()
+
+    temperature = 18 + 14 * dryness + 6 * math.cos(hour_angle)
+    rain = 0 if dryness > 0.4 else round(rng.uniform(0, 6), 1)
+    return {
+        "coord": {"lat": latitude, "lon": longitude},
+        "main": {
+            "temp": round(temperature, 1),
+            "humidity": round(75 - 60 * dryness),
+            "pressure": round(1005 + 15 * rng.random()),
+        },
+        "wind": {"speed": round(rng.uniform(1, 45), 1), "deg": rng.randrange(360)},
+        "rain": {"1h": rain},
+        "dt": int(when.timestamp()),
+        "name": "Fake weather station",
+    }
+
+
+class FakeWeatherHandler(BaseHTTPRequestHandler):
+    latency = 0.0
+    error_rate = 0.0
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != API_PATH:
+            self.send_json(404, {"cod": "404", "message": "Not found"})
+            return
+
+        if self.latency:
+            time.sleep(self.latency)
+        if self.error_rate and random.random() < self.error_rate:
+            self.send_json(503, {"cod": "503", "message": "Injected failure"})
+            return
+
+        query = parse_qs(url.query)
+        try:
+            latitude = float(query["lat"][0])
+            longitude = float(query["lon"][0])
+        except (KeyError, ValueError):
+            self.send_json(400, {"cod": "400", "message": "Nothing to geocode"})
+            return
+        self.send_json(200, fake_current_weather(latitude, longitude))
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Fake weather provider: {format % args}")
+
+
+def make_server(host="127.0.0.1", port=0, latency=0.0, error_rate=0.0):
+    """
+    Create the fake provider server (port 0 picks a free port).
+
+    Args:
+        latency: Seconds to wait before answering each call
+        error_rate: Fraction of calls answered with a 503
+    """
+    handler = type(
+        "ConfiguredFakeWeatherHandler",
+        (FakeWeatherHandler,),
+        {"latency": latency, "error_rate": error_rate},
+    )
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def start_in_thread(**kwargs):
+    """Serve the fake provider from a daemon thread; returns (server, API URL)."""
+    server = make_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}{API_PATH}"
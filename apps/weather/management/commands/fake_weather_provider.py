@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from apps.weather.fake_provider import API_PATH, make_server
+
+
+class Command(BaseCommand):
+    help = "Serve a fake OpenWeatherMap current weather API for local runs"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8081)
+        parser.add_argument(
+            "--latency-ms", type=float, default=0, help="Delay of every response"
+        )
+        parser.add_argument(
+            "--error-rate",
+            type=float,
+            default=0,
+            help="Fraction of calls answered with a 503",
+        )
+
+    def handle(self, *args, **options):
+        server = make_server(
+            options["host"],
+            options["port"],
+            latency=options["latency_ms"] / 1000,
+            error_rate=options["error_rate"],
+        )
+        host, port = server.server_address[:2]
+        self.stdout.write(
+            f"Serving fake weather at http://{host}:{port}{API_PATH}\n"
+            "Set OPENWEATHERMAP_API_URL and WEATHER_API_URL to this URL."
+        )
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
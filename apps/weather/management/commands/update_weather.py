@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.weather.services import update_weather_data
+
+
+class Command(BaseCommand):
+    help = "Fetch current weather for all regions and push it to live clients"
+
+    def handle(self, *args, **options):
+        stored = update_weather_data()
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} observations"))
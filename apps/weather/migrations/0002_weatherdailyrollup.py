@@ -0,0 +1,42 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_merge_20250404_1643'),
+        ('weather', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeatherDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('sample_count', models.PositiveIntegerField(help_text='Number of raw observations aggregated into this rollup')),
+                ('temperature_avg', models.FloatField(help_text='Mean temperature in Celsius')),
+                ('temperature_min', models.FloatField(help_text='Minimum temperature in Celsius')),
+                ('temperature_max', models.FloatField(help_text='Maximum temperature in Celsius')),
+                ('humidity_avg', models.FloatField(help_text='Mean relative humidity in percentage')),
+                ('humidity_min', models.FloatField(help_text='Minimum relative humidity in percentage')),
+                ('wind_speed_avg', models.FloatField(help_text='Mean wind speed in meters per second')),
+                ('wind_speed_max', models.FloatField(help_text='Maximum wind speed in meters per second')),
+                ('precipitation_total', models.FloatField(help_text='Total precipitation in millimeters')),
+                ('pressure_avg', models.FloatField(help_text='Mean atmospheric pressure in hPa')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('region', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='core.region')),
+            ],
+            options={
+                'ordering': ['-date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='weatherdailyrollup',
+            constraint=models.UniqueConstraint(fields=('region', 'date'), name='weather_rollup_region_date_uniq'),
+        ),
+    ]
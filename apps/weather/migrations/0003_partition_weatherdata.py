@@ -0,0 +1,25 @@
+# Generated manually
+
+from django.db import migrations
+
+from apps.core.partitioning import partition_table_by_month
+
+
+def partition_weatherdata(apps, schema_editor):
+    partition_table_by_month(
+        schema_editor,
+        table="weather_weatherdata",
+        column="timestamp",
+        index_name="weather_wea_region__097d51_idx",
+        index_columns=["region_id", "timestamp"],
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("weather", "0002_weatherdailyrollup"),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_weatherdata, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.0.1 on 2026-10-19 12:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("core", "0005_merge_20250404_1643"),
+        ("weather", "0003_partition_weatherdata"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="weatherdata",
+            index=models.Index(
+                fields=["timestamp", "id"], name="weather_wea_timesta_c251fc_idx"
+            ),
+        ),
+    ]
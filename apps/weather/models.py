@@ -16,8 +16,49 @@ class WeatherData(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        indexes = [models.Index(fields=["region", "timestamp"])]
+        indexes = [
+            models.Index(fields=["region", "timestamp"]),
+            models.Index(fields=["timestamp", "id"]),
+        ]
         ordering = ["-timestamp"]
 
     def __str__(self):
         return f"Weather data for {self.region.name} at {self.timestamp}"
+
+
+class WeatherDailyRollup(models.Model):
+    """Daily aggregate of raw WeatherData observations compacted by retention."""
+
+    region = models.ForeignKey(Region, on_delete=models.CASCADE)
+    date = models.DateField()
+    sample_count = models.PositiveIntegerField(
+        help_text="Number of raw observations aggregated into this rollup"
+    )
+    temperature_avg = models.FloatField(help_text="Mean temperature in Celsius")
+    temperature_min = models.FloatField(help_text="Minimum temperature in Celsius")
+    temperature_max = models.FloatField(help_text="Maximum temperature in Celsius")
+    humidity_avg = models.FloatField(help_text="Mean relative humidity in percentage")
+    humidity_min = models.FloatField(
+        help_text="Minimum relative humidity in percentage"
+    )
+    wind_speed_avg = models.FloatField(help_text="Mean wind speed in meters per second")
+    wind_speed_max = models.FloatField(
+        help_text="Maximum wind speed in meters per second"
+    )
+    precipitation_total = models.FloatField(
+        help_text="Total precipitation in millimeters"
+    )
+    pressure_avg = models.FloatField(help_text="Mean atmospheric pressure in hPa")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["region", "date"], name="weather_rollup_region_date_uniq"
+            )
+        ]
+        ordering = ["-date"]
+
+    def __str__(self):
+        return f"Weather rollup for {self.region.name} on {self.date}"
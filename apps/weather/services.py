@@ -1,44 +1,60 @@
+import httpx
 import requests
 from django.conf import settings
 from datetime import datetime
 from django.utils import timezone
+from apps.core import metrics
+from apps.core.instrumentation import record_upstream
 from .models import WeatherData
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-def fetch_current_weather(region):
-    """
-    Fetch current weather data from OpenWeatherMap API for a given region
-    """
-    params = {
+def current_weather_params(region):
+    """Query parameters of the OpenWeatherMap current weather call for a region."""
+    return {
         "lat": region.latitude,
         "lon": region.longitude,
         "appid": settings.OPENWEATHERMAP_API_KEY,
         "units": "metric",  # Use metric units
     }
 
+
+def parse_current_weather(region, data):
+    """
+    Build WeatherData field values from an OpenWeatherMap response.
+
+    Raises:
+        KeyError: If a required value is missing from the response
+    """
+    return {
+        "region": region,
+        "timestamp": timezone.now(),
+        "temperature": data["main"]["temp"],
+        "humidity": data["main"]["humidity"],
+        "wind_speed": data["wind"]["speed"],
+        "wind_direction": data["wind"].get("deg", 0),
+        "precipitation": data.get("rain", {}).get("1h", 0),  # Rain in last hour
+        "pressure": data["main"]["pressure"],
+    }
+
+
+def fetch_current_weather(region):
+    """
+    Fetch current weather data from OpenWeatherMap API for a given region
+    """
+    params = current_weather_params(region)
+
     try:
         logger.info(f"Fetching weather data for {region.name} with params: {params}")
-        response = requests.get(settings.OPENWEATHERMAP_API_URL, params=params)
-        response.raise_for_status()
+        with record_upstream("openweathermap"):
+            response = requests.get(settings.OPENWEATHERMAP_API_URL, params=params)
+            response.raise_for_status()
         data = response.json()
 
-        # Create a dictionary with the weather data
-        weather_data_dict = {
-            "region": region,
-            "timestamp": timezone.now(),
-            "temperature": data["main"]["temp"],
-            "humidity": data["main"]["humidity"],
-            "wind_speed": data["wind"]["speed"],
-            "wind_direction": data["wind"].get("deg", 0),
-            "precipitation": data.get("rain", {}).get("1h", 0),  # Rain in last hour
-            "pressure": data["main"]["pressure"],
-        }
-
         # Create the WeatherData object
-        weather_data = WeatherData.objects.create(**weather_data_dict)
+        weather_data = WeatherData.objects.create(**parse_current_weather(region, data))
         logger.info(f"Successfully created weather data for {region.name}")
 
         return weather_data
@@ -58,14 +74,72 @@ def fetch_current_weather(region):
         return None
 
 
+def async_http_client():
+    """
+    Create the shared HTTP client used by the async weather fetchers.
+
+    One client is meant to be reused for a whole batch of calls so that
+    connections are pooled; use it as an async context manager.
+    """
+    return httpx.AsyncClient(
+        timeout=settings.WEATHER_HTTP_TIMEOUT,
+        limits=httpx.Limits(max_connections=settings.WEATHER_HTTP_MAX_CONNECTIONS),
+    )
+
+
+async def afetch_current_weather(region, client):
+    """
+    Async version of fetch_current_weather using ``client`` (an httpx.AsyncClient).
+
+    Many regions can be fetched concurrently with asyncio.gather without
+    holding a worker thread per upstream call.
+    """
+    try:
+        logger.info(f"Fetching weather data for {region.name}")
+        with record_upstream("openweathermap"):
+            response = await client.get(
+                settings.OPENWEATHERMAP_API_URL, params=current_weather_params(region)
+            )
+            response.raise_for_status()
+        data = response.json()
+
+        weather_data = await WeatherData.objects.acreate(
+            **parse_current_weather(region, data)
+        )
+        logger.info(f"Successfully created weather data for {region.name}")
+
+        return weather_data
+
+    except httpx.HTTPError as e:
+        logger.error(f"Error fetching weather data for {region.name}: {str(e)}")
+        return None
+    except KeyError as e:
+        logger.error(
+            f"Missing data in weather API response for {region.name}: {str(e)}"
+        )
+        return None
+    except Exception as e:
+        logger.error(
+            f"Unexpected error fetching weather data for {region.name}: {str(e)}"
+        )
+        return None
+
+
 def update_weather_data():
     """
     Update weather data for all regions
+
+    Returns:
+        Number of observations stored
     """
     from apps.core.models import Region
 
+    stored = 0
     for region in Region.objects.all():
-        fetch_current_weather(region)
+        if fetch_current_weather(region) is not None:
+            stored += 1
+    metrics.record_ingest_cycle(stored)
+    return stored
 
 
 def fetch_historical_weather(region, start_date, end_date):
@@ -103,8 +177,9 @@ def fetch_historical_weather(region, start_date, end_date):
     headers = {"token": settings.NOAA_API_KEY}
 
     try:
-        response = requests.get(base_url, params=params, headers=headers)
-        response.raise_for_status()
+        with record_upstream("noaa"):
+            response = requests.get(base_url, params=params, headers=headers)
+            response.raise_for_status()
         data = response.json()
 
         # Process the data into our format
@@ -160,8 +235,9 @@ def find_nearest_noaa_station(latitude, longitude):
     headers = {"token": settings.NOAA_API_KEY}
 
     try:
-        response = requests.get(base_url, params=params, headers=headers)
-        response.raise_for_status()
+        with record_upstream("noaa"):
+            response = requests.get(base_url, params=params, headers=headers)
+            response.raise_for_status()
         data = response.json()
 
         if data.get("results"):
@@ -197,8 +273,9 @@ def fetch_dmn_historical_data(region, start_date, end_date):
     }
 
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
+        with record_upstream("dmn"):
+            response = requests.get(base_url, params=params)
+            response.raise_for_status()
         data = response.json()
 
         # Process the data into our format
@@ -236,8 +313,9 @@ def find_nearest_dmn_station(latitude, longitude):
     }
 
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()
+        with record_upstream("dmn"):
+            response = requests.get(base_url, params=params)
+            response.raise_for_status()
         data = response.json()
 
         if data.get("stations"):
@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from apps.core import events
+from .models import WeatherData
+from .serializers import WeatherDataSerializer
+
+
+@receiver(post_save, sender=WeatherData)
+def publish_weather_update(sender, instance, created, **kwargs):
+    """Push newly stored observations to live subscribers of the region."""
+    if created:
+        events.publish(
+            instance.region_id, "weather", WeatherDataSerializer(instance).data
+        )
@@ -0,0 +1,543 @@
+import asyncio
+import base64
+import io
+import json
+import unittest
+from unittest import mock
+from datetime import timedelta
+
+import httpx
+import msgpack
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.core.asgi import get_asgi_application
+from django.test import (
+    AsyncRequestFactory,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import exports
+from apps.core.models import Region
+from apps.core.columnar import arrow_available
+from apps.core.retention import apply_retention
+from . import async_views, services
+from .fake_provider import start_in_thread
+from .models import WeatherData, WeatherDailyRollup
+from .serializers import WeatherDataSerializer
+from .views import observation_etag
+
+
+def create_region(name="Test Region"):
+    return Region.objects.create(
+        name=name,
+        latitude=35.0,
+        longitude=-5.0,
+        elevation=1000,
+        area=100,
+        population=1000,
+    )
+
+
+def create_weather(region, timestamp, temperature=20.0, precipitation=0.0):
+    return WeatherData.objects.create(
+        region=region,
+        timestamp=timestamp,
+        temperature=temperature,
+        humidity=40.0,
+        wind_speed=5.0,
+        wind_direction=180.0,
+        precipitation=precipitation,
+        pressure=1010.0,
+    )
+
+
+@override_settings(
+    RETENTION_WEATHER_RAW_DAYS=30,
+    RETENTION_PREDICTION_DAYS=30,
+    RETENTION_DELETE_CHUNK_SIZE=2,
+)
+class RetentionTest(TestCase):
+    def setUp(self):
+        self.region = create_region()
+        self.now = timezone.now()
+
+    def test_old_observations_are_compacted_into_rollups(self):
+        old_day = self.now - timedelta(days=40)
+        create_weather(self.region, old_day, temperature=10.0, precipitation=1.0)
+        create_weather(self.region, old_day, temperature=20.0, precipitation=2.0)
+        create_weather(self.region, old_day, temperature=30.0, precipitation=3.0)
+        recent = create_weather(self.region, self.now - timedelta(days=1))
+
+        apply_retention(now=self.now)
+
+        self.assertEqual(
+            list(WeatherData.objects.values_list("pk", flat=True)), [recent.pk]
+        )
+        rollup = WeatherDailyRollup.objects.get(region=self.region)
+        self.assertEqual(rollup.date, timezone.localtime(old_day).date())
+        self.assertEqual(rollup.sample_count, 3)
+        self.assertAlmostEqual(rollup.temperature_avg, 20.0)
+        self.assertEqual(rollup.temperature_min, 10.0)
+        self.assertEqual(rollup.temperature_max, 30.0)
+        self.assertAlmostEqual(rollup.precipitation_total, 6.0)
+
+    def test_late_observations_merge_into_existing_rollup(self):
+        old_day = self.now - timedelta(days=40)
+        create_weather(self.region, old_day, temperature=10.0)
+        apply_retention(now=self.now)
+
+        create_weather(self.region, old_day, temperature=30.0)
+        apply_retention(now=self.now)
+
+        rollup = WeatherDailyRollup.objects.get(region=self.region)
+        self.assertEqual(rollup.sample_count, 2)
+        self.assertAlmostEqual(rollup.temperature_avg, 20.0)
+        self.assertEqual(rollup.temperature_max, 30.0)
+        self.assertFalse(WeatherData.objects.exists())
+
+
+@override_settings(EXPORT_CHUNK_SIZE=2)
+class WeatherExportTest(TestCase):
+    def setUp(self):
+        self.region = create_region()
+        self.other = create_region("Other Region")
+        now = timezone.now()
+        for hours in range(5):
+            create_weather(self.region, now - timedelta(hours=hours))
+        create_weather(self.other, now)
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        self.url = reverse("weatherdata-export")
+
+    def get(self, **params):
+        response = self.client.get(self.url, params, secure=True)
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content)
+
+    def test_ndjson_export_filters_by_region(self):
+        body = self.get(format="ndjson", region_id=self.region.pk)
+
+        rows = [json.loads(line) for line in body.decode().splitlines()]
+        self.assertEqual(len(rows), 5)
+        self.assertTrue(all(row["region_id"] == self.region.pk for row in rows))
+
+    def test_csv_export_has_header_and_all_rows(self):
+        body = self.get(format="csv")
+
+        lines = body.decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "region_id", "timestamp"])
+        self.assertEqual(len(lines), 7)
+
+    def test_invalid_date_is_rejected(self):
+        response = self.client.get(
+            self.url, {"format": "csv", "start": "yesterday"}, secure=True
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    @unittest.skipUnless(arrow_available(), "pyarrow is not installed")
+    def test_parquet_export_writes_row_groups(self):
+        import pyarrow.parquet as pq
+
+        with override_settings(EXPORT_PARQUET_ROW_GROUP_SIZE=4):
+            body = self.get(format="parquet")
+
+        parquet_file = pq.ParquetFile(io.BytesIO(body))
+        self.assertEqual(parquet_file.metadata.num_rows, 6)
+        self.assertEqual(parquet_file.metadata.num_row_groups, 2)
+
+    def test_msgpack_export_is_a_sequence_of_typed_column_batches(self):
+        with override_settings(EXPORT_COLUMNAR_BATCH_SIZE=4):
+            body = self.get(format="msgpack")
+
+        batches = list(msgpack.Unpacker(io.BytesIO(body), raw=False))
+        self.assertEqual([batch["length"] for batch in batches], [4, 2])
+        temperature = batches[0]["columns"]["temperature"]
+        self.assertEqual(
+            np.frombuffer(temperature["data"], temperature["dtype"]).tolist(),
+            [20.0] * 4,
+        )
+
+    @unittest.skipUnless(arrow_available(), "pyarrow is not installed")
+    def test_arrow_export_streams_record_batches(self):
+        import pyarrow as pa
+
+        with override_settings(EXPORT_COLUMNAR_BATCH_SIZE=4):
+            body = self.get(format="arrow", region_id=self.region.pk)
+
+        table = pa.ipc.open_stream(body).read_all()
+        self.assertEqual(table.num_rows, 5)
+        self.assertEqual(
+            table.column("region_id").unique().to_pylist(), [self.region.pk]
+        )
+        self.assertEqual(
+            str(table.schema.field("timestamp").type), "timestamp[us, tz=UTC]"
+        )
+
+    def test_errors_of_binary_formats_are_sent_as_json(self):
+        self.client.logout()
+        for export_format in ("parquet", "arrow"):
+            response = self.client.get(self.url, {"format": export_format}, secure=True)
+
+            self.assertEqual(response.status_code, 403)
+            self.assertEqual(response["Content-Type"], "application/json")
+            self.assertIn("detail", response.json())
+
+    def test_export_command(self):
+        out = io.StringIO()
+        call_command("export_data", "weather", "--format", "csv", stdout=out)
+
+        self.assertEqual(len(out.getvalue().splitlines()), 7)
+
+
+class AsgiExportTest(TransactionTestCase):
+    """Exports served by the ASGI handler, whose request thread commits rows."""
+
+    def setUp(self):
+        region = create_region()
+        now = timezone.now()
+        for hours in range(6):
+            create_weather(region, now - timedelta(hours=hours))
+        User.objects.create_user("analyst", password="x")
+
+    async def serve(self, path, query_string, events):
+        """Run one GET through the ASGI application, appending its messages."""
+        credentials = base64.b64encode(b"analyst:x")
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "https",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query_string,
+            "headers": [
+                (b"host", b"testserver"),
+                (b"authorization", b"Basic " + credentials),
+            ],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 443),
+        }
+        requests = [{"type": "http.request", "body": b"", "more_body": False}]
+
+        async def receive():
+            if requests:
+                return requests.pop()
+            # The client stays connected until the response is complete
+            await asyncio.Event().wait()
+
+        async def send(message):
+            events.append(message)
+
+        await get_asgi_application()(scope, receive, send)
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    async def test_chunks_are_sent_as_they_are_read(self):
+        # Chunks read from the export and messages sent, in order
+        events = []
+        stream_export = exports.stream_export
+
+        def tracked_export(*args, **kwargs):
+            for chunk in stream_export(*args, **kwargs):
+                events.append({"type": "read", "body": chunk.encode()})
+                yield chunk
+
+        with mock.patch.object(exports, "stream_export", tracked_export):
+            await self.serve(reverse("weatherdata-export"), b"format=ndjson", events)
+
+        self.assertEqual(events[0]["type"], "http.response.start")
+        self.assertEqual(events[0]["status"], 200)
+        # Each chunk is sent before the next one is read
+        self.assertEqual(
+            [event["type"] for event in events[1:]],
+            ["read", "http.response.body"] * 3 + ["http.response.body"],
+        )
+        body = b"".join(event.get("body", b"") for event in events[2::2])
+        self.assertEqual(len(body.decode().splitlines()), 6)
+
+
+class WeatherPaginationTest(TestCase):
+    def setUp(self):
+        self.region = create_region()
+        self.other = create_region("Other Region")
+        now = timezone.now()
+        # Pairs of rows share a timestamp to exercise the id tie-breaker
+        for hours in range(12):
+            for region in (self.region, self.other):
+                create_weather(region, now - timedelta(hours=hours // 2))
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        self.url = reverse("weatherdata-list")
+
+    def walk(self, params):
+        ids = []
+        url = self.url
+        while url:
+            response = self.client.get(url, params, secure=True)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row["id"] for row in response.json()["results"])
+            url, params = response.json()["next"], {}
+        return ids
+
+    def test_pages_cover_every_row_once_newest_first(self):
+        ids = self.walk({"page_size": 5})
+
+        expected = list(
+            WeatherData.objects.order_by("-timestamp", "-pk").values_list(
+                "pk", flat=True
+            )
+        )
+        self.assertEqual(ids, expected)
+
+    def test_filters_by_region_and_time_range(self):
+        start = (timezone.now() - timedelta(hours=2, minutes=30)).isoformat()
+        ids = self.walk({"page_size": 2, "region_id": self.region.pk, "start": start})
+
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(
+            set(
+                WeatherData.objects.filter(pk__in=ids).values_list("region", flat=True)
+            ),
+            {self.region.pk},
+        )
+
+    def test_deep_pages_cost_the_same_and_skip_count(self):
+        first = self.client.get(self.url, {"page_size": 3}, secure=True)
+        with self.assertNumQueries(3) as queries:
+            self.client.get(first.json()["next"], secure=True)
+
+        self.assertFalse(
+            any("COUNT(" in query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_msgpack_pages_are_typed_columns_without_serializers(self):
+        with mock.patch.object(
+            WeatherDataSerializer, "to_representation"
+        ) as to_representation:
+            response = self.client.get(
+                self.url,
+                {"page_size": 5},
+                HTTP_ACCEPT="application/msgpack",
+                secure=True,
+            )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        to_representation.assert_not_called()
+        page = msgpack.unpackb(response.content, raw=False)
+        ids = page["results"]["columns"]["id"]
+        timestamps = page["results"]["columns"]["timestamp"]
+        self.assertEqual(page["results"]["length"], 5)
+        expected = list(WeatherData.objects.order_by("-timestamp", "-pk")[:5])
+        self.assertEqual(
+            np.frombuffer(ids["data"], ids["dtype"]).tolist(),
+            [weather.pk for weather in expected],
+        )
+        self.assertEqual(
+            np.frombuffer(timestamps["data"], timestamps["dtype"])[0],
+            np.datetime64(expected[0].timestamp.replace(tzinfo=None), "us"),
+        )
+
+        # The next page link walks on from the last row like the JSON pages
+        second = self.client.get(
+            page["next"], HTTP_ACCEPT="application/msgpack", secure=True
+        )
+        ids = msgpack.unpackb(second.content)["results"]["columns"]["id"]
+        self.assertEqual(
+            np.frombuffer(ids["data"], ids["dtype"]).tolist(),
+            [
+                weather.pk
+                for weather in WeatherData.objects.order_by("-timestamp", "-pk")[5:10]
+            ],
+        )
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "SQLite query plans")
+    def test_deep_pages_seek_the_index_instead_of_scanning(self):
+        statements = []
+
+        def capture(execute, sql, params, many, context):
+            statements.append((sql, params))
+            return execute(sql, params, many, context)
+
+        first = self.client.get(self.url, {"page_size": 3}, secure=True)
+        with connection.execute_wrapper(capture):
+            self.client.get(first.json()["next"], secure=True)
+
+        # Explained with the bound parameters, as the page query runs
+        sql, params = next(
+            (sql, params)
+            for sql, params in statements
+            if "weather_weatherdata" in sql and "LIMIT" in sql
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("SEARCH", plan)
+        self.assertNotIn("SCAN", plan)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {"cursor": "garbage"}, secure=True)
+
+        self.assertEqual(response.status_code, 404)
+
+
+class WeatherConditionalRequestTest(TestCase):
+    def setUp(self):
+        self.region = create_region()
+        self.client.force_login(User.objects.create_user("analyst", password="x"))
+        self.url = reverse("weatherdata-fetch-current-weather")
+
+    def get(self, **headers):
+        return self.client.get(
+            self.url, {"region_id": self.region.pk}, secure=True, headers=headers
+        )
+
+    @mock.patch("apps.weather.views.requests.get")
+    def test_recent_observation_is_reused_and_revalidated(self, api):
+        observation = create_weather(self.region, timezone.now())
+
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["id"], observation.pk)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("must-revalidate", response["Cache-Control"])
+
+        with self.assertNumQueries(3):  # session, user, latest observation
+            cached = self.get(if_none_match=response["ETag"])
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached["ETag"], response["ETag"])
+        self.assertFalse(api.called)
+
+    @override_settings(WEATHER_API_KEY="key")
+    @mock.patch("apps.weather.views.requests.get")
+    def test_old_observation_is_refetched(self, api):
+        old = create_weather(self.region, timezone.now() - timedelta(hours=1))
+        api.return_value.json.return_value = {
+            "main": {"temp": 25.0, "humidity": 30, "pressure": 1012},
+            "wind": {"speed": 4.0, "deg": 90},
+        }
+
+        response = self.get(if_none_match=observation_etag(old))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["id"], old.pk)
+        self.assertNotEqual(response["ETag"], observation_etag(old))
+        self.assertEqual(api.call_count, 1)
+
+
+class WeatherEventTest(TestCase):
+    def test_new_observation_is_published_to_its_region(self):
+        region = create_region()
+
+        with mock.patch("apps.weather.signals.events.publish") as publish:
+            observation = create_weather(region, timezone.now())
+            observation.save()
+
+        publish.assert_called_once()
+        region_id, event, data = publish.call_args.args
+        self.assertEqual((region_id, event), (region.pk, "weather"))
+        self.assertEqual(data["id"], observation.pk)
+
+    @mock.patch("apps.weather.services.requests.get")
+    def test_update_command_stores_and_publishes_every_region(self, api):
+        create_region()
+        region_ids = sorted(Region.objects.values_list("pk", flat=True))
+        api.return_value.json.return_value = {
+            "main": {"temp": 25.0, "humidity": 30, "pressure": 1012},
+            "wind": {"speed": 4.0, "deg": 90},
+        }
+        out = io.StringIO()
+
+        with mock.patch("apps.weather.signals.events.publish") as publish:
+            call_command("update_weather", stdout=out)
+
+        self.assertIn(f"Stored {len(region_ids)} observations", out.getvalue())
+        self.assertEqual(
+            sorted(call.args[0] for call in publish.call_args_list), region_ids
+        )
+
+
+class AsyncCurrentWeatherTest(TestCase):
+    def setUp(self):
+        self.region = create_region()
+        self.user = User.objects.create_user("analyst", password="x")
+
+    def request(self, **headers):
+        request = AsyncRequestFactory().get(
+            "/weather/api/weather/fetch_current_weather/",
+            {"region_id": self.region.pk},
+            headers=headers,
+        )
+
+        async def auser():
+            return self.user
+
+        request.auser = auser
+        return request
+
+    async def test_recent_observation_is_revalidated(self):
+        await sync_to_async(create_weather)(self.region, timezone.now())
+
+        response = await async_views.fetch_current_weather(self.request())
+        self.assertEqual(response.status_code, 200)
+
+        cached = await async_views.fetch_current_weather(
+            self.request(if_none_match=response["ETag"])
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    @override_settings(WEATHER_API_KEY="key")
+    async def test_stale_observation_is_fetched_without_blocking(self):
+        transport = httpx.MockTransport(
+            lambda request: httpx.Response(
+                200,
+                json={
+                    "main": {"temp": 25.0, "humidity": 30, "pressure": 1012},
+                    "wind": {"speed": 4.0, "deg": 90},
+                },
+            )
+        )
+        client = httpx.AsyncClient
+
+        with mock.patch.object(
+            httpx,
+            "AsyncClient",
+            lambda **kwargs: client(transport=transport, **kwargs),
+        ):
+            response = await async_views.fetch_current_weather(self.request())
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)["temperature"], 25.0)
+        self.assertEqual(await WeatherData.objects.acount(), 1)
+
+
+class FakeWeatherProviderTest(TestCase):
+    def setUp(self):
+        self.server, self.url = start_in_thread()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+    def test_provider_answers_like_openweathermap(self):
+        region = create_region()
+
+        with override_settings(OPENWEATHERMAP_API_URL=self.url):
+            weather = services.fetch_current_weather(region)
+
+        self.assertIsNotNone(weather)
+        self.assertEqual(WeatherData.objects.filter(region=region).count(), 1)
+
+    def test_same_location_gets_same_weather(self):
+        params = {"lat": 35.0, "lon": -5.0}
+        first = httpx.get(self.url, params=params).json()
+        second = httpx.get(self.url, params=params).json()
+        other = httpx.get(self.url, params={"lat": 30.0, "lon": -9.0}).json()
+
+        self.assertEqual(first["main"], second["main"])
+        self.assertNotEqual(first["main"], other["main"])
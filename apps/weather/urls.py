@@ -1,5 +1,7 @@
+from django.conf import settings
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from . import async_views
 from .views import WeatherViewSet
 
 router = DefaultRouter()
@@ -8,3 +10,13 @@ router.register(r"weather", WeatherViewSet)
 urlpatterns = [
     path("api/", include(router.urls)),
 ]
+
+if settings.ASGI_MODE:
+    # Shadow the sync DRF action with its async version
+    urlpatterns.insert(
+        0,
+        path(
+            "api/weather/fetch_current_weather/",
+            async_views.fetch_current_weather,
+        ),
+    )
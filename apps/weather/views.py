@@ -8,22 +8,125 @@ from datetime import datetime, timedelta
 from django.utils import timezone
 from .models import WeatherData
 from .serializers import WeatherDataSerializer
+from apps.core import metrics
+from apps.core.caching import make_etag, not_modified, set_validators
+from apps.core import columnar
+from apps.core.exports import EXPORTS, export_response
+from apps.core.filters import RegionTimeRangeFilter
+from apps.core.instrumentation import record_upstream
 from apps.core.models import Region
+from apps.core.pagination import KeysetPagination
+from apps.core.renderers import (
+    ArrowRenderer,
+    CSVRenderer,
+    MessagePackRenderer,
+    NDJSONRenderer,
+    ParquetRenderer,
+)
 from django.conf import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def observation_etag(weather):
+    """ETag of a weather observation (rows are never updated in place)."""
+    return make_etag("weather", weather.pk, weather.timestamp.isoformat())
+
+
+def remaining_freshness(weather):
+    """Seconds an observation may still be served before refetching (<= 0 if stale)."""
+    if weather is None:
+        return 0
+    age = (timezone.now() - weather.timestamp).total_seconds()
+    return settings.WEATHER_OBSERVATION_MAX_AGE - age
+
+
+def weather_api_url(region, api_key):
+    """URL of the current weather API call for a region."""
+    return f"{settings.WEATHER_API_URL}?lat={region.latitude}&lon={region.longitude}&appid={api_key}&units=metric"
+
+
+def observation_values(data):
+    """
+    Extract WeatherData field values from a weather API response.
+
+    Returns:
+        Dictionary of field values, or None if required values are missing
+    """
+    main_data = data.get("main", {})
+    wind_data = data.get("wind", {})
+    rain_data = data.get("rain", {})
+
+    values = {
+        "temperature": main_data.get("temp"),
+        "humidity": main_data.get("humidity"),
+        "pressure": main_data.get("pressure"),
+        "wind_speed": wind_data.get("speed"),
+        "wind_direction": wind_data.get("deg"),
+        "precipitation": rain_data.get("1h", 0),
+    }
+    required = ("temperature", "humidity", "pressure", "wind_speed")
+    if any(values[name] is None for name in required):
+        return None
+    return values
+
+
 class WeatherViewSet(viewsets.ModelViewSet):
     queryset = WeatherData.objects.all()
     serializer_class = WeatherDataSerializer
+    pagination_class = KeysetPagination
+    filter_backends = [RegionTimeRangeFilter]
+    time_field = "timestamp"
+
+    def get_renderers(self):
+        renderers = super().get_renderers()
+        if self.action == "list":
+            renderers += [MessagePackRenderer(), ArrowRenderer()]
+        return renderers
+
+    def list(self, request, *args, **kwargs):
+        """
+        List observations newest first with keyset pagination.
+
+        Optional filters: region_id, start and end (ISO dates or datetimes).
+        With ``?format=msgpack`` or ``?format=arrow`` (or the matching Accept
+        header) each page is sent as typed columns instead of JSON objects.
+        """
+        if request.accepted_renderer.format in columnar.FORMATS:
+            queryset = self.filter_queryset(self.get_queryset())
+            return columnar.paginated_columns(self, queryset, EXPORTS["weather"][2])
+        return super().list(request, *args, **kwargs)
 
     @action(detail=False, methods=["get"])
     def fetch_current_weather(self, request):
+        """
+        Current weather of a region.
+
+        An observation younger than WEATHER_OBSERVATION_MAX_AGE is reused
+        instead of calling the weather API; if the client already holds it
+        (matching ETag or Last-Modified) a 304 is returned after one indexed
+        lookup.
+        """
         region_id = request.query_params.get("region_id")
         if not region_id:
             return Response({"error": "Region ID is required"}, status=400)
+        if not region_id.isdigit():
+            return Response({"error": "Region not found"}, status=404)
+
+        latest = (
+            WeatherData.objects.filter(region_id=region_id)
+            .order_by("-timestamp")
+            .first()
+        )
+        max_age = remaining_freshness(latest)
+        metrics.record_cache("weather_observation", max_age > 0)
+        if max_age > 0:
+            etag = observation_etag(latest)
+            response = not_modified(request, etag, latest.timestamp, max_age)
+            if response is None:
+                response = Response(WeatherDataSerializer(latest).data)
+            return set_validators(response, etag, latest.timestamp, max_age)
 
         try:
             region = Region.objects.get(id=region_id)
@@ -37,47 +140,29 @@ class WeatherViewSet(viewsets.ModelViewSet):
                 {"error": "Weather service configuration error"}, status=500
             )
 
-        url = f"{settings.WEATHER_API_URL}?lat={region.latitude}&lon={region.longitude}&appid={api_key}&units=metric"
-
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
+            with record_upstream("openweathermap"):
+                response = requests.get(weather_api_url(region, api_key), timeout=10)
+                response.raise_for_status()
             data = response.json()
 
-            main_data = data.get("main", {})
-            wind_data = data.get("wind", {})
-            rain_data = data.get("rain", {})
-
-            temperature = main_data.get("temp")
-            humidity = main_data.get("humidity")
-            pressure = main_data.get("pressure")
-            wind_speed = wind_data.get("speed")
-            wind_direction = wind_data.get("deg")
-            precipitation = rain_data.get("1h", 0)
-
-            if (
-                temperature is None
-                or humidity is None
-                or pressure is None
-                or wind_speed is None
-            ):
+            values = observation_values(data)
+            if values is None:
                 logger.error(f"Incomplete weather data received from API: {data}")
                 return Response(
                     {"error": "Incomplete data from weather service"}, status=500
                 )
 
             weather_data = WeatherData.objects.create(
-                region=region,
-                timestamp=timezone.now(),
-                temperature=temperature,
-                humidity=humidity,
-                wind_speed=wind_speed,
-                wind_direction=wind_direction,
-                precipitation=precipitation,
-                pressure=pressure,
+                region=region, timestamp=timezone.now(), **values
             )
 
-            return Response(WeatherDataSerializer(weather_data).data)
+            return set_validators(
+                Response(WeatherDataSerializer(weather_data).data),
+                observation_etag(weather_data),
+                weather_data.timestamp,
+                settings.WEATHER_OBSERVATION_MAX_AGE,
+            )
 
         except RequestException as e:
             logger.error(f"Error fetching weather data from API: {e}")
@@ -93,6 +178,26 @@ class WeatherViewSet(viewsets.ModelViewSet):
             )
             return Response({"error": "An unexpected error occurred"}, status=500)
 
+    @action(
+        detail=False,
+        methods=["get"],
+        renderer_classes=[
+            NDJSONRenderer,
+            CSVRenderer,
+            ParquetRenderer,
+            MessagePackRenderer,
+            ArrowRenderer,
+        ],
+    )
+    def export(self, request):
+        """
+        Stream all stored weather observations as NDJSON, CSV, Parquet,
+        MessagePack or Arrow.
+
+        Optional filters: region_id, start and end (ISO dates or datetimes).
+        """
+        return export_response(request, "weather")
+
     @action(detail=False, methods=["get"])
     def historical_data(self, request):
         """
@@ -7,5 +7,7 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+# Serve the async versions of the I/O-bound views
+os.environ.setdefault("ASGI_MODE", "True")
 
-application = get_asgi_application() 
\ No newline at end of file
+application = get_asgi_application()
@@ -1,4 +1,6 @@
+import json
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 import dj_database_url
@@ -13,6 +15,9 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "django-insecure-default-key")
 DEBUG = os.getenv("DEBUG", "False").lower() in ("true", "1", "t")
 
+# Set by config/asgi.py: route the async views instead of their sync versions
+ASGI_MODE = os.getenv("ASGI_MODE", "False").lower() in ("true", "1", "t")
+
 ALLOWED_HOSTS = [
     "web-production-67f0.up.railway.app",
     "localhost",
@@ -31,7 +36,9 @@ CSRF_TRUSTED_ORIGINS = [
 DATABASES = {
     "default": dj_database_url.config(
         default="sqlite:///db.sqlite3",  # fallback to SQLite
-        conn_max_age=600,
+        # Under ASGI each request runs its ORM calls in a fresh thread, so
+        # persistent per-thread connections would pile up instead of being reused
+        conn_max_age=0 if ASGI_MODE else 600,
         conn_health_checks=True,
     )
 }
@@ -48,7 +55,12 @@ MEDIA_ROOT = BASE_DIR / "media"
 
 # Security settings for production
 if not DEBUG:
-    SECURE_SSL_REDIRECT = True
+    # Disable to serve plain HTTP locally, e.g. for load tests
+    SECURE_SSL_REDIRECT = os.getenv("SECURE_SSL_REDIRECT", "True").lower() in (
+        "true",
+        "1",
+        "t",
+    )
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_BROWSER_XSS_FILTER = True
@@ -73,6 +85,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "apps.core.instrumentation.InstrumentationMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -80,6 +93,7 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "apps.core.profiling.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -122,7 +136,11 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 # Weather API settings
 WEATHER_API_KEY = os.getenv("WEATHER_API_KEY", "")
-WEATHER_API_URL = "http://api.openweathermap.org/data/2.5/weather"
+# Point both API URLs at the fake provider (manage.py fake_weather_provider)
+# to run the app without calling OpenWeatherMap, e.g. for load tests
+WEATHER_API_URL = os.getenv(
+    "WEATHER_API_URL", "http://api.openweathermap.org/data/2.5/weather"
+)
 
 # CORS settings
 CORS_ALLOWED_ORIGINS = [
@@ -156,7 +174,9 @@ SPECTACULAR_SETTINGS = {
 
 # OpenWeatherMap API Settings
 OPENWEATHERMAP_API_KEY = os.getenv("OPENWEATHERMAP_API_KEY", "")
-OPENWEATHERMAP_API_URL = "https://api.openweathermap.org/data/2.5/weather"
+OPENWEATHERMAP_API_URL = os.getenv(
+    "OPENWEATHERMAP_API_URL", "https://api.openweathermap.org/data/2.5/weather"
+)
 
 # NOAA Climate Data Online API Configuration
 NOAA_API_KEY = os.getenv("NOAA_API_KEY", "")
@@ -165,3 +185,146 @@ NOAA_API_URL = "https://www.ncdc.noaa.gov/cdo-web/api/v2"
 # DMN (Moroccan Meteorological Service) API Configuration
 DMN_API_KEY = os.getenv("DMN_API_KEY", "")
 DMN_API_URL = "http://www.marocmeteo.ma/api"
+
+# Data retention settings
+# Raw weather observations older than this are compacted into daily rollups.
+# Must stay above the 90-day window used for historical pattern analysis.
+RETENTION_WEATHER_RAW_DAYS = int(os.getenv("RETENTION_WEATHER_RAW_DAYS", "120"))
+# Daily rollups older than this are deleted (0 keeps them forever)
+RETENTION_WEATHER_ROLLUP_DAYS = int(os.getenv("RETENTION_WEATHER_ROLLUP_DAYS", "0"))
+RETENTION_PREDICTION_DAYS = int(os.getenv("RETENTION_PREDICTION_DAYS", "180"))
+RETENTION_DELETE_CHUNK_SIZE = int(os.getenv("RETENTION_DELETE_CHUNK_SIZE", "5000"))
+# Monthly partitions created ahead of time on PostgreSQL
+RETENTION_PARTITION_PREMAKE_MONTHS = int(
+    os.getenv("RETENTION_PARTITION_PREMAKE_MONTHS", "3")
+)
+
+# Prediction snapshots older than this (in seconds) are recomputed on read
+PREDICTION_SNAPSHOT_MAX_AGE = int(os.getenv("PREDICTION_SNAPSHOT_MAX_AGE", "900"))
+
+# Maximum number of regions and points accepted by the batch prediction endpoint
+PREDICTION_BATCH_MAX_ITEMS = int(os.getenv("PREDICTION_BATCH_MAX_ITEMS", "1000"))
+
+# Bulk export settings
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+EXPORT_PARQUET_ROW_GROUP_SIZE = int(
+    os.getenv("EXPORT_PARQUET_ROW_GROUP_SIZE", "100000")
+)
+# Rows per MessagePack map or Arrow record batch of columnar exports
+EXPORT_COLUMNAR_BATCH_SIZE = int(os.getenv("EXPORT_COLUMNAR_BATCH_SIZE", "50000"))
+
+# HTTP caching
+# Weather observations younger than this (in seconds) are served from the
+# database instead of calling the weather API again.
+WEATHER_OBSERVATION_MAX_AGE = int(os.getenv("WEATHER_OBSERVATION_MAX_AGE", "300"))
+# Cache-Control max-age of the prediction list; clients revalidate afterwards
+PREDICTION_CACHE_MAX_AGE = int(os.getenv("PREDICTION_CACHE_MAX_AGE", "60"))
+
+# Live updates (Server-Sent Events, served under ASGI)
+# Updates published by any process (web workers, and the update_weather and
+# refresh_predictions commands run by cron) go through Redis pub/sub when
+# REDIS_URL is set. Otherwise the in-process broker only carries the updates
+# stored by the web process itself, which serves every client when gunicorn
+# runs a single worker (WEB_CONCURRENCY, 1 by default): EVENTS_SINGLE_PROCESS
+# then defaults to True. The stream answers 503 (clients poll instead) unless
+# ASGI_MODE is set and the broker reaches every process serving clients.
+EVENTS_BROKER = os.getenv(
+    "EVENTS_BROKER",
+    (
+        "apps.core.events.RedisBroker"
+        if os.getenv("REDIS_URL")
+        else "apps.core.events.InProcessBroker"
+    ),
+)
+EVENTS_SINGLE_PROCESS = os.getenv(
+    "EVENTS_SINGLE_PROCESS", str(int(os.getenv("WEB_CONCURRENCY", "1")) <= 1)
+).lower() in ("true", "1", "t")
+EVENTS_REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+EVENTS_HEARTBEAT_SECONDS = int(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+
+# Async weather API client (ASGI mode)
+WEATHER_HTTP_TIMEOUT = float(os.getenv("WEATHER_HTTP_TIMEOUT", "10"))
+WEATHER_HTTP_MAX_CONNECTIONS = int(os.getenv("WEATHER_HTTP_MAX_CONNECTIONS", "200"))
+
+# Request instrumentation
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED", "True").lower() in (
+    "true",
+    "1",
+    "t",
+)
+# Requests exceeding any of these budgets are logged as warnings
+REQUEST_BUDGET_QUERIES = int(os.getenv("REQUEST_BUDGET_QUERIES", "50"))
+REQUEST_BUDGET_UPSTREAM_CALLS = int(os.getenv("REQUEST_BUDGET_UPSTREAM_CALLS", "5"))
+REQUEST_BUDGET_LATENCY_MS = int(os.getenv("REQUEST_BUDGET_LATENCY_MS", "1000"))
+# Per-view overrides keyed by URL name, e.g.
+# {"predictions:dashboard": {"queries": 10, "latency_ms": 500}}
+REQUEST_BUDGETS = json.loads(os.getenv("REQUEST_BUDGETS", "{}"))
+
+# Prometheus metrics endpoint (/metrics/). Scrapers must send
+# "Authorization: Bearer <METRICS_TOKEN>"; without a token the endpoint is
+# only served when DEBUG is on (404 otherwise). In multi-process deployments set
+# PROMETHEUS_MULTIPROC_DIR (gunicorn.conf.py does by default).
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# Request profiling (off by default): staff users profile a request with the
+# "X-Profile: 1" header or ?profile=1; a fraction of all requests can also be
+# sampled. One request per process is profiled at a time.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() in (
+    "true",
+    "1",
+    "t",
+)
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "0"))
+PROFILING_DIR = os.getenv(
+    "PROFILING_DIR", os.path.join(tempfile.gettempdir(), "wildfire-profiles")
+)
+PROFILING_MAX_TRACES = int(os.getenv("PROFILING_MAX_TRACES", "50"))
+
+# Prediction explanations memoized per bucketed inputs (one entry per region
+# and weather combination)
+EXPLANATION_CACHE_SIZE = int(os.getenv("EXPLANATION_CACHE_SIZE", "4096"))
+
+# Cache holding the shared region metadata version (see apps/core/regioncache.py).
+# It must be shared by all worker processes so that changes to regions reach
+# every worker: Redis when REDIS_URL is set (requires the redis package),
+# otherwise files under CACHE_LOCATION (shared by the workers of one host).
+# CACHE_BACKEND overrides the choice. With a process-local backend
+# (LocMemCache) workers only notice other workers' changes when they reload
+# after REGION_CACHE_MAX_AGE seconds, which is then capped at a minute.
+if os.getenv("CACHE_BACKEND"):
+    CACHES = {
+        "default": {
+            "BACKEND": os.getenv("CACHE_BACKEND"),
+            "LOCATION": os.getenv("CACHE_LOCATION", ""),
+        }
+    }
+elif os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv(
+                "CACHE_LOCATION",
+                os.path.join(tempfile.gettempdir(), "wildfire-cache"),
+            ),
+        }
+    }
+REGION_CACHE_MAX_AGE = int(os.getenv("REGION_CACHE_MAX_AGE", "3600"))
+if CACHES["default"]["BACKEND"].endswith((".LocMemCache", ".DummyCache")):
+    REGION_CACHE_MAX_AGE = min(REGION_CACHE_MAX_AGE, 60)
+
+# Backend of point-to-region and radius queries (see apps/core/spatial.py):
+# "memory" builds KD-trees per process; "database" queries GiST indexes and is
+# only honoured on PostgreSQL. Queries return at most SPATIAL_MAX_RESULTS items.
+SPATIAL_INDEX_BACKEND = os.getenv("SPATIAL_INDEX_BACKEND", "memory")
+SPATIAL_MAX_RESULTS = int(os.getenv("SPATIAL_MAX_RESULTS", "100"))
+
+# Encoded map risk layer bodies kept per bbox, zoom and encoding (see
+# apps/predictions/risklayer.py)
+RISK_LAYER_CACHE_SIZE = int(os.getenv("RISK_LAYER_CACHE_SIZE", "64"))
@@ -0,0 +1,29 @@
+"""
+Gunicorn configuration.
+
+Workers are separate processes, so Prometheus metrics are kept in
+multiprocess mode: each worker writes its samples to PROMETHEUS_MULTIPROC_DIR
+and the /metrics/ endpoint aggregates them. The directory must be set before
+prometheus_client is imported, i.e. here in the master, and is emptied on
+start so counters from a previous run are not reported again.
+"""
+
+import glob
+import os
+
+os.environ.setdefault(
+    "PROMETHEUS_MULTIPROC_DIR", os.path.join("/tmp", "wildfire-prometheus")
+)
+
+
+def on_starting(server):
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(path, exist_ok=True)
+    for filename in glob.glob(os.path.join(path, "*.db")):
+        os.remove(filename)
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)